@@ -1,117 +1,232 @@
+import logging
 import random
 import math
-from game_state import players, bullets, walls, GAME_WIDTH, GAME_HEIGHT, TANK_SPEED, ROTATING_SPEED,TANK_HEIGHT,TANK_WIDTH
-
-def ai_fire(player_id):
-    player = players[player_id]
-    if player['alive']:
-        angle = player['angle']
-        bullets.append({
-            'x': player['x'] + math.cos(angle) * TANK_WIDTH / 2,
-            'y': player['y'] + math.sin(angle) * TANK_HEIGHT / 2,
-            'angle': angle,
-            'owner': player_id,
-            'bounces': 0
-        })
-        
-class AIPlayer:
-    def __init__(self, player_id):
-        self.player_id = player_id
-        self.target = None
-        self.state = 'roaming'
-        self.state_timer = 0
-
-    def update(self):
-        player = players[self.player_id]
-        if not player['alive']:
-            return
+import numpy as np
+from game_state import (GAME_UPDATE_RATE, ROTATING_SPEED, TANK_HEIGHT, TANK_WIDTH, AI_DECISION_RATE, AI_AIM_BOUNCES,
+                        AI_AIM_CELLS, AI_EVADE_DISTANCE, AI_STUCK_TICKS)
+
+# 坦克中心到炮口的距离，和 Simulation.fire 一致
+BARREL_LENGTH = max(TANK_WIDTH, TANK_HEIGHT) / 2 + 5
+# 离路点这么近就算到了，停下等下一次决定
+ARRIVE_DISTANCE = 4
+
+# DEBUG 级别下每次决定记一条，按 LOG_RATE_LIMITS 采样
+logger = logging.getLogger('game.ai')
+
+
+def ai_fire(room, player_id):
+    # 和玩家一样通过输入开火，下一步由模拟处理
+    room.inputs.push(player_id, {'type': 'fire'})
+
+
+def angle_difference(target, angle):
+    # 从 angle 转到 target 的最短角度，范围 [-pi, pi)
+    return (target - angle + math.pi) % (2 * math.pi) - math.pi
+
+
+def perceive(room, bot_ids):
+    '''
+    一次算出这些 AI 的感知：最近的敌人和最近的来袭子弹
+
+    AI 和所有活着的坦克、所有子弹分别算一个距离矩阵。来袭子弹是正在靠近的子弹，
+    自己的子弹反弹过以后也会打中自己，所以也算在内。
+    返回 玩家ID -> (最近的敌人ID 或 None, 距离, 最近的来袭子弹索引 或 -1, 距离)。
+    '''
+    players = room.players
+    alive_ids = [player_id for player_id, player in players.items() if player.alive]
+    tanks = np.array([(players[pid].x, players[pid].y) for pid in alive_ids], dtype=float).reshape(-1, 2)
+    bots = np.array([(players[pid].x, players[pid].y) for pid in bot_ids], dtype=float).reshape(-1, 2)
+
+    enemy_distances = np.hypot(bots[:, 0, None] - tanks[:, 0], bots[:, 1, None] - tanks[:, 1])
+    enemy_distances[np.array(bot_ids)[:, None] == np.array(alive_ids)[None, :]] = np.inf
+    if len(alive_ids):
+        enemies = np.argmin(enemy_distances, axis=1)
+        enemy_distances = enemy_distances[np.arange(len(bot_ids)), enemies]
+    else:
+        enemies = np.zeros(len(bot_ids), dtype=int)
+        enemy_distances = np.full(len(bot_ids), np.inf)
+
+    bullets = room.bullets
+    n = bullets.count
+    dx = bots[:, 0, None] - bullets.x[:n]
+    dy = bots[:, 1, None] - bullets.y[:n]
+    bullet_distances = np.hypot(dx, dy)
+    owners = np.array([bullets.owner_index.get(pid, -1) for pid in bot_ids])
+    own = (bullets.owner[:n] == owners[:, None]) & (bullets.bounces[:n] == 0)
+    approaching = dx * bullets.vx[:n] + dy * bullets.vy[:n] > 0
+    bullet_distances[own | ~approaching] = np.inf
+    if n:
+        nearest_bullets = np.argmin(bullet_distances, axis=1)
+        bullet_distances = bullet_distances[np.arange(len(bot_ids)), nearest_bullets]
+    else:
+        nearest_bullets = np.zeros(len(bot_ids), dtype=int)
+        bullet_distances = np.full(len(bot_ids), np.inf)
+
+    perception = {}
+    for row, bot_id in enumerate(bot_ids):
+        enemy_distance = float(enemy_distances[row])
+        bullet_distance = float(bullet_distances[row])
+        perception[bot_id] = (alive_ids[enemies[row]] if np.isfinite(enemy_distance) else None, enemy_distance,
+                              int(nearest_bullets[row]) if np.isfinite(bullet_distance) else -1, bullet_distance)
+    return perception
+
+
+class AIScheduler:
+    '''
+    一个房间里所有电脑玩家的调度
+
+    每个 AI 每 decision_interval 步做一次决定，决定的时机按 phase 错开，每一步只有大约 1/decision_interval 的 AI 在做决定，
+    负载不会集中在某一步。做决定的 AI 的感知在这一步里用 perceive 一起算；每一步所有 AI 只按上次的决定操作坦克，开销很小。
+    '''
+
+    def __init__(self, room, decision_interval=max(1, round(GAME_UPDATE_RATE / AI_DECISION_RATE))):
+        self.room = room
+        self.decision_interval = decision_interval
+        self.bots = {}  # 玩家ID -> AIPlayer
+
+    def add(self, player_id):
+        # 新的 AI 放进人最少的 phase
+        phases = [0] * self.decision_interval
+        for bot in self.bots.values():
+            phases[bot.phase] += 1
+        bot = AIPlayer(self.room, player_id, phases.index(min(phases)))
+        self.bots[player_id] = bot
+        return bot
+
+    def remove(self, player_id):
+        self.bots.pop(player_id, None)
+
+    def update(self, tick):
+        players = self.room.players
+        for player_id in [player_id for player_id in self.bots if player_id not in players]:
+            del self.bots[player_id]
+        # 死亡的 AI 不动，下一回合复活后继续
+        active = [bot for player_id, bot in self.bots.items() if players[player_id].alive]
+        deciding = [bot for bot in active if (tick + bot.phase) % self.decision_interval == 0]
+        if deciding:
+            perception = perceive(self.room, [bot.player_id for bot in deciding])
+            for bot in deciding:
+                bot.decide(*perception[bot.player_id])
+        for bot in active:
+            bot.act()
+
+    def __len__(self):
+        return len(self.bots)
 
-        self.state_timer -= 1
-        if self.state_timer <= 0:
-            self.choose_new_state()
 
+class AIPlayer:
+    '''
+    电脑玩家
 
+    decide 由 AIScheduler 按较低的频率调用：选择状态，用房间的导航图 room.nav 找下一个路点，进攻时用 find_shot
+    找一个直接或者经过反弹能打中目标的角度。act 每一步调用，只按这些结果转向、前进和开火，
+    和玩家一样通过 room.inputs 发送输入。
+    '''
 
-        if self.state == 'roaming':
-            self.roam()
+    def __init__(self, room, player_id, phase=0):
+        self.room = room
+        self.player_id = player_id
+        self.phase = phase  # 在第几步做决定，见 AIScheduler
+        self.target = None
+        self.state = 'roaming'
+        self.state_until = 0  # 当前状态持续到的模拟时间
+        self.goal = None  # 漫游的目的地
+        self.waypoint = None  # 正在前往的路点
+        self.aim = None  # 找到的开火角度
+        self.last_position = None
+        self.stuck_ticks = 0
+        self.reverse_ticks = 0
+
+    def decide(self, enemy, enemy_distance, bullet, bullet_distance):
+        player = self.room.players[self.player_id]
+        if bullet >= 0 and bullet_distance < AI_EVADE_DISTANCE:
+            self.state = 'evading'
+        elif self.room.time >= self.state_until or self.state == 'evading' or \
+                (self.state == 'attacking' and not (self.target and self.target.alive)):
+            self.choose_new_state(enemy)
+
+        self.aim = None
+        if self.state == 'evading':
+            self.waypoint = self.room.nav.flee_waypoint(player.x, player.y, self.room.bullets.x[bullet],
+                                                        self.room.bullets.y[bullet])
         elif self.state == 'attacking':
-            self.attack()
-        elif self.state == 'evading':
-            self.evade()
-
-        print(f"AI玩家{self.player_id} 状态：{self.state} 位置: ({player['x']}, {player['y']}), 转动: {player['rotating']},移动：{player['moving']}")  # 添加调试信息
+            self.attack(player)
+        else:
+            self.roam(player)
+        logger.debug('%s 状态=%s 路点=%s 开火角度=%s', self.player_id, self.state, self.waypoint, self.aim)
 
-    def choose_new_state(self):
-        self.state = random.choice(['roaming'])
-        self.state_timer = random.randint(50, 150)
+    def choose_new_state(self, enemy):
+        self.state = random.choice(['roaming', 'attacking', 'attacking'])
+        self.state_until = self.room.time + random.uniform(0.5, 1.5)
+        self.target = None
         if self.state == 'attacking':
-            self.choose_target()
-
-    def choose_target(self):
-        alive_players = [p for p in players.values() if p['alive'] and p != players[self.player_id]]
-        if alive_players:
-            self.target = random.choice(alive_players)
-        else:
+            if enemy is None:
+                self.state = 'roaming'
+            else:
+                self.target = self.room.players[enemy]
+
+    def roam(self, player):
+        nav = self.room.nav
+        if self.goal is None or nav.cell_at(player.x, player.y) == nav.cell_at(*self.goal):
+            self.goal = nav.center(random.randrange(nav.width * nav.height))
+        self.waypoint = nav.next_waypoint(player.x, player.y, *self.goal)
+        if self.waypoint is None:
+            self.goal = None
+
+    def attack(self, player):
+        target = self.target
+        nav = self.room.nav
+        if 0 <= nav.distance(player.x, player.y, target.x, target.y) <= AI_AIM_CELLS:
+            self.aim = nav.find_shot(player.x, player.y, target.x, target.y,
+                                     player.angle, BARREL_LENGTH, TANK_WIDTH / 2, AI_AIM_BOUNCES)
+        self.waypoint = nav.next_waypoint(player.x, player.y, target.x, target.y)
+        if self.aim is None and self.waypoint is None:
             self.state = 'roaming'
+            self.roam(player)
+
+    def act(self):
+        player = self.room.players[self.player_id]
+        if self.reverse_ticks > 0:
+            # 卡在墙角时倒车几步再继续
+            self.reverse_ticks -= 1
+            self.control(player, -1, 0)
+        elif self.aim is not None:
+            # 停下来转到开火角度，对准后开火
+            angle_diff = angle_difference(self.aim, player.angle)
+            if abs(angle_diff) <= ROTATING_SPEED:
+                self.control(player, 0, 0)
+                ai_fire(self.room, self.player_id)
+                self.aim = None
+            else:
+                self.control(player, 0, 1 if angle_diff > 0 else -1)
+        elif self.waypoint is not None:
+            self.steer(player, *self.waypoint)
+        else:
+            self.control(player, 0, 0)
+        self.check_stuck(player)
 
-    def roam(self):
-        player = players[self.player_id]
-        player['moving'] = random.choice([0, 1])
-        player['rotating'] = random.choice([-1, 0, 1])
-
-    def attack(self):
-        if not self.target or not self.target['alive']:
-            self.choose_new_state()
+    def steer(self, player, x, y):
+        # 朝 (x, y) 走：角度差大时原地转向，差不多对准了再前进
+        if math.hypot(x - player.x, y - player.y) < ARRIVE_DISTANCE:
+            self.control(player, 0, 0)
             return
-
-        player = players[self.player_id]
-        dx = self.target['x'] - player['x']
-        dy = self.target['y'] - player['y']
-        angle_to_target = math.atan2(dy, dx)
-
-        angle_diff = (angle_to_target - player['angle'] + math.pi) % (2 * math.pi) - math.pi
-        if abs(angle_diff) > 0.1:
-            player['rotating'] = 1 if angle_diff > 0 else -1
-        else:
-            player['rotating'] = 0
-
-        player['moving'] = 1
-        
-        # 发射子弹
-        if random.random() < 0.1:  # 5% 的概率发射子弹
-            ai_fire(self.player_id)  # 使用新的 ai_fire 函数
-
-    def evade(self):
-        player = players[self.player_id]
-        nearest_bullet = self.find_nearest_bullet()
-        if nearest_bullet:
-            dx = nearest_bullet['x'] - player['x']
-            dy = nearest_bullet['y'] - player['y']
-            angle_to_bullet = math.atan2(dy, dx)
-            
-            # 远离子弹的方向
-            evasion_angle = (angle_to_bullet + math.pi) % (2 * math.pi)
-            
-            angle_diff = (evasion_angle - player['angle'] + math.pi) % (2 * math.pi) - math.pi
-            if abs(angle_diff) > 0.1:
-                player['rotating'] = 1 if angle_diff > 0 else -1
-            else:
-                player['rotating'] = 0
-            
-            player['moving'] = 1
+        angle_diff = angle_difference(math.atan2(y - player.y, x - player.x), player.angle)
+        rotating = 0 if abs(angle_diff) <= ROTATING_SPEED else (1 if angle_diff > 0 else -1)
+        self.control(player, 1 if abs(angle_diff) < 0.4 else 0, rotating)
+
+    def control(self, player, moving, rotating):
+        # 和玩家一样通过输入操作坦克，只在变化时发送，录像里只会记下变化
+        if player.moving != moving or player.rotating != rotating:
+            self.room.inputs.push(self.player_id, {'type': 'move', 'moving': moving, 'rotating': rotating})
+
+    def check_stuck(self, player):
+        # 撞墙时整步的移动和转向都不生效，想前进却一直停在原地就是卡住了
+        position = (player.x, player.y)
+        if player.moving == 1 and position == self.last_position:
+            self.stuck_ticks += 1
+            if self.stuck_ticks >= AI_STUCK_TICKS:
+                self.stuck_ticks = 0
+                self.reverse_ticks = random.randint(5, 15)
         else:
-            self.roam()
-
-    def find_nearest_bullet(self):
-        player = players[self.player_id]
-        nearest_bullet = None
-        min_distance = float('inf')
-        for bullet in bullets:
-            if bullet['owner'] != self.player_id:
-                dx = bullet['x'] - player['x']
-                dy = bullet['y'] - player['y']
-                distance = math.sqrt(dx*dx + dy*dy)
-                if distance < min_distance:
-                    min_distance = distance
-                    nearest_bullet = bullet
-        return nearest_bullet
\ No newline at end of file
+            self.stuck_ticks = 0
+        self.last_position = position
@@ -1,39 +1,67 @@
 from flask import Flask
 from flask_socketio import SocketIO
 from flask_cors import CORS
-from flask import render_template, send_from_directory
+from flask import render_template, request, redirect, Response
 import threading
 import sys
 import select
+import logging
+from game_log import setup_logging
+from metrics import MeteredManager
+import static_assets
 
-app = Flask(__name__, static_folder='static')
+# 日志先放进内存，由游戏循环旁边的后台线程写出
+setup_logging()
+console_logger = logging.getLogger('game.console')
+
+# /static/ 由下面的 send_static 处理，不用 Flask 自带的静态文件路由
+app = Flask(__name__, static_folder=None)
+app.add_template_global(static_assets.asset_url)
+static_assets.load()
 CORS(app)
-socketio = SocketIO(app, async_mode='eventlet', websocket=True, ping_timeout=10, ping_interval=5, compression=True,cors_allowed_origins = '*')
+socketio = SocketIO(app, async_mode='eventlet', websocket=True, ping_timeout=10, ping_interval=5, compression=True,cors_allowed_origins = '*',
+                    client_manager=MeteredManager())  # 按事件统计发出的消息，见 /metrics
 
 @app.route('/')
 def index():
+    from game_state import DEFAULT_ROOM_ID
+    from rooms import room_owner
+    from workers import is_local, worker_url
+    # 房间由其他进程负责时，直接把页面重定向过去，socket 会连到负责的进程
+    room_id = request.args.get('room') or DEFAULT_ROOM_ID
+    owner = room_owner(room_id)
+    if owner is not None and not is_local(owner):
+        return redirect(f"{worker_url(owner, request.scheme, request.host)}/?room={room_id}")
     return render_template('index.html')
 
 @app.route('/static/<path:path>')
 def send_static(path):
-    return send_from_directory('static', path)
+    # 构建过的资源从内存发送，带长期缓存；没有构建过的从 static 目录读取
+    return static_assets.send(path)
 
 from socket_events import *
+import lobby
 from console_commands import process_command
 
 @app.route('/test')
 def test():
     return "服务器正常运行"
 
+@app.route('/metrics')
+def get_metrics():
+    # Prometheus 抓取的监控指标，见 metrics.py
+    from metrics import render
+    return Response(render(), mimetype='text/plain; version=0.0.4; charset=utf-8')
+
 def console_input():
-    print("控制台输入线程已启动")
+    console_logger.info("控制台输入线程已启动")
     while True:
         # 使用 select 来检查是否有输入，设置超时为 0.1 秒
         ready, _, _ = select.select([sys.stdin], [], [], 0.1)
         if ready:
             command = sys.stdin.readline().strip()
             if command:
-                print(f"收到命令: {command}")
+                console_logger.info("收到命令: %s", command)
                 process_command(command)
         else:
             # 如果没有输入，让出 CPU 时间片
@@ -52,6 +80,6 @@ if __name__ == '__main__':
     try:
         socketio.run(app, host='0.0.0.0', port=25000, debug=False)
     except KeyboardInterrupt:
-        print("正在关闭服务器...")
+        console_logger.info("正在关闭服务器...")
     finally:
         socketio.stop()
\ No newline at end of file
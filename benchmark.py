@@ -0,0 +1,237 @@
+'''
+服务器热点路径的基准测试
+
+不启动服务器，用 FakeSocketIO 代替真正的 socketio，直接驱动 game_logic.update_game / send_game_state，
+以及 reflect_laser、process_laser、respawn_player、generate_walls。所有场景都用固定的随机种子，结果可以重复。
+每个场景报告每秒 tick 数、各阶段耗时（p50 / p99 微秒）、每个 tick 新分配的内存（tracemalloc 的峰值增量）
+和发送的字节数，结果可以保存成 JSON，和其他提交的结果对比。
+
+用法:
+    python benchmark.py                                  # 运行所有场景
+    python benchmark.py --ticks 300 --output before.json
+    python benchmark.py --output after.json --compare before.json
+'''
+import argparse
+import json
+import math
+import random
+import subprocess
+import time
+import tracemalloc
+import app  # 先初始化 Flask 应用和 socket 事件，game_logic 依赖它
+import game_logic
+from game_state import GAME_UPDATE_RATE, BULLET_SPEED
+from rooms import Room
+from simulation import reflect_laser
+from entities import Laser
+from tick_stats import TickStats
+
+TANK_COUNTS = (2, 8, 32)
+BULLET_COUNTS = (0, 100, 1000)
+BOT_COUNT = 50
+
+
+class FakeSocketIO:
+    '''代替 socketio，只统计发送的消息数和字节数'''
+
+    def __init__(self):
+        self.messages = 0
+        self.bytes = 0
+
+    def emit(self, event, data=None, to=None, namespace=None):
+        recipients = len(to) if isinstance(to, list) else 1
+        self.messages += recipients
+        if isinstance(data, (bytes, bytearray)):
+            self.bytes += len(data) * recipients
+
+
+def make_room(tanks, seed, bots=0):
+    room = Room('bench', 'bench', max_players=tanks + bots, seed=seed)
+    room.generate_walls()
+    for i in range(tanks):
+        player_id = f'tank{i}'
+        room.add_player(player_id, player_id, f'#{random.Random(i).randint(0, 0xFFFFFF):06x}')
+        room.snapshot_channel.add_client(player_id)
+    for i in range(bots):
+        player_id = f'bot{i}'
+        room.add_player(player_id, player_id, f'#{random.Random(i).randint(0, 0xFFFFFF):06x}')
+        room.ai.add(player_id)
+    return room
+
+
+def fill_bullets(room, count, rng):
+    # 补充子弹到目标数量，位置在迷宫范围内随机
+    maze = room.maze_info
+    while room.bullets.count < count:
+        room.bullets.add(rng.uniform(maze['offset_x'], maze['offset_x'] + maze['width']),
+                         rng.uniform(maze['offset_y'], maze['offset_y'] + maze['height']),
+                         rng.uniform(0, 2 * math.pi), 'bench', BULLET_SPEED)
+
+
+def scripted_inputs(room, rng, fire_chance):
+    for player_id in room.players:
+        if player_id in room.ai.bots:
+            continue
+        if rng.random() < 0.1:
+            room.inputs.push(player_id, {'type': 'move', 'moving': rng.choice([0, 1]), 'rotating': rng.choice([-1, 0, 1])})
+        if rng.random() < fire_chance:
+            room.inputs.push(player_id, {'type': 'fire'})
+
+
+def run_ticks(room, rng, ticks, bullets, lasers, trace):
+    '''按固定步长运行 ticks 步，每步都广播状态，客户端一步之后确认快照；trace 为 True 时返回累计新分配的字节数'''
+    step = 1 / GAME_UPDATE_RATE
+    allocated = 0
+    for _ in range(ticks):
+        fill_bullets(room, bullets, rng)
+        if lasers:
+            # 激光场景：所有坦克一直拥有激光并且每步都开火
+            for player in room.players.values():
+                player.laser_end_time = room.time + 1
+        scripted_inputs(room, rng, 1.0 if lasers else 0.05)
+        for player_id, player in room.players.items():
+            if not player.alive:
+                room.respawn_player(player_id)
+
+        if trace:
+            before = tracemalloc.get_traced_memory()[0]
+            tracemalloc.reset_peak()
+        started = time.perf_counter()
+        game_logic.update_game(room, step)
+        game_logic.tick_stats.record('update', time.perf_counter() - started)
+        game_logic.send_game_state(room)
+        if trace:
+            allocated += tracemalloc.get_traced_memory()[1] - before
+        game_logic.tick_stats.ticks += 1
+
+        for sid in room.snapshot_channel.baselines:
+            room.snapshot_channel.ack(sid, room.snapshot_channel.seq)
+    return allocated
+
+
+def run_tick_scenario(tanks, bullets, ticks, seed, lasers=False, bots=0):
+    '''
+    计时和统计内存分开运行：tracemalloc 会明显拖慢计时，所以内存分配用另一个同样种子的房间、较少的步数单独测
+    '''
+    fake = FakeSocketIO()
+    stats = TickStats(window=ticks)
+    game_logic.socketio = fake
+    game_logic.tick_stats = stats
+
+    random.seed(seed)  # AI 的决定用全局的 random
+    started = time.perf_counter()
+    run_ticks(make_room(tanks, seed, bots), random.Random(seed), ticks, bullets, lasers, trace=False)
+    elapsed = time.perf_counter() - started
+    summary = stats.summary()
+    bytes_per_tick = fake.bytes / ticks
+    messages_per_tick = fake.messages / ticks
+
+    trace_ticks = min(ticks, 100)
+    game_logic.tick_stats = TickStats(window=trace_ticks)
+    tracemalloc.start()
+    random.seed(seed)
+    allocated = run_ticks(make_room(tanks, seed, bots), random.Random(seed), trace_ticks, bullets, lasers, trace=True)
+    tracemalloc.stop()
+
+    return {
+        'ticks_per_sec': round(ticks / elapsed, 1),
+        'update': summary['update'],
+        'serialize': summary['serialize'],
+        'emit': summary['emit'],
+        'alloc_kib_per_tick': round(allocated / trace_ticks / 1024, 2),
+        'bytes_per_tick': round(bytes_per_tick, 1),
+        'messages_per_tick': round(messages_per_tick, 2),
+    }
+
+
+def time_calls(function, repeat):
+    # 重复调用 function，返回 p50 / p99 微秒
+    stats = TickStats(window=repeat)
+    for _ in range(repeat):
+        started = time.perf_counter()
+        function()
+        stats.record('update', time.perf_counter() - started)
+    return stats.summary()['update']
+
+
+def run_micro_benchmarks(repeat, seed):
+    room = make_room(8, seed)
+    rng = random.Random(seed)
+    laser = Laser(0, 600, 400, 0.0, 'tank0', 0)
+
+    def cast_laser():
+        laser.angle = rng.uniform(0, 2 * math.pi)
+        reflect_laser(laser, room.wall_grid)
+
+    return {
+        'generate_walls': time_calls(room.generate_walls, repeat),
+        'respawn_player': time_calls(lambda: room.respawn_player('tank0'), repeat),
+        'reflect_laser': time_calls(cast_laser, repeat),
+        'process_laser': time_calls(lambda: room.process_laser(reflect_laser(laser, room.wall_grid)), repeat),
+    }
+
+
+def git_revision():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True).stdout.strip()
+    except OSError:
+        return ''
+
+
+def run_all(ticks, repeat, seed):
+    results = {'revision': git_revision(), 'ticks': ticks, 'seed': seed, 'scenarios': {}}
+    for tanks in TANK_COUNTS:
+        for bullets in BULLET_COUNTS:
+            name = f'{tanks}_tanks_{bullets}_bullets'
+            results['scenarios'][name] = run_tick_scenario(tanks, bullets, ticks, seed)
+            print_scenario(name, results['scenarios'][name])
+    results['scenarios']['8_tanks_laser_spam'] = run_tick_scenario(8, 0, ticks, seed, lasers=True)
+    print_scenario('8_tanks_laser_spam', results['scenarios']['8_tanks_laser_spam'])
+    name = f'2_tanks_{BOT_COUNT}_bots'
+    results['scenarios'][name] = run_tick_scenario(2, 0, ticks, seed, bots=BOT_COUNT)
+    print_scenario(name, results['scenarios'][name])
+    results['micro'] = run_micro_benchmarks(repeat, seed)
+    for name, timing in results['micro'].items():
+        print(f"{name:<28} p50={timing['p50_us']}µs p99={timing['p99_us']}µs")
+    return results
+
+
+def print_scenario(name, result):
+    print(f"{name:<28} {result['ticks_per_sec']:>9} ticks/s  "
+          f"update p50={result['update']['p50_us']}µs p99={result['update']['p99_us']}µs  "
+          f"serialize p50={result['serialize']['p50_us']}µs  emit p50={result['emit']['p50_us']}µs  "
+          f"alloc={result['alloc_kib_per_tick']}KiB/tick  {result['bytes_per_tick']}B/tick")
+
+
+def compare(results, baseline):
+    # 和之前保存的结果对比每秒 tick 数和 update p50
+    print(f"\n对比 {baseline.get('revision', '?')} -> {results['revision']}")
+    for name, result in results['scenarios'].items():
+        old = baseline.get('scenarios', {}).get(name)
+        if not old:
+            continue
+        change = (result['ticks_per_sec'] - old['ticks_per_sec']) / old['ticks_per_sec'] * 100
+        print(f"{name:<28} ticks/s {old['ticks_per_sec']} -> {result['ticks_per_sec']} ({change:+.1f}%)  "
+              f"update p50 {old['update']['p50_us']} -> {result['update']['p50_us']}µs")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='服务器热点路径的基准测试')
+    parser.add_argument('--ticks', type=int, default=600, help='每个场景运行的步数')
+    parser.add_argument('--repeat', type=int, default=200, help='单个函数的重复次数')
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--output', help='把结果保存成 JSON')
+    parser.add_argument('--compare', help='和之前保存的 JSON 结果对比')
+    args = parser.parse_args()
+
+    results = run_all(args.ticks, args.repeat, args.seed)
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2, ensure_ascii=False)
+    if args.compare:
+        with open(args.compare) as f:
+            compare(results, json.load(f))
+
+
+if __name__ == '__main__':
+    main()
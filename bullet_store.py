@@ -0,0 +1,185 @@
+import math
+import numpy as np
+from spatial_index import slab_times
+from entities import EntityIds
+
+SKIN = 1e-3  # 子弹停在碰撞点之前的距离（像素）
+
+
+class BulletStore:
+    '''
+    子弹的结构化数组存储（struct-of-arrays）
+
+    每一列是一个 NumPy 数组，前 count 个元素是存活的子弹。
+    每帧的移动、撞墙反弹、击中坦克检测和越界清理都按整批数组计算，
+    删除子弹时用末尾的子弹填补空位（swap-remove），不需要挪动整个数组。
+    子弹的 ID 是 EntityIds 分配的带代数的 ID，销毁后槽位重新使用也不会和旧子弹混淆。
+    '''
+
+    def __init__(self, capacity=256):
+        self.count = 0
+        self.entity_ids = EntityIds()
+        self.owner_ids = []  # 发射者在 owner 列中的索引 -> 玩家ID
+        self.owner_index = {}  # 玩家ID -> 索引
+        self.segments = []  # 上一次 advance 中每颗子弹扫过的线段
+        self._allocate(capacity)
+
+    def _allocate(self, capacity):
+        self.x = np.zeros(capacity)
+        self.y = np.zeros(capacity)
+        self.angle = np.zeros(capacity)
+        self.vx = np.zeros(capacity)
+        self.vy = np.zeros(capacity)
+        self.bounces = np.zeros(capacity, dtype=np.int32)
+        self.owner = np.zeros(capacity, dtype=np.int32)
+        self.ids = np.zeros(capacity, dtype=np.int64)
+
+    @property
+    def columns(self):
+        return (self.x, self.y, self.angle, self.vx, self.vy, self.bounces, self.owner, self.ids)
+
+    def __len__(self):
+        return self.count
+
+    def _grow(self):
+        old_columns = self.columns
+        n = self.count
+        self._allocate(len(self.x) * 2)
+        for new, old in zip(self.columns, old_columns):
+            new[:n] = old[:n]
+
+    def add(self, x, y, angle, owner, speed):
+        if self.count == len(self.x):
+            self._grow()
+        if owner not in self.owner_index:
+            self.owner_index[owner] = len(self.owner_ids)
+            self.owner_ids.append(owner)
+        i = self.count
+        self.x[i] = x
+        self.y[i] = y
+        self.angle[i] = angle
+        self.vx[i] = math.cos(angle) * speed
+        self.vy[i] = math.sin(angle) * speed
+        self.bounces[i] = 0
+        self.owner[i] = self.owner_index[owner]
+        self.ids[i] = self.entity_ids.create()
+        self.count += 1
+        return i
+
+    def clear(self):
+        self.entity_ids.clear()
+        self.count = 0
+        self.segments = []
+        self.owner_ids = []
+        self.owner_index = {}
+
+    def owner_of(self, i):
+        return self.owner_ids[self.owner[i]]
+
+    def advance(self, wall_grid, radius, frames=1.0, max_bounces_per_step=4):
+        '''
+        所有子弹前进 frames 帧（连续碰撞检测），速度是每帧的位移
+
+        每颗子弹沿速度方向扫过这一帧的位移，用 wall_grid.first_segment_hits 求出最先碰到的墙和碰撞时刻，
+        移动到碰撞点后按撞到的面反射速度，剩下的位移继续前进，一帧内最多反弹 max_bounces_per_step 次，
+        所以子弹速度再快也不会穿墙。位移超过一个格子时拆成几段分别检测。
+        起点已经在墙里的子弹（例如贴着墙开火）保持原来的处理：不移动，按墙的朝向反射。
+        这一帧经过的线段保存在 segments 里，供 tank_hits 做扫掠检测。
+        '''
+        n = self.count
+        self.segments = []
+        if n == 0:
+            return
+        x = self.x[:n]
+        y = self.y[:n]
+        vx = self.vx[:n]
+        vy = self.vy[:n]
+
+        turned = np.zeros(n, dtype=bool)  # 这一帧改变了方向的子弹
+
+        stuck_wall = wall_grid.first_circle_hits(x, y, radius)
+        stuck = np.flatnonzero(stuck_wall >= 0)
+        turned[stuck] = True
+        if len(stuck):
+            horizontal = wall_grid.horizontal[stuck_wall[stuck]]
+            vy[stuck[horizontal]] *= -1
+            vx[stuck[~horizontal]] *= -1
+            self.bounces[stuck] += 1
+
+        substeps = max(1, math.ceil(max(np.abs(vx).max(), np.abs(vy).max()) * frames / wall_grid.cell_size))
+        free = np.flatnonzero(stuck_wall < 0)
+        for _ in range(substeps):
+            active = free
+            remaining = np.full(len(active), frames / substeps)
+            for _ in range(max_bounces_per_step + 1):
+                if len(active) == 0:
+                    break
+                start_x = x[active]
+                start_y = y[active]
+                dx = vx[active] * remaining
+                dy = vy[active] * remaining
+                wall, t, side = wall_grid.first_segment_hits(start_x, start_y, dx, dy, radius)
+                hit = wall >= 0
+                # 停在碰撞点前 SKIN 像素，避免下一段从墙的表面出发
+                t = np.where(hit, np.maximum(t - SKIN / np.maximum(np.hypot(dx, dy), 1e-9), 0), 1)
+                x[active] = start_x + dx * t
+                y[active] = start_y + dy * t
+                self.segments.append((active, start_x, start_y, x[active], y[active]))
+
+                bounced = active[hit]
+                vx[bounced[side[hit]]] *= -1
+                vy[bounced[~side[hit]]] *= -1
+                self.bounces[bounced] += 1
+                turned[bounced] = True
+                remaining = (remaining * (1 - t))[hit]
+                active = bounced
+
+        self.angle[:n][turned] = np.arctan2(vy[turned], vx[turned])
+
+    def tank_hits(self, tank_positions, half_width, half_height, radius):
+        '''
+        返回与坦克相交的 (子弹索引, 坦克索引) 列表，按子弹索引排序，同一颗子弹按击中的先后排列
+
+        tank_positions 是 [(x, y), ...]，坦克按外扩 radius 的轴对齐矩形处理。
+        检测的是子弹这一帧扫过的每一段线段（见 advance），不会因为速度快而错过坦克。
+        '''
+        n = self.count
+        if n == 0 or not tank_positions:
+            return []
+        tanks = np.asarray(tank_positions, dtype=float)
+        segments = self.segments or [(np.arange(n), self.x[:n], self.y[:n], self.x[:n], self.y[:n])]
+        found = []
+        for order, (idx, start_x, start_y, end_x, end_y) in enumerate(segments):
+            dx = (end_x - start_x)[:, None]
+            dy = (end_y - start_y)[:, None]
+            enter_x, exit_x = slab_times(start_x[:, None], dx, tanks[:, 0] - half_width - radius, tanks[:, 0] + half_width + radius)
+            enter_y, exit_y = slab_times(start_y[:, None], dy, tanks[:, 1] - half_height - radius, tanks[:, 1] + half_height + radius)
+            enter = np.maximum(enter_x, enter_y)
+            hits = (enter <= np.minimum(exit_x, exit_y)) & (enter <= 1) & (np.minimum(exit_x, exit_y) >= 0)
+            bullet, tank = np.nonzero(hits)
+            found.extend(zip(idx[bullet].tolist(), [order] * len(bullet), np.maximum(enter[bullet, tank], 0).tolist(), tank.tolist()))
+        found.sort()
+        return [(bullet, tank) for bullet, _, _, tank in found]
+
+    def expired(self, max_bounces, width, height):
+        # 反弹次数过多或飞出游戏区域的子弹
+        n = self.count
+        x = self.x[:n]
+        y = self.y[:n]
+        return (self.bounces[:n] >= max_bounces) | (x < 0) | (x > width) | (y < 0) | (y > height)
+
+    def remove(self, dead):
+        '''按布尔掩码删除子弹，用末尾存活的子弹填补前面的空位'''
+        n = self.count
+        dead_idx = np.flatnonzero(dead[:n])
+        if len(dead_idx) == 0:
+            return
+        for entity_id in self.ids[dead_idx].tolist():
+            self.entity_ids.destroy(entity_id)
+        new_count = n - len(dead_idx)
+        holes = dead_idx[dead_idx < new_count]
+        movers = np.flatnonzero(~dead[new_count:n]) + new_count
+        for column in self.columns:
+            column[holes] = column[movers]
+        self.count = new_count
+        self.segments = []  # 下标已经变了
@@ -1,70 +1,81 @@
-from game_state import players, bullets, crystals
+from game_state import tick_stats, BULLET_SPEED, DEFAULT_ROOM_ID
+import logging
 import random
-import math
-from ai_player import AIPlayer
-import time
+from rooms import rooms, get_room, list_rooms
+from game_log import set_level
 
-ai_players = {}
+# 控制台命令的输出不限流，见 game_log.py
+logger = logging.getLogger('game.console')
 
-def spawn_crystal(x, y):
-    crystals.append({
-        'x': x,
-        'y': y,
-        'spawn_time': time.time()
-    })
-    print(f"水晶已生成在 ({x}, {y})")
+def spawn_crystal(room, x, y):
+    room.add_crystal(x, y)
+    room.replay.mark_dirty()
+    logger.info("水晶已生成在 (%s, %s)", x, y)
 
 def kill_player(player_id):
-    if player_id in players:
-        players[player_id]['alive'] = False
-        print(f"玩家 {player_id} 已被击杀")
-    else:
-        print(f"找不到玩家 {player_id}")
+    for room in rooms.values():
+        if player_id in room.players:
+            room.players[player_id].alive = False
+            room.replay.mark_dirty()
+            logger.info("玩家 %s 已被击杀", player_id)
+            return
+    logger.warning("找不到玩家 %s", player_id)
 
-def spawn_bullet(x, y, angle):
-    bullets.append({
-        'x': x,
-        'y': y,
-        'angle': angle,
-        'owner': 'console',
-        'bounces': 0
-    })
-    print(f"子弹已生成在 ({x}, {y})，角度为 {angle}")
+def spawn_bullet(room, x, y, angle):
+    room.bullets.add(x, y, angle, 'console', BULLET_SPEED)
+    room.replay.mark_dirty()
+    logger.info("子弹已生成在 (%s, %s)，角度为 %s", x, y, angle)
 
-def spawn_bot(name):
-    from game_logic import respawn_player
+def spawn_bot(room, name):
     bot_id = f"bot_{name}"
-    if bot_id not in players:
-        players[bot_id] = {
-            'x': random.randint(0, 1200),
-            'y': random.randint(0, 800),
-            'angle': random.uniform(0, 2*math.pi),
-            'turret_angle': 0,
-            'color': f'#{random.randint(0, 0xFFFFFF):06x}',
-            'alive': True,
-            'name': name,
-            'moving': 0,
-            'rotating': 0,
-        }
-        respawn_player(bot_id)
-        ai_players[bot_id] = AIPlayer(bot_id)
-        print(f"AI玩家 {name} 已生成")
+    if bot_id not in room.players:
+        room.add_player(bot_id, name, f'#{random.randint(0, 0xFFFFFF):06x}')
+        room.ai.add(bot_id)
+        room.replay.mark_dirty()
+        logger.info("AI玩家 %s 已生成", name)
     else:
-        print(f"AI玩家 {name} 已存在")
+        logger.warning("AI玩家 %s 已存在", name)
+
+def command_room(parts, argc):
+    # 命令的最后一个可选参数是房间ID，不写时使用默认房间
+    room_id = parts[argc] if len(parts) > argc else DEFAULT_ROOM_ID
+    room = get_room(room_id)
+    if room is None:
+        logger.warning("找不到房间 %s", room_id)
+    return room
 
 def process_command(command):
     parts = command.split()
     if not parts:
         return
 
-    if parts[0] == '/spawncrystal' and len(parts) == 3:
-        spawn_crystal(float(parts[1]), float(parts[2]))
+    if parts[0] == '/spawncrystal' and len(parts) in (3, 4):
+        room = command_room(parts, 3)
+        if room:
+            spawn_crystal(room, float(parts[1]), float(parts[2]))
     elif parts[0] == '/killplayer' and len(parts) == 2:
         kill_player(parts[1])
-    elif parts[0] == '/spawnbullet' and len(parts) == 4:
-        spawn_bullet(float(parts[1]), float(parts[2]), float(parts[3]))
-    elif parts[0] == '/spawnbot' and len(parts) == 2:
-        spawn_bot(parts[1])
-        print(f"尝试生成 AI 玩家: {parts[1]}")  # 添加这行来确认命令被处理
+    elif parts[0] == '/spawnbullet' and len(parts) in (4, 5):
+        room = command_room(parts, 4)
+        if room:
+            spawn_bullet(room, float(parts[1]), float(parts[2]), float(parts[3]))
+    elif parts[0] == '/tickstats' and len(parts) == 1:
+        logger.info(tick_stats.format_summary())
+    elif parts[0] == '/rooms' and len(parts) == 1:
+        for summary in list_rooms():
+            logger.info("%s %s 玩家: %s/%s 进行中: %s", summary['id'], summary['name'], summary['players'],
+                        summary['max_players'], summary['running'])
+    elif parts[0] == '/spawnbot' and len(parts) in (2, 3):
+        room = command_room(parts, 2)
+        if room:
+            spawn_bot(room, parts[1])
+            logger.info("尝试生成 AI 玩家: %s", parts[1])  # 添加这行来确认命令被处理
+    elif parts[0] == '/loglevel' and len(parts) in (2, 3):
+        # /loglevel 级别 [类别]，例如 /loglevel DEBUG game.ai
+        category = parts[2] if len(parts) == 3 else 'game'
+        if set_level(parts[1], category):
+            logger.info("%s 的日志级别改为 %s", category, parts[1].upper())
+        else:
+            logger.warning("无效的日志级别 %s", parts[1])
     else:
-        print("无效的命令")
\ No newline at end of file
+        logger.warning("无效的命令")
\ No newline at end of file
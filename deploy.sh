@@ -45,22 +45,26 @@ chmod +x deploy.sh
 # 安装或更新依赖
 pip install -r requirements.txt
 
+# 构建静态资源：带哈希的文件名和 gzip / brotli 压缩版本（brotli 是可选的，pip install brotli）
+python static_assets.py
+
 # 检查并关闭已运行的gunicorn进程
-if pgrep -f "gunicorn.*wsgi:app" > /dev/null; then
+if pgrep -f "workers.py|gunicorn.*wsgi:app" > /dev/null; then
     echo "发现正在运行的gunicorn进程，正在关闭..."
-    pkill -f "gunicorn.*wsgi:app"
+    pkill -f "workers.py" || true
+    pkill -f "gunicorn.*wsgi:app" || true
     sleep 2  # 等待进程完全关闭
 fi
 
-# 获取 gunicorn 的完整路径
-GUNICORN_PATH="$VENV_NAME/bin/gunicorn"
+# 游戏进程数量，每个进程负责一部分房间，监听 25000、25001……
+WORKER_COUNT=${WORKER_COUNT:-1}
 
 # 启动 gunicorn
-echo "启动 gunicorn..."
-nohup $GUNICORN_PATH --worker-class eventlet -w 1 wsgi:app &
+echo "启动 $WORKER_COUNT 个 gunicorn 进程..."
+WORKER_COUNT=$WORKER_COUNT nohup $VENV_NAME/bin/python workers.py &
 
 echo "部署完成，gunicorn 已启动"
 
 # 注意：此脚本不会自动退出虚拟环境，因为 gunicorn 会在前台运行
 # 如果您想在后台运行 gunicorn，可以在命令前加上 nohup，并在命令后加上 &
-# 例如：nohup $GUNICORN_PATH --worker-class eventlet -w 1 wsgi:app > gunicorn.log 2>&1 &
\ No newline at end of file
+# 例如：WORKER_COUNT=4 nohup $VENV_NAME/bin/python workers.py > gunicorn.log 2>&1 &
\ No newline at end of file
@@ -0,0 +1,171 @@
+'''
+不阻塞游戏循环的日志
+
+各模块照常用 logging.getLogger('game.<类别>') 记录日志。setup_logging 在根 logger 上装一个 RingHandler：
+记录时只做限流和采样，然后把 LogRecord 追加到内存里的环形缓冲区，不格式化也不写文件。
+后台的 writer_loop 每隔 LOG_FLUSH_INTERVAL 秒取走缓冲区，格式化之后在 eventlet 的线程池里写到标准输出，
+游戏循环和事件处理函数不会等待磁盘（nohup 时标准输出就是磁盘上的文件）。
+
+限流和采样按类别（logger 名字）配置，见 game_state.LOG_RATE_LIMITS：每秒最多多少条，以及 WARNING 以下的记录保留几分之一。
+被丢弃的条数会定期汇总输出，并记到 /metrics 的 tank_log_dropped_total。缓冲区满了时丢弃最旧的记录。
+日志级别可以在控制台用 /loglevel 随时修改。没有运行 writer_loop 的进程里每条记录马上同步写出。
+'''
+import atexit
+import logging
+import sys
+import time
+from collections import deque
+from eventlet import tpool
+from game_state import LOG_LEVEL, LOG_BUFFER_SIZE, LOG_FLUSH_INTERVAL, LOG_RATE_LIMITS
+from metrics import Counter
+
+LOG_FORMAT = '%(asctime)s %(levelname)s %(name)s: %(message)s'
+
+dropped_records = Counter('tank_log_dropped_total', '被限流、采样或者缓冲区溢出丢弃的日志条数', labels=('category',))
+
+logger = logging.getLogger('game.log')
+
+
+class RingHandler(logging.Handler):
+    '''
+    把日志记录放进环形缓冲区的 Handler
+
+    handle 只格式化消息本身（不含时间等前缀），不加锁：deque 的 append 本身是线程安全的，限流状态只是计数，偶尔多放过一条也没有关系。
+    '''
+
+    def __init__(self, capacity=LOG_BUFFER_SIZE, limits=LOG_RATE_LIMITS):
+        super().__init__()
+        self.records = deque(maxlen=capacity)
+        self.limits = limits  # 类别 -> (每秒最多条数, 采样比例)
+        self.buckets = {}  # 类别 -> [剩余条数, 上次补充的时间]，令牌桶
+        self.sampled = {}  # 类别 -> 已经收到的 WARNING 以下的记录数
+        self.dropped = {}  # 类别 -> 上次汇总之后丢弃的条数
+
+    def handle(self, record):
+        if self.accept(record):
+            self.prepare(record)
+            if len(self.records) == self.records.maxlen:
+                self.drop('overflow')
+            self.records.append(record)
+            if not writer_running:
+                # 没有后台写出（直接运行 app.py、工具、基准测试）时马上写出，和普通的 StreamHandler 一样
+                flush()
+        return True
+
+    def prepare(self, record):
+        # 和 QueueHandler.prepare 一样，马上把参数格式化进消息：参数可能是之后还会被游戏循环修改的字典、列表，
+        # 到写出时再格式化会显示错误的状态。异常的调用栈也先转成文字，记录里不再引用栈帧
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            if not record.exc_text:
+                record.exc_text = formatter.formatException(record.exc_info)
+            record.exc_info = None
+
+    def emit(self, record):
+        self.handle(record)
+
+    def accept(self, record):
+        limit = self.limits.get(record.name)
+        if limit is None:
+            return True
+        rate, sample = limit
+        category = record.name
+        if record.levelno < logging.WARNING and sample < 1:
+            # 按顺序每 1/sample 条留一条，不用随机数
+            count = self.sampled[category] = self.sampled.get(category, 0) + 1
+            if count % max(1, round(1 / sample)):
+                self.drop(category)
+                return False
+        now = time.monotonic()
+        bucket = self.buckets.get(category)
+        if bucket is None:
+            bucket = self.buckets[category] = [rate, now]
+        bucket[0] = min(rate, bucket[0] + (now - bucket[1]) * rate)
+        bucket[1] = now
+        if bucket[0] < 1:
+            self.drop(category)
+            return False
+        bucket[0] -= 1
+        return True
+
+    def drop(self, category):
+        self.dropped[category] = self.dropped.get(category, 0) + 1
+
+    def drain(self):
+        '''取走缓冲区里的记录和丢弃的条数'''
+        records = []
+        while self.records:
+            records.append(self.records.popleft())
+        dropped = self.dropped
+        self.dropped = {}
+        return records, dropped
+
+
+handler = None
+formatter = logging.Formatter(LOG_FORMAT)
+# writer_loop 是否在运行
+writer_running = False
+
+
+def setup_logging():
+    '''装上 RingHandler：游戏自己的日志按 LOG_LEVEL 记录，第三方库只记录 WARNING 以上'''
+    global handler
+    if handler is not None:
+        return
+    handler = RingHandler()
+    # 日志格式用不到线程和进程信息，不收集可以让创建一条记录快一些（见 logging 文档的 Optimization 一节）
+    logging.logThreads = False
+    logging.logProcesses = False
+    logging.logMultiprocessing = False
+    root = logging.getLogger()
+    root.addHandler(handler)
+    root.setLevel(logging.WARNING)
+    logging.getLogger('game').setLevel(LOG_LEVEL)
+    atexit.register(flush)
+
+
+def set_level(level, category='game'):
+    '''修改一个类别的日志级别，例如 set_level('DEBUG', 'game.ai')；级别不合法时返回 False'''
+    level = level.upper()
+    if not isinstance(logging.getLevelName(level), int):
+        return False
+    logging.getLogger(category).setLevel(level)
+    return True
+
+
+def write_lines(lines):
+    sys.stdout.write(lines)
+    sys.stdout.flush()
+
+
+def flush(execute=None):
+    '''格式化缓冲区里的记录并写出，execute 是执行写入的函数（tpool.execute），为 None 时直接写'''
+    if handler is None:
+        return
+    records, dropped = handler.drain()
+    lines = [formatter.format(record) for record in records]
+    for category, count in dropped.items():
+        dropped_records.labels(category).inc(count)
+        lines.append(formatter.format(logger.makeRecord(logger.name, logging.WARNING, __file__, 0,
+                                                        '%s 丢弃了 %d 条日志', (category, count), None)))
+    if not lines:
+        return
+    text = '\n'.join(lines) + '\n'
+    if execute is None:
+        write_lines(text)
+    else:
+        execute(write_lines, text)
+
+
+def writer_loop(sleep):
+    '''后台写出日志，sleep 是让出执行权的函数（socketio.sleep）'''
+    global writer_running
+    writer_running = True
+    while True:
+        sleep(LOG_FLUSH_INTERVAL)
+        try:
+            flush(tpool.execute)
+        except (OSError, ValueError):
+            # 标准输出已经关闭
+            pass
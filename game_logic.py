@@ -1,417 +1,201 @@
 from game_state import *
 from app import socketio
-import math
-import random
 import time
-from utils import circle_rectangle_collision, generate_maze,line_rectangle_intersection,line_rectangle_collision
-from msgpack import packb
-from flask_socketio import emit
+from wire_format import quantize_player, quantize_bullets, quantize_laser
 from threading import Thread
-from console_commands import ai_players
-
-def update_game():
-    global is_game_running, bullets, crystals, last_crystal_spawn_time, lasers
-    if not is_game_running:
-        check_game_state()
-    current_time = time.time()
-    
-    # 更新玩家位置和角度
-    for player_id, player in players.items():
-        if player['alive']:
-            # 更新位置
-            speed = TANK_SPEED * player['moving']
-            new_x = player['x'] + math.cos(player['angle']) * speed
-            new_y = player['y'] + math.sin(player['angle']) * speed
-            
-            # 更新角度
-            new_angle = player['angle'] + ROTATING_SPEED * player['rotating']
-            
-            # 确保角度在 0 到 2π 之间
-            new_angle %= 2 * math.pi
-            # 碰撞检测
-            tank_radius = max(TANK_WIDTH, TANK_HEIGHT) / 2 + 2
-            
-            if not any(circle_rectangle_collision(new_x, new_y, tank_radius, wall) for wall in walls):
-                player['x'] = new_x
-                player['y'] = new_y
-                player['angle'] = new_angle
-
-    # 更新水晶
-    if is_game_running and not crystals and current_time - last_crystal_spawn_time >= CRYSTAL_SPAWN_INTERVAL:
-        spawn_crystal()
-    
-    crystals_to_remove = []
-    for crystal in crystals:
-        if 'spawn_time' not in crystal:
-            crystal['spawn_time'] = current_time  # 如果没有spawn_time，添加一个
-        if current_time - crystal['spawn_time'] >= CRYSTAL_LIFETIME:
-            crystals_to_remove.append(crystal)
-    
-    for crystal in crystals_to_remove:
-        crystals.remove(crystal)
-    
-    # 检查玩家是否接触到水晶
-    for player_id, player in players.items():
-        if player['alive']:
-            for crystal in crystals:
-                if math.hypot(player['x'] - crystal['x'], player['y'] - crystal['y']) < TANK_WIDTH/2 + CRYSTAL_RADIUS:
-                    player['laser_end_time'] = current_time + LASER_DURATION
-                    crystals.remove(crystal)
-                    socketio.emit('crystal_collected', {'x': crystal['x'], 'y': crystal['y']}, namespace='/')
-                    break
-
-    bullets_to_remove = []
-    for bullet in bullets:
-        speed = BULLET_SPEED
-        dx = math.cos(bullet['angle']) * speed
-        dy = math.sin(bullet['angle']) * speed
-        
-        # 单点碰撞检测
-        new_x = bullet['x'] + dx
-        new_y = bullet['y'] + dy
-        
-        collision = False
-        for wall in walls:
-            if circle_rectangle_collision(new_x, new_y, 2, wall):
-                collision = True
-                reflect_bullet(bullet, wall)
-                bullet['bounces'] += 1
-                break
-        
-        if not collision:
-            bullet['x'] = new_x
-            bullet['y'] = new_y
-        
-        # 检查玩家碰撞
-        for player_id, player in players.items():
-            if player['alive']:
-                if circle_rectangle_collision(bullet['x'], bullet['y'], 3, {
-                    'x': player['x'] - TANK_WIDTH/2,
-                    'y': player['y'] - TANK_HEIGHT/2,
-                    'width': TANK_WIDTH,
-                    'height': TANK_HEIGHT
-                }):
-                    player['alive'] = False
-                    bullets_to_remove.append(bullet)
-                    socketio.emit('player_killed', {'id': player_id, 'x': player['x'], 'y': player['y']}, namespace='/')
-                    game_over, winner = check_winner()
-                    if game_over:
-                        socketio.emit('game_over', {'winner': winner['name'], 'wins': wins}, namespace='/')
-                    break
-        
-        # 检查子弹是否超出游戏区域或反弹次数过多
-        if bullet['bounces'] >= 10 or not (0 <= bullet['x'] <= GAME_WIDTH and 0 <= bullet['y'] <= GAME_HEIGHT):
-            bullets_to_remove.append(bullet)
-    
-    # 移除需要删除的子弹
-    for bullet in bullets_to_remove:
-        if bullet in bullets:
-            bullets.remove(bullet)
-    
-    # 更新激光
-    lasers_to_remove = []
-    for laser in lasers:
-        if current_time - laser['creation_time'] > LASER_EXPIRATION_TIME:  # 激光持续时间为0.1秒
-            lasers_to_remove.append(laser)
-        hit_players = process_laser(laser)
-        for player_id in hit_players:
-            if players[player_id]['alive']:
-                players[player_id]['alive'] = False
-                socketio.emit('player_killed', {'id': player_id, 'x': players[player_id]['x'], 'y': players[player_id]['y']}, namespace='/')
-                game_over, winner = check_winner()
-                if game_over:
-                    socketio.emit('game_over', {'winner': winner['name'], 'wins': wins}, namespace='/')
-                    break
-
-    # 移除过期的激光
-    for laser in lasers_to_remove:
-        lasers.remove(laser)
-
-    # 更新 AI 玩家
-    for ai_player in list(ai_players.values()):
-        if ai_player.player_id in players and players[ai_player.player_id]['alive']:
-            ai_player.update()
+from rooms import active_rooms, close_idle_rooms, rooms
+from replay import writer_loop
+from maze_pool import maze_pool
+import game_log
+import metrics
+from metrics import Gauge
+
+# 只和位置有关的事件，只发给兴趣范围覆盖事件位置的客户端
+POSITIONAL_EVENTS = ('player_killed', 'crystal_spawned', 'crystal_collected')
+
+def update_game(room, dt=1 / GAME_UPDATE_RATE):
+    # AI 玩家先操作坦克，然后把这一步收到的输入交给模拟
+    room.ai.update(room.tick)
+    commands = room.inputs.drain(room.time, room.tick)
+    room.replay.record(room, commands)
+    emit_events(room, room.step(commands, dt))
+
+def emit_events(room, events):
+    # 把模拟产生的事件发给房间里的客户端
+    for event, data in events:
+        if event in POSITIONAL_EVENTS:
+            emit_near(room, event, data, data['x'], data['y'])
         else:
-            del ai_players[ai_player.player_id]
-
-def send_game_state():
-    game_state = {
-        'players': {id: {
-            'x': p['x'], 
-            'y': p['y'], 
-            'angle': p['angle'], 
-            'alive': p['alive'],
-            'color': p['color'],
-            'name': p['name'],
-            'has_laser': time.time() <= p.get('laser_end_time', 0)  # 检查玩家是否拥有激光武器。通过比较当前时间和激光结束时间来判断。
-        } for id, p in players.items()},
-        'bullets': [{'x': b['x'], 'y': b['y'], 'angle': b['angle'], 'speed': 5, 'id': id(b)} for b in bullets],
-        'crystals': [{'x': c['x'], 'y': c['y'], 'spawn_time': c['spawn_time']} for c in crystals],
-        'lasers': [{'x': l['x'], 'y': l['y'], 'angle': l['angle'],'reflected_points':l['reflected_points']} for l in lasers],
+            socketio.emit(event, data, to=room.room_id, namespace='/')
+
+def capture_world(room):
+    # 把当前世界量化成 wire_format 使用的快照
+    slots = room.snapshot_channel.slots
+    slots.retain(room.players)
+    acks = room.inputs.acks
+    return {
+        'tick': room.tick,
+        'players': {id: quantize_player(p, slots.slot_for(id), room.has_laser(p), acks.get(id, (0, 0)))
+                    for id, p in room.players.items()},
+        'bullets': quantize_bullets(room.bullets),
+        'crystals': [(int(round(c.x)), int(round(c.y))) for c in room.crystals],
+        'lasers': [quantize_laser(l) for l in room.lasers],
     }
-    socketio.emit('game_state', packb(game_state), namespace='/')
+
+def emit_near(room, event, data, x, y):
+    # 只和位置有关的事件发给兴趣范围覆盖这个位置的客户端
+    if room.interest.radius is None:
+        socketio.emit(event, data, to=room.room_id, namespace='/')
+        return
+    sids = room.interest.sids_near(x, y)
+    if sids:
+        socketio.emit(event, data, to=sids, namespace='/')
+    if room.spectators:
+        # 观众看到的是整个场地
+        socketio.emit(event, data, to=room.spectator_room, namespace='/')
+
+def send_game_state(room):
+    # 每个客户端只收到自己兴趣范围内、相对于它已确认快照的增量，基线和兴趣格子相同的客户端共用一份数据
+    started = time.perf_counter()
+    channel = room.snapshot_channel
+    room.interest.update(channel.baselines, room.players)
+    payloads = channel.publish(capture_world(room), room.interest)
+    serialized = time.perf_counter()
+    for sids, payload in payloads:
+        socketio.emit('game_state', payload, to=sids, namespace='/')
+    record_phase('serialize', serialized - started)
+    record_phase('emit', time.perf_counter() - serialized)
+
+def send_spectator_state(room):
+    # 所有观众共用一份编码结果，整个观众房间只广播一次
+    if not room.spectators:
+        return
+    started = time.perf_counter()
+    payload = room.spectator_stream.publish(capture_world(room))
+    serialized = time.perf_counter()
+    if payload is not None:
+        socketio.emit('game_state', payload, to=room.spectator_room, namespace='/')
+    record_phase('serialize', serialized - started)
+    record_phase('emit', time.perf_counter() - serialized)
+
+def record_phase(phase, seconds):
+    # 循环耗时同时记到控制台的 tick_stats 和 /metrics
+    tick_stats.record(phase, seconds)
+    phase_seconds[phase].observe(seconds)
+
+phase_seconds = {phase: metrics.tick_phase_seconds.labels(phase) for phase in tick_stats.PHASES}
+
+def record_entities(running):
+    entities = metrics.tick_entities
+    entities.labels('players').set(sum(len(room.players) for room in running))
+    entities.labels('bullets').set(sum(room.bullets.count for room in running))
+    entities.labels('lasers').set(sum(len(room.lasers) for room in running))
+    entities.labels('crystals').set(sum(len(room.crystals) for room in running))
+
+def connected_clients():
+    return len(socketio.server.eio.sockets) if socketio.server else 0
+
+def player_latencies():
+    # 每个玩家当前的延迟，只包含在线的玩家，标签不会无限增长
+    return {(room.room_id, player_id): latency
+            for room in rooms.values() for player_id, latency in room.player_latencies.items()
+            if isinstance(latency, (int, float))}
+
+# 抓取时才读取的指标
+Gauge('tank_connected_clients', '当前连接的客户端数', function=connected_clients)
+Gauge('tank_rooms', '本进程负责的房间数', function=lambda: len(rooms))
+Gauge('tank_player_latency_ms', '每个玩家最近报告的延迟（毫秒）', labels=('room', 'player'), function=player_latencies)
 
 def start_game_loop():
-    update_counter = 0
+    '''
+    固定步长的游戏循环，一个循环负责所有有玩家的房间
+
+    按实际流逝的时间累积，每攒够 1/GAME_UPDATE_RATE 秒执行一次 update_game，
+    所以 update_game 变慢不会让模拟速度跟着变慢；落后太多时最多补跑 MAX_CATCH_UP_STEPS 步，
+    其余的步数丢弃并计入统计。状态广播按 GAME_STATE_SEND_RATE 单独累积，与模拟频率无关，
+    发给观众的广播按 SPECTATOR_SEND_RATE 累积。
+    '''
+    step = 1 / GAME_UPDATE_RATE
+    send_interval = 1 / GAME_STATE_SEND_RATE
+    spectator_interval = 1 / SPECTATOR_SEND_RATE
+    accumulator = 0
+    send_accumulator = 0
+    spectator_accumulator = 0
+    last_time = time.perf_counter()
+    last_report = last_time
     while True:
-        socketio.sleep(1/GAME_UPDATE_RATE)  # GAME_UPDATE_RATE FPS 的游戏逻辑
-        update_game()
-        update_counter += 1
-        if update_counter >= GAME_UPDATE_RATE/GAME_STATE_SEND_RATE:  # 每隔多少帧发送一次更新，相当于 GAME_STATE_SEND_RATE FPS
-            update_counter = 0
-            send_game_state()
+        now = time.perf_counter()
+        accumulator += now - last_time
+        last_time = now
+
+        steps = int(accumulator / step)
+        if steps > 1:
+            # 没能按时执行的步数
+            tick_stats.missed_deadlines += steps - 1
+            metrics.missed_steps.inc(steps - 1)
+        if steps > MAX_CATCH_UP_STEPS:
+            tick_stats.dropped_steps += steps - MAX_CATCH_UP_STEPS
+            metrics.dropped_steps.inc(steps - MAX_CATCH_UP_STEPS)
+            accumulator -= (steps - MAX_CATCH_UP_STEPS) * step
+            steps = MAX_CATCH_UP_STEPS
+
+        for _ in range(steps):
+            started = time.perf_counter()
+            running = active_rooms()
+            for room in running:
+                try:
+                    update_game(room, step)
+                except Exception:
+                    # 一个房间出错不能停掉整个循环，其他房间照常运行
+                    logger.exception("房间 %s 更新失败", room.room_id)
+            elapsed = time.perf_counter() - started
+            record_phase('update', elapsed)
+            if elapsed > step:
+                metrics.tick_overruns.inc()
+            tick_stats.ticks += 1
+            accumulator -= step
+            send_accumulator += step
+            spectator_accumulator += step
+
+        if steps:
+            record_entities(running)
+
+        if send_accumulator >= send_interval - 1e-9:
+            # 只发送最新的状态，落后的广播不补发
+            send_accumulator = max(0, send_accumulator - send_interval) % send_interval
+            for room in active_rooms():
+                try:
+                    send_game_state(room)
+                except Exception:
+                    logger.exception("房间 %s 发送状态失败", room.room_id)
+
+        if spectator_accumulator >= spectator_interval - 1e-9:
+            spectator_accumulator = max(0, spectator_accumulator - spectator_interval) % spectator_interval
+            for room in active_rooms():
+                try:
+                    send_spectator_state(room)
+                except Exception:
+                    logger.exception("房间 %s 发送观众状态失败", room.room_id)
+
+        if now - last_report >= TICK_STATS_REPORT_INTERVAL:
+            last_report = now
+            logger.info("游戏循环: %s", tick_stats.format_summary())
+            close_idle_rooms()
+
+        # 睡到下一步的预定时间
+        socketio.sleep(max(0, step - accumulator - (time.perf_counter() - last_time)))
 
 def run_game_loop():
     try:
         Thread(target=start_game_loop).start()
+        # 录像在后台写入磁盘
+        Thread(target=writer_loop, args=(socketio.sleep,), daemon=True).start()
+        # 后台预先生成迷宫
+        Thread(target=maze_pool.refill_loop, args=(socketio.sleep,), daemon=True).start()
+        # 日志也在后台写出
+        Thread(target=game_log.writer_loop, args=(socketio.sleep,), daemon=True).start()
     except Exception as e:
-        logger.error(f"Error starting game loop: {e}")
-        logger.exception("Exception details:")
-
-def check_game_state():
-    global is_game_running
-    if len(players) == 1:
-        socketio.emit('waiting_for_players', {'count': len(players)}, namespace='/')
-    elif len(players) > 1: 
-        socketio.emit('game_start', namespace='/')
-        is_game_running = True
-    else:
-        # 如果没有玩家，重置游戏状态
-        is_game_running = False
-
-
-
-# def reset_game():
-#     global players
-#     alive_players = [player for player in players.values() if player['alive']]
-#     if len(alive_players) <= 1:
-#         print('现有玩家：',alive_players)
-#         global bullets
-#         generate_walls()
-#         bullets.clear()
-#         crystals.clear()
-#         for player_id in list(players.keys()):
-#             respawn_player(player_id)
-#         socketio.emit('game_reset', {'walls': walls, 'players': players, 'maze_info': maze_info, 'wins': wins}, namespace='/')
-#         socketio.emit('rejoin_game', namespace='/')
-#     else:
-#         emit('rejoin_game', namespace='/')
-#         print('还有2名以上玩家存活，正在连接会话...')
-        
-def respawn_player(player_id):
-    '''
-    重生玩家的函数
-    
-    参数:
-    player_id (str): 需要重生的玩家ID
-    
-    功能:
-    1. 检查并确保迷宫信息存在
-    2. 计算迷宫的边界
-    3. 计算坦克的碰撞半径
-    4. 在迷宫内随机选择一个不与墙壁碰撞的位置
-    5. 更新玩家的位置、角度和存活状态
-    '''
-    global maze_info
-    if not maze_info:
-        generate_walls()  # 如果 maze_info 为空，重新生成墙壁
-    
-    maze_start_x = maze_info['offset_x']
-    maze_start_y = maze_info['offset_y']
-    maze_end_x = maze_start_x + maze_info['width']
-    maze_end_y = maze_start_y + maze_info['height']
-    
-    tank_radius = max(TANK_WIDTH, TANK_HEIGHT) / 2 + 2  # 坦克半径加上2px的安全距离
-    
-    while True:
-        x = random.randint(int(maze_start_x + tank_radius), int(maze_end_x - tank_radius))
-        y = random.randint(int(maze_start_y + tank_radius), int(maze_end_y - tank_radius))
-        
-        # 检查坦克的碰撞圆是否与任何墙壁重合
-        if not any(circle_rectangle_collision(x, y, tank_radius, wall) for wall in walls):
-            players[player_id].update({
-                'x': x,
-                'y': y,
-                'angle': random.uniform(0, 2*math.pi),  # 随机初始角度
-                'turret_angle': 0,
-                'alive': True
-            })
-            break
-
-def generate_walls():
-    global walls, maze_info
-    walls.clear()
-    maze = generate_maze(MAZE_WIDTH, MAZE_HEIGHT)
-   
-    
-    # 计算迷宫的实际大小
-    maze_actual_width = MAZE_WIDTH * GRID_SIZE
-    maze_actual_height = MAZE_HEIGHT * GRID_SIZE
-    
-    # 计算偏移量，使迷宫居中
-    offset_x = (GAME_WIDTH - maze_actual_width) // 2
-    offset_y = (GAME_HEIGHT - maze_actual_height) // 2
-    
-    # 生成迷宫墙壁
-    for y in range(MAZE_HEIGHT):
-        for x in range(MAZE_WIDTH):
-            if maze[y][x] == 1:
-                walls.append({
-                    'x': x * GRID_SIZE + offset_x,
-                    'y': y * GRID_SIZE + offset_y,
-                    'width': WALL_THICKNESS,
-                    'height': GRID_SIZE
-                })
-                walls.append({
-                    'x': x * GRID_SIZE + offset_x,
-                    'y': y * GRID_SIZE + offset_y,
-                    'width': GRID_SIZE,
-                    'height': WALL_THICKNESS
-                })
-    
-    # 添加游戏场地边界
-    walls.extend([
-        {'x': offset_x, 'y': offset_y, 'width': maze_actual_width, 'height': WALL_THICKNESS},  # 上边界
-        {'x': offset_x, 'y': offset_y + maze_actual_height - WALL_THICKNESS, 'width': maze_actual_width, 'height': WALL_THICKNESS},  # 下边界
-        {'x': offset_x, 'y': offset_y, 'width': WALL_THICKNESS, 'height': maze_actual_height},  # 左边界
-        {'x': offset_x + maze_actual_width - WALL_THICKNESS, 'y': offset_y, 'width': WALL_THICKNESS, 'height': maze_actual_height}  # 右边界
-    ])
-
-    # 将迷宫信息添加到全局变量中
-    maze_info.update({
-        'width': maze_actual_width,
-        'height': maze_actual_height,
-        'offset_x': offset_x,
-        'offset_y': offset_y
-    })
-    
-def reflect_bullet(bullet, wall):
-    # 计算墙壁的法线向量
-    if wall['width'] > wall['height']:  # 水平墙
-        normal = (0, 1)
-    else:  # 垂直墙
-        normal = (1, 0)
-    
-    # 计算入射向量
-    incident = (math.cos(bullet['angle']), math.sin(bullet['angle']))
-    
-    # 计算反射向量
-    dot_product = incident[0]*normal[0] + incident[1]*normal[1]
-    reflected = (
-        incident[0] - 2 * dot_product * normal[0],
-        incident[1] - 2 * dot_product * normal[1]
-    )
-    
-    # 更新子弹角度
-    bullet['angle'] = math.atan2(reflected[1], reflected[0])
-
-def check_winner():
-    alive_players = [p for p in players.values() if p['alive']]
-    if len(players) > 1 and len(alive_players) == 1:
-        winner = alive_players[0]
-        winner_id = next(id for id, player in players.items() if player == winner)
-        wins[winner_id] += 1
-        return True, winner
-    elif len(players) == 1:
-        socketio.emit('waiting_for_players', {'count': len(players)}, namespace='/')
-        return False, None
-    return False, None
-
-def spawn_crystal():
-    global crystals, last_crystal_spawn_time
-    
-    while True:
-        x = random.randint(maze_info['offset_x'], maze_info['offset_x'] + maze_info['width'] - CRYSTAL_RADIUS)
-        y = random.randint(maze_info['offset_y'], maze_info['offset_y'] + maze_info['height'] - CRYSTAL_RADIUS)
-        
-        # 检查是否与墙壁碰撞
-        if any(circle_rectangle_collision(x, y, CRYSTAL_RADIUS, wall) for wall in walls):
-            continue
-        
-        # 检查是否与坦克距离太近
-        if any(math.hypot(player['x'] - x, player['y'] - y) < TANK_CRYSTAL_MIN_DISTANCE for player in players.values()):
-            continue
-        
-        crystal = {
-            'x': x,
-            'y': y,
-            'spawn_time': time.time()  # 确保每个水晶都有spawn_time
-        }
-        crystals.append(crystal)
-        last_crystal_spawn_time = time.time()
-        socketio.emit('crystal_spawned', {'x': x, 'y': y}, namespace='/')
-        break
-
-def process_laser(laser):
-    hit_players = []
-    start_x, start_y = laser['x'], laser['y']
-    for end_x, end_y in laser['reflected_points']:
-        # 检查这条线段上是否有玩家被击中
-        for player_id, player in players.items():
-            if player['alive'] and player_id != laser['owner']:
-                if line_rectangle_collision(start_x, start_y, end_x, end_y, {
-                    'x': player['x'] - TANK_WIDTH/2,
-                    'y': player['y'] - TANK_HEIGHT/2,
-                    'width': TANK_WIDTH,
-                    'height': TANK_HEIGHT
-                }):
-                    hit_players.append(player_id)
-        
-        start_x, start_y = end_x, end_y
-    
-    return hit_players
-
-def reflect_laser(laser, walls):
-    reflected_points = []
-    current_x, current_y = laser['x'], laser['y']
-    angle = laser['angle'] 
-    
-    for i in range(REFLECTION_TIMES):
-        dx = math.cos(angle)
-        dy = math.sin(angle)
-        
-        min_distance = float('inf')
-        collision_point = None
-        collision_wall = None
-        
-        # 检查与所有墙壁的交点
-        for wall in walls:
-            intersection = line_rectangle_intersection(current_x, current_y, dx, dy, wall)
-            if intersection:
-                distance = math.hypot(intersection[0] - current_x, intersection[1] - current_y)
-                if distance < min_distance:
-                    min_distance = distance
-                    collision_point = intersection
-                    collision_wall = wall
-        
-        # 如果没有找到交点，检查与游戏边界的交点
-        if not collision_point:
-            game_bounds = [
-                {'x': 0, 'y': 0, 'width': GAME_WIDTH, 'height': WALL_THICKNESS},  # 上边界
-                {'x': 0, 'y': GAME_HEIGHT - WALL_THICKNESS, 'width': GAME_WIDTH, 'height': WALL_THICKNESS},  # 下边界
-                {'x': 0, 'y': 0, 'width': WALL_THICKNESS, 'height': GAME_HEIGHT},  # 左边界
-                {'x': GAME_WIDTH - WALL_THICKNESS, 'y': 0, 'width': WALL_THICKNESS, 'height': GAME_HEIGHT}  # 右边界
-            ]
-            for bound in game_bounds:
-                intersection = line_rectangle_intersection(current_x, current_y, dx, dy, bound)
-                if intersection:
-                    distance = math.hypot(intersection[0] - current_x, intersection[1] - current_y)
-                    if distance < min_distance:
-                        min_distance = distance
-                        collision_point = intersection
-                        collision_wall = bound
-        
-        if collision_point:
-            reflected_points.append(collision_point)
-            current_x, current_y = collision_point
-            
-            # 计算反射角度
-            if collision_wall['width'] > collision_wall['height']:  # 水平墙
-                angle = 2 * math.pi - angle
-            else:  # 垂直墙
-                angle = math.pi - angle
-                
-    
-    laser['reflected_points'] = reflected_points
-    return laser
+        logger.exception("Error starting game loop: %s", e)
 
+def check_game_state(room):
+    emit_events(room, room.check_game_state())
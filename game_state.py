@@ -1,14 +1,4 @@
-# 游戏状态变量
-players = {}
-bullets = []
-walls = []
-maze_info = {}
-wins = {}
-player_latencies = {}
-is_game_running = False
-lasers = []
-crystals = []
-player_colors = {}
+# 每场对局的状态变量在 rooms.Room 中
 
 # 游戏常量
 GRID_SIZE = 60
@@ -19,6 +9,14 @@ TANK_WIDTH = 20
 TANK_HEIGHT = 20
 GAME_WIDTH = 1200
 GAME_HEIGHT = 800
+MAZE_POOL_SIZE = 4  # 后台预先生成的迷宫数量，重新开始时直接取用
+MAZE_POOL_REFILL_INTERVAL = 0.5  # 迷宫池满了以后每隔多少秒检查一次
+
+# 房间设置
+DEFAULT_ROOM_ID = 'main'  # 不指定房间时加入的默认房间
+MAX_ROOM_PLAYERS = 8
+MAX_NAME_LENGTH = 20  # 玩家名字最多多少个字符，更长的会被截断
+EMPTY_ROOM_TIMEOUT = 60  # 连续多少秒没有玩家和观众的房间会被关闭
 
 # 水晶相关常量
 CRYSTAL_SPAWN_INTERVAL = 10  # 10秒
@@ -29,23 +27,80 @@ TANK_CRYSTAL_MIN_DISTANCE = 100  # 坦克和水晶之间的最小距离
 REFLECTION_TIMES = 3 #激光反弹次数
 LASER_EXPIRATION_TIME = 0.1 #激光被移除的时间
 
-# 初始化最后一次水晶生成时间
-import time
-last_crystal_spawn_time = time.time()
-
 
 # 游戏设置
 BULLET_SPEED = 5
 TANK_SPEED = 2
 ROTATING_SPEED = 0.05  # 每帧旋转的弧度
 MAX_BULLET_BOUNCES = 10
+BULLET_RADIUS = 2  # 子弹撞墙检测半径
+BULLET_HIT_RADIUS = 3  # 子弹击中坦克检测半径
 LASER_DURATION = 10  # 激光武器持续时间为10秒
+FIRE_COOLDOWN = 0.3  # 开火冷却（秒），和客户端 gameState.js 的 FIRE_COOLDOWN 一致
+FIRE_BURST = 2  # 网络抖动时允许连续到达的开火次数
+
+# 兴趣范围过滤：每个客户端只收到自己附近的实体。现在的场地一屏就能显示完，所以默认不过滤（None）
+INTEREST_RADIUS = None  # 兴趣范围半径（像素）
+INTEREST_CELL_SIZE = 200  # 兴趣格子大小，同一个格子里的客户端共用同一份过滤结果
+
+# 多进程设置，由 workers.py 通过环境变量传给每个进程
+import os
+WORKER_COUNT = int(os.environ.get('WORKER_COUNT', 1))
+WORKER_INDEX = int(os.environ.get('WORKER_INDEX', 0))  # 当前进程的编号，默认房间固定在 0 号进程
+WORKER_BASE_PORT = int(os.environ.get('WORKER_BASE_PORT', 25000))  # 第 i 个进程监听 WORKER_BASE_PORT + i
+WORKER_URL = os.environ.get('WORKER_URL', '{scheme}://{host}:{port}')  # 客户端访问某个进程的地址模板
+ROOM_DIRECTORY = os.environ.get('ROOM_DIRECTORY', 'memory')  # 房间目录：memory 或 sqlite:///文件路径
+REPLAY_DIRECTORY = os.environ.get('REPLAY_DIRECTORY', 'replays')  # 录像保存的目录，设成空字符串时不录像
+REPLAY_KEYFRAME_INTERVAL = 5  # 录像每隔多少秒写一个关键帧，回放时从最近的关键帧开始跳转
+REPLAY_FLUSH_INTERVAL = 1  # 录像每隔多少秒在后台写入一次磁盘
+REPLAY_BUFFER_LIMIT = 1 << 20  # 没有后台写入时，录像的缓冲区超过这么多字节就直接写入磁盘
+REPLAY_MAX_FILE_SIZE = 64 << 20  # 一个录像文件超过这么多字节后换新文件
+REPLAY_MAX_DURATION = 30 * 60  # 一个录像文件最多录多少秒，之后换新文件
+REPLAY_MAX_FILES = int(os.environ.get('REPLAY_MAX_FILES', 500))  # 最多保留多少个录像，超出的从最旧的开始删除
+REPLAY_MAX_AGE = float(os.environ.get('REPLAY_MAX_AGE', 7 * 24 * 3600))  # 录像最多保留多少秒
+REPLAY_PRUNE_INTERVAL = 30  # 每隔多少秒清理一次录像目录，同时刷新 /replays 的列表
+REPLAY_LIST_LIMIT = 50  # /replays 每页默认返回多少个录像
 
 # 游戏更新频率
 GAME_UPDATE_RATE = 60  # 60 FPS
-GAME_STATE_SEND_RATE = 60  # 20 FPS
+GAME_STATE_SEND_RATE = 20  # 自己的坦克由客户端预测（见 prediction.js），其他实体靠插值，20 Hz 足够
+SPECTATOR_SEND_RATE = 10  # 观众收到快照的频率，所有观众共用一份编码结果
+SPECTATOR_KEYFRAME_INTERVAL = 2  # 观众的快照每隔多少秒是一个关键帧
+BASE_FRAME_RATE = 60  # 速度常量是 60 FPS 下每帧的位移，模拟按实际步长换算，改变模拟频率时游戏速度不变
+MAX_CATCH_UP_STEPS = 5  # 服务器落后时一次最多补跑的模拟步数，超出的部分直接丢弃
+TICK_STATS_REPORT_INTERVAL = 10  # 每隔多少秒输出一次循环耗时统计
+
+# AI 设置
+AI_DECISION_RATE = 10  # 每个 AI 每秒做几次决定（选状态、找路点、瞄准），两次决定之间只按上次的决定操作坦克
+AI_AIM_BOUNCES = 2  # 瞄准时最多考虑的反弹次数
+AI_AIM_CELLS = 4  # 目标在这么多格路程以内才找开火角度，更远的反弹路线几乎打不中
+AI_EVADE_DISTANCE = 120  # 敌方子弹进入这个距离（像素）时躲避
+AI_STUCK_TICKS = 20  # 想前进却连续这么多步没动，就倒车一段
+
+# 延迟补偿：判定激光命中时，把目标回溯到开火玩家屏幕上看到的位置
+MAX_REWIND = 0.3  # 最多回溯的秒数，延迟更高的玩家按这个值补偿
+LAG_COMPENSATION_DELAY = 1 / GAME_STATE_SEND_RATE  # 客户端插值显示的其他坦克比最新快照晚的时间
+
+# 游戏循环各阶段的耗时统计
+from tick_stats import TickStats
+tick_stats = TickStats(window=GAME_UPDATE_RATE * TICK_STATS_REPORT_INTERVAL)
+
+# 日志：记录先放进内存里的缓冲区，由后台写出，见 game_log.py
+LOG_LEVEL = os.environ.get('LOG_LEVEL', 'INFO').upper()  # 游戏日志的级别，控制台 /loglevel 可以随时修改
+LOG_BUFFER_SIZE = 10000  # 缓冲区最多保存的记录数，写不过来时丢弃最旧的
+LOG_FLUSH_INTERVAL = 0.5  # 每隔多少秒在后台写出一次
+# 类别 -> (每秒最多条数, WARNING 以下的记录保留的比例)，没有列出的类别不限制
+LOG_RATE_LIMITS = {
+    'game.ai': (20, 0.1),
+    'game.net': (50, 1),
+    'game.loop': (20, 1),
+    'game.replay': (10, 1),
+}
+
+# 静态资源：构建时生成带哈希的文件名和压缩版本，运行时从内存发送，见 static_assets.py
+STATIC_BUILD_DIRECTORY = os.environ.get('STATIC_BUILD_DIRECTORY', 'static_build')  # 构建结果的目录，相对路径从项目目录算起
+STATIC_MAX_AGE = 365 * 24 * 3600  # 带哈希的资源在浏览器里缓存多少秒
+STATIC_COMPRESS_MIN_SIZE = 256  # 小于这么多字节的文件不生成压缩版本
 
-# 初始化日志
 import logging
-logging.basicConfig(level=logging.DEBUG)
-logger = logging.getLogger(__name__)
\ No newline at end of file
+logger = logging.getLogger('game.loop')
\ No newline at end of file
@@ -1,3 +1,6 @@
+import os
+
 worker_class = 'eventlet'
+# 游戏状态都在进程内，每个进程只能有一个 worker；需要更多核心时用 workers.py 启动多个进程，每个进程负责一部分房间
 workers = 1
-bind = '0.0.0.0:25000'
\ No newline at end of file
+bind = f"0.0.0.0:{int(os.environ.get('WORKER_BASE_PORT', 25000)) + int(os.environ.get('WORKER_INDEX', 0))}"
\ No newline at end of file
@@ -0,0 +1,105 @@
+import math
+from game_state import FIRE_COOLDOWN, FIRE_BURST
+
+
+class InputQueue:
+    '''
+    每个玩家的输入队列
+
+    socket 事件只把输入放进队列，不直接修改世界；每一步开始时 drain 一次性取出，交给 Simulation.step。
+    移动输入按字段合并，同一步里后到的覆盖先到的；开火按令牌桶限速，每 FIRE_COOLDOWN 秒补充一次，
+    最多攒 FIRE_BURST 次，每步每个玩家最多开一次火，超出的开火直接丢弃。
+    移动输入的字段由 clean_move 检查，不合法的整条丢弃。
+    客户端给每条输入带上递增的 seq，重复或乱序到达的输入会被丢弃；acks 记录每个玩家已经生效的最大编号和生效的那一步，
+    随快照发给客户端用来对账。
+    '''
+
+    def __init__(self, fire_cooldown=FIRE_COOLDOWN, fire_burst=FIRE_BURST):
+        self.fire_cooldown = fire_cooldown
+        self.fire_burst = fire_burst
+        self.moves = {}  # 玩家ID -> 合并后的移动输入
+        self.fires = set()  # 这一步要开火的玩家
+        self.received_seq = {}  # 玩家ID -> 收到的最大输入编号
+        self.pending_seq = {}  # 玩家ID -> 这一步新收到的最大输入编号
+        self.acks = {}  # 玩家ID -> (已经应用的最大输入编号, 应用它的步数)
+        self.tokens = {}  # 玩家ID -> (剩余开火次数, 上次补充的模拟时间)
+        self.dropped = 0  # 因为重复、乱序或超过开火限制而丢弃的输入数
+
+    def push(self, player_id, command, seq=None):
+        '''放入一条输入，返回是否被接受'''
+        if command['type'] == 'move':
+            command = clean_move(command)
+            if command is None:
+                self.dropped += 1
+                return False
+        if seq is not None:
+            if seq <= self.received_seq.get(player_id, -1):
+                self.dropped += 1
+                return False
+            self.received_seq[player_id] = seq
+            self.pending_seq[player_id] = seq
+        if command['type'] == 'move':
+            self.moves.setdefault(player_id, {'type': 'move'}).update(command)
+        elif command['type'] == 'fire':
+            if player_id in self.fires:
+                self.dropped += 1
+                return False
+            self.fires.add(player_id)
+        return True
+
+    def drain(self, now, tick):
+        '''取出第 tick 步要应用的输入 [(玩家ID, 输入), ...]，now 是模拟时间'''
+        commands = list(self.moves.items())
+        for player_id in self.fires:
+            if self.take_token(player_id, now):
+                commands.append((player_id, {'type': 'fire'}))
+            else:
+                self.dropped += 1
+        self.moves = {}
+        self.fires = set()
+        for player_id, seq in self.pending_seq.items():
+            self.acks[player_id] = (seq, tick)
+        self.pending_seq = {}
+        return commands
+
+    def take_token(self, player_id, now):
+        tokens, last = self.tokens.get(player_id, (self.fire_burst, now))
+        tokens = min(self.fire_burst, tokens + (now - last) / self.fire_cooldown)
+        if tokens < 1:
+            self.tokens[player_id] = (tokens, now)
+            return False
+        self.tokens[player_id] = (tokens - 1, now)
+        return True
+
+    def remove(self, player_id):
+        self.moves.pop(player_id, None)
+        self.fires.discard(player_id)
+        self.received_seq.pop(player_id, None)
+        self.pending_seq.pop(player_id, None)
+        self.acks.pop(player_id, None)
+        self.tokens.pop(player_id, None)
+
+
+def is_number(value):
+    return isinstance(value, (int, float)) and math.isfinite(value)
+
+
+def clean_move(command):
+    '''
+    检查客户端发来的移动输入，返回只含合法字段的新输入，有不合法的字段时返回 None
+
+    angle 必须是有限的数；moving / rotating 只取符号 -1、0、1（客户端发的是布尔值或整数），
+    否则坦克一步能走出好几倍的距离，碰撞只检查终点时会穿墙。
+    '''
+    cleaned = {'type': 'move'}
+    if 'angle' in command:
+        if not is_number(command['angle']):
+            return None
+        cleaned['angle'] = float(command['angle'])
+    for field in ('moving', 'rotating'):
+        if field in command:
+            value = command[field]
+            if not is_number(value):
+                return None
+            cleaned[field] = (value > 0) - (value < 0)
+    return cleaned
@@ -0,0 +1,85 @@
+import math
+from wire_format import X_SCALE, Y_SCALE
+
+
+class InterestMap:
+    '''
+    每个客户端的兴趣范围（area of interest）
+
+    客户端按自己坦克所在的兴趣格子（cell_size）分组，同一个格子里的客户端看到同一份过滤后的世界，
+    快照和编码结果在它们之间共用。格子的兴趣范围是以格子中心为圆心、radius 为半径的圆，
+    范围外的玩家、子弹、激光和水晶不发送，只和位置有关的事件也只发给能看到那个位置的客户端。
+    radius 为 None 时不做过滤，所有客户端共用完整的世界。
+    '''
+
+    def __init__(self, radius, cell_size):
+        # 半径至少要覆盖整个格子，保证客户端总能看到自己
+        self.radius = radius if radius is None else max(radius, cell_size)
+        self.cell_size = cell_size
+        self.keys = {}  # sid -> 兴趣格子，None 表示完整的世界
+        self.cells = {}  # 兴趣格子 -> [sid, ...]
+
+    def update(self, sids, players):
+        '''按玩家的当前位置重新给客户端分组'''
+        self.keys = {}
+        self.cells = {}
+        for sid in sids:
+            player = players.get(sid)
+            if self.radius is None or player is None:
+                key = None
+            else:
+                key = (int(player.x // self.cell_size), int(player.y // self.cell_size))
+            self.keys[sid] = key
+            self.cells.setdefault(key, []).append(sid)
+
+    def center(self, key):
+        return (key[0] + 0.5) * self.cell_size, (key[1] + 0.5) * self.cell_size
+
+    def sids_near(self, x, y):
+        '''兴趣范围覆盖 (x, y) 的客户端'''
+        sids = []
+        for key, cell_sids in self.cells.items():
+            if key is None:
+                sids.extend(cell_sids)
+                continue
+            cx, cy = self.center(key)
+            if math.hypot(x - cx, y - cy) <= self.radius:
+                sids.extend(cell_sids)
+        return sids
+
+    def view(self, world, key):
+        '''从量化后的世界里取出兴趣格子 key 能看到的部分'''
+        if key is None:
+            return world
+        cx, cy = self.center(key)
+        radius_squared = self.radius ** 2
+
+        def visible(qx, qy):
+            return (qx / X_SCALE - cx) ** 2 + (qy / Y_SCALE - cy) ** 2 <= radius_squared
+
+        bullets = world['bullets']
+        in_range = (bullets['x'] / X_SCALE - cx) ** 2 + (bullets['y'] / Y_SCALE - cy) ** 2 <= radius_squared
+        return {
+            'tick': world['tick'],
+            'players': {player_id: state for player_id, state in world['players'].items()
+                        if visible(state['x'], state['y'])},
+            'bullets': bullets[in_range],
+            'crystals': [(x, y) for x, y in world['crystals']
+                         if (x - cx) ** 2 + (y - cy) ** 2 <= radius_squared],
+            'lasers': [laser for laser in world['lasers'] if self._laser_visible(laser, cx, cy)],
+        }
+
+    def _laser_visible(self, laser, cx, cy):
+        # 激光的任意一段折线进入兴趣范围就发送整条激光
+        x, y = laser[0] / X_SCALE, laser[1] / Y_SCALE
+        points = [(px / X_SCALE, py / Y_SCALE) for px, py in laser[3]]
+        if not points:
+            return (x - cx) ** 2 + (y - cy) ** 2 <= self.radius ** 2
+        for end_x, end_y in points:
+            dx, dy = end_x - x, end_y - y
+            length_squared = dx * dx + dy * dy
+            t = 0 if length_squared == 0 else min(1, max(0, ((cx - x) * dx + (cy - y) * dy) / length_squared))
+            if (x + t * dx - cx) ** 2 + (y + t * dy - cy) ** 2 <= self.radius ** 2:
+                return True
+            x, y = end_x, end_y
+        return False
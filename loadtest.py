@@ -0,0 +1,374 @@
+'''
+压力测试：用真正的 Socket.IO 客户端连接服务器
+
+和 console_commands 里的 spawn_bot 不同，这里的每个机器人都是独立的网络连接，
+按浏览器客户端的协议（player_join / player_move / fire / ping / snapshot_ack）和服务器通信，
+所以测到的是包括编码、发送和 eventlet 调度在内的完整路径。
+
+机器人分散在 --processes 个进程里，每个进程用 asyncio 跑几百个连接，避免压力测试程序自己先成为瓶颈。
+机器人按阶段逐步增加（每个阶段多 --step 个），每个阶段结束时报告:
+    快照频率      每个客户端每秒收到的 game_state 数
+    输入延迟      发送 player_move 到自己的坦克在快照里转到那个角度的时间（p50 / p99），即端到端延迟
+    抖动          快照到达间隔的标准差（服务器不发送没有变化的增量，所以静止的房间间隔本来就不均匀）
+    流量          每个客户端每秒收到的字节数
+    服务器 CPU    --server-pid 指定的进程在这个阶段的 CPU 占用（读 /proc，只支持 Linux）
+    测试端 CPU    压力测试进程自己的 CPU 占用，接近 100% × 进程数时结果不可信，需要加进程
+快照频率下降、延迟和抖动明显上升的阶段就是一个 eventlet 进程开始撑不住的地方。
+
+每个房间最多 MAX_ROOM_PLAYERS 人，机器人先占满默认房间，之后通过 POST /rooms 创建新房间。
+
+用法:
+    python loadtest.py --url http://127.0.0.1:25000 --clients 200 --step 20 --profile wander --server-pid 1234
+依赖 Socket.IO 的 asyncio 客户端: pip install "python-socketio[asyncio_client]"
+'''
+import argparse
+import asyncio
+import json
+import math
+import multiprocessing
+import os
+import random
+import statistics
+import time
+import urllib.request
+import socketio
+from game_state import MAX_ROOM_PLAYERS, DEFAULT_ROOM_ID
+from wire_format import decode_players, quantize_angle
+
+# 行为模式：多久换一次移动方向、多久开一次火（秒，None 表示从不）
+# spectator 以观众身份观看默认房间，不占玩家名额，也不测输入延迟；和另一组玩家机器人一起运行，看观众人数对服务器 CPU 的影响
+PROFILES = {
+    'idle': {'move_interval': None, 'fire_interval': None},
+    'wander': {'move_interval': 0.5, 'fire_interval': 1.0},
+    'aggressive': {'move_interval': 0.2, 'fire_interval': 0.1},
+    'spam': {'move_interval': 1 / 60, 'fire_interval': 1 / 60},  # 每帧都发输入
+    'spectator': {'move_interval': None, 'fire_interval': None, 'spectate': True},
+}
+
+PING_INTERVAL = 2.0
+PROBE_INTERVAL = 1.0  # 每隔多久测一次输入延迟
+PROBE_TIMEOUT = 3.0  # 超过这个时间还没在快照里看到就算丢失（例如坦克已经死了）
+SNAPSHOT_HISTORY = 64
+SETTLE_SECONDS = 2.0  # 每个阶段加入新机器人之后，等这么久再开始统计
+
+
+class Bot:
+    '''一个压力测试客户端'''
+
+    def __init__(self, index, url, room_id, profile, rng):
+        self.index = index
+        self.url = url
+        self.room_id = room_id
+        self.profile = PROFILES[profile]
+        self.rng = rng
+        self.sio = socketio.AsyncClient(reconnection=False)
+        self.player_id = None
+        self.snapshots = {}  # 快照编号 -> {槽位: 玩家}
+        self.probe = None  # (目标角度, 发送时间)
+        self.input_seq = 0
+        self.task = None
+        self.reset_stats()
+
+        self.sio.on('player_joined', self.on_player_joined)
+        self.sio.on('game_state', self.on_game_state)
+        self.sio.on('pong', self.on_pong)
+        self.sio.on('room_moved', self.on_room_moved)
+        self.sio.on('room_full', self.on_room_full)
+        self.sio.on('rejoin_game', self.join)
+
+    def reset_stats(self):
+        self.arrivals = []
+        self.latencies = []
+        self.lost_probes = 0
+        self.bytes_received = 0
+        self.rtts = []
+
+    def take_stats(self):
+        stats = (self.arrivals, self.latencies, self.lost_probes, self.bytes_received, self.rtts)
+        self.reset_stats()
+        return stats
+
+    async def start(self):
+        await self.sio.connect(self.url, transports=['websocket'])
+        await self.join()
+        self.task = asyncio.create_task(self.run())
+
+    async def stop(self):
+        if self.task:
+            self.task.cancel()
+        await self.sio.disconnect()
+
+    async def join(self, data=None):
+        if self.profile.get('spectate'):
+            await self.sio.emit('spectate', {'room': self.room_id})
+        else:
+            await self.sio.emit('player_join', {'name': f'bot{self.index}', 'room': self.room_id})
+
+    async def on_room_moved(self, data):
+        # 房间在另一个进程上，换到那个进程重新连接
+        self.url = data['url'].split('/?')[0]
+        asyncio.create_task(self.reconnect())
+
+    async def reconnect(self):
+        await self.sio.disconnect()
+        await self.sio.connect(self.url, transports=['websocket'])
+        await self.join()
+
+    async def on_room_full(self, data):
+        print(f"机器人 {self.index}: 房间 {data['room']} 已满")
+
+    async def on_player_joined(self, data):
+        if 'id' in data:
+            self.player_id = data['id']
+
+    async def on_game_state(self, data):
+        now = time.perf_counter()
+        try:
+            base_seq = int.from_bytes(data[6:10], 'little')
+            if base_seq and base_seq not in self.snapshots:
+                # 和浏览器一样，找不到基线就请求关键帧
+                await self.sio.emit('request_keyframe')
+                return
+            seq, base_seq, tick, players = decode_players(data, self.snapshots.get(base_seq, {}))
+        except ValueError as e:
+            print(f"机器人 {self.index}: 无法解码快照: {e}")
+            return
+        self.snapshots[seq] = players
+        for old in [old for old in self.snapshots if old <= seq - SNAPSHOT_HISTORY]:
+            del self.snapshots[old]
+
+        self.arrivals.append(now)
+        self.bytes_received += len(data)
+        if self.probe:
+            target, sent_at = self.probe
+            own = next((state for state in players.values() if state.get('id') == self.player_id), None)
+            if own is not None and own.get('angle') == target:
+                self.latencies.append(now - sent_at)
+                self.probe = None
+        if not self.profile.get('spectate'):
+            # 观众的快照是共用的，不需要确认
+            await self.sio.emit('snapshot_ack', {'seq': seq})
+
+    async def on_pong(self, data):
+        if 'clientTime' in data:
+            latency = int(time.time() * 1000) - data['clientTime']
+            self.rtts.append(latency)
+            await self.sio.emit('latency', {'latency': latency})
+
+    async def run(self):
+        # 按行为模式发送输入，同时定期 ping 和测量输入延迟
+        next_move = next_fire = next_ping = next_probe = time.perf_counter() + self.rng.random()
+        while self.sio.connected:
+            now = time.perf_counter()
+            # 测量延迟期间不转向，否则坦克的角度永远对不上目标
+            if self.profile['move_interval'] and now >= next_move and self.probe is None:
+                await self.send_input('player_move', {'moving': self.rng.choice([0, 1]), 'rotating': self.rng.choice([-1, 0, 1])})
+                next_move = now + self.profile['move_interval']
+            if self.profile['fire_interval'] and now >= next_fire:
+                await self.send_input('fire')
+                next_fire = now + self.profile['fire_interval']
+            if now >= next_ping:
+                await self.sio.emit('ping', {'clientTime': int(time.time() * 1000)})
+                next_ping = now + PING_INTERVAL
+            if now >= next_probe and not self.profile.get('spectate'):
+                await self.send_probe(now)
+                next_probe = now + PROBE_INTERVAL
+            wake = min(next_ping, next_probe)
+            if self.profile['move_interval']:
+                wake = min(wake, next_move)
+            if self.profile['fire_interval']:
+                wake = min(wake, next_fire)
+            await asyncio.sleep(max(0.001, wake - time.perf_counter()))
+
+    async def send_input(self, event, data=None):
+        # 和浏览器的 sendInput 一样给输入编号
+        self.input_seq += 1
+        await self.sio.emit(event, dict(data or {}, seq=self.input_seq))
+
+    async def send_probe(self, now):
+        if self.probe and now - self.probe[1] < PROBE_TIMEOUT:
+            return
+        if self.probe:
+            self.lost_probes += 1
+        # 直接设定一个新角度并停止转动，快照里的角度等于它时说明输入已经生效并送回来了
+        angle = self.rng.uniform(0, 2 * math.pi)
+        self.probe = (quantize_angle(angle), now)
+        await self.send_input('player_move', {'angle': angle, 'rotating': 0})
+
+
+def create_room(base_url, name):
+    request = urllib.request.Request(f'{base_url}/rooms', data=json.dumps({'name': name}).encode(),
+                                     headers={'Content-Type': 'application/json'}, method='POST')
+    with urllib.request.urlopen(request) as response:
+        entry = json.load(response)
+    return entry['id'], entry['url'].split('/?')[0]
+
+
+def cpu_seconds(pids):
+    # 进程累计使用的 CPU 时间（用户态 + 内核态），读 /proc/<pid>/stat
+    total = 0
+    for pid in pids:
+        try:
+            with open(f'/proc/{pid}/stat') as f:
+                fields = f.read().rsplit(')', 1)[1].split()
+        except OSError:
+            continue
+        total += (int(fields[11]) + int(fields[12])) / os.sysconf('SC_CLK_TCK')
+    return total
+
+
+def stage_targets(args):
+    # 每个阶段结束时的机器人总数
+    return [min(args.clients, args.step * (stage + 1)) for stage in range(math.ceil(args.clients / args.step))]
+
+
+def stage_window(start_at, stage, seconds):
+    '''第 stage 个阶段的统计时间段（绝对时间），所有进程按同一个时间表运行'''
+    begin = start_at + stage * (SETTLE_SECONDS + seconds) + SETTLE_SECONDS
+    return begin, begin + seconds
+
+
+async def sleep_until(moment):
+    await asyncio.sleep(max(0, moment - time.time()))
+
+
+async def swarm(process_index, args, start_at, results):
+    # 一个进程里的机器人：按时间表逐阶段增加，每个阶段把原始统计数据交给主进程汇总
+    rng = random.Random(args.seed * 1000 + process_index)
+    per_room = max(1, min(args.per_room, MAX_ROOM_PLAYERS))
+    bots = []
+    spectate = PROFILES[args.profile].get('spectate')
+    room_id, room_url = (DEFAULT_ROOM_ID, args.url) if process_index == 0 or spectate else (None, None)
+    try:
+        for stage, total in enumerate(stage_targets(args)):
+            target = total // args.processes + (1 if process_index < total % args.processes else 0)
+            while len(bots) < target:
+                # 每个进程的机器人占满自己的房间之后再开新房间，进程之间不会抢同一个房间
+                if not spectate and (room_id is None or (bots and len(bots) % per_room == 0)):
+                    room_id, room_url = await asyncio.to_thread(
+                        create_room, args.url, f'压力测试 {process_index}-{len(bots) // per_room}')
+                bot = Bot(process_index * args.clients + len(bots), room_url, room_id, args.profile,
+                          random.Random(rng.random()))
+                await bot.start()
+                bots.append(bot)
+
+            begin, end = stage_window(start_at, stage, args.stage_seconds)
+            await sleep_until(begin)
+            for bot in bots:
+                bot.take_stats()
+            cpu_before = time.process_time()
+            await sleep_until(end)
+            cpu = time.process_time() - cpu_before
+
+            counts, intervals, latencies, rtts = [], [], [], []
+            lost = received = 0
+            for bot in bots:
+                arrivals, bot_latencies, bot_lost, bot_bytes, bot_rtts = bot.take_stats()
+                counts.append(len(arrivals))
+                intervals.extend(b - a for a, b in zip(arrivals, arrivals[1:]))
+                latencies.extend(bot_latencies)
+                lost += bot_lost
+                received += bot_bytes
+                rtts.extend(bot_rtts)
+            results.put((stage, {'counts': counts, 'intervals': intervals, 'latencies': latencies, 'rtts': rtts,
+                                 'lost': lost, 'bytes': received, 'cpu': cpu}))
+    finally:
+        for bot in bots:
+            await bot.stop()
+
+
+def run_process(process_index, args, start_at, results):
+    asyncio.run(swarm(process_index, args, start_at, results))
+
+
+def percentile(values, q):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(q / 100 * len(values)))]
+
+
+def stage_report(parts, seconds, server_cpu):
+    # 汇总所有进程同一个阶段的数据
+    counts = [count for part in parts for count in part['counts']]
+    intervals = [interval for part in parts for interval in part['intervals']]
+    latencies = [latency for part in parts for latency in part['latencies']]
+    rtts = [rtt for part in parts for rtt in part['rtts']]
+    clients = len(counts)
+    return {
+        'clients': clients,
+        'snapshots_per_sec': round(statistics.mean(counts) / seconds, 1) if counts else 0.0,
+        'latency_p50_ms': round(percentile(latencies, 50) * 1000, 1),
+        'latency_p99_ms': round(percentile(latencies, 99) * 1000, 1),
+        'lost_probes': sum(part['lost'] for part in parts),
+        'jitter_ms': round(statistics.pstdev(intervals) * 1000, 2) if len(intervals) > 1 else 0.0,
+        'interval_p99_ms': round(percentile(intervals, 99) * 1000, 1),
+        'kib_per_sec_per_client': round(sum(part['bytes'] for part in parts) / max(clients, 1) / seconds / 1024, 1),
+        'rtt_p50_ms': percentile(rtts, 50),
+        'server_cpu_percent': round(server_cpu / seconds * 100, 1) if server_cpu is not None else None,
+        'swarm_cpu_percent': round(sum(part['cpu'] for part in parts) / seconds * 100, 1),
+    }
+
+
+def print_stage(report):
+    cpu = f"{report['server_cpu_percent']}%" if report['server_cpu_percent'] is not None else '-'
+    print(f"{report['clients']:>5} 客户端  快照 {report['snapshots_per_sec']}/s  "
+          f"延迟 p50={report['latency_p50_ms']}ms p99={report['latency_p99_ms']}ms 丢失={report['lost_probes']}  "
+          f"抖动 {report['jitter_ms']}ms (间隔 p99={report['interval_p99_ms']}ms)  "
+          f"{report['kib_per_sec_per_client']}KiB/s/客户端  rtt={report['rtt_p50_ms']}ms  "
+          f"服务器 CPU {cpu}  测试端 CPU {report['swarm_cpu_percent']}%")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='用真正的 Socket.IO 客户端给服务器做压力测试')
+    parser.add_argument('--url', default='http://127.0.0.1:25000')
+    parser.add_argument('--clients', type=int, default=100, help='最终的客户端数量')
+    parser.add_argument('--step', type=int, default=10, help='每个阶段增加的客户端数量')
+    parser.add_argument('--stage-seconds', type=float, default=10, help='每个阶段统计的秒数')
+    parser.add_argument('--profile', choices=sorted(PROFILES), default='wander')
+    parser.add_argument('--per-room', type=int, default=MAX_ROOM_PLAYERS, help='每个房间放多少个机器人')
+    parser.add_argument('--processes', type=int, default=max(1, min(4, (os.cpu_count() or 2) - 1)),
+                        help='运行机器人的进程数')
+    parser.add_argument('--server-pid', type=int, action='append', default=[], help='统计 CPU 的服务器进程，可以重复')
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--output', help='把每个阶段的结果保存成 JSON')
+    args = parser.parse_args()
+
+    # 所有进程按同一个时间表运行，留出时间让它们启动
+    start_at = time.time() + 2
+    results = multiprocessing.Queue()
+    processes = [multiprocessing.Process(target=run_process, args=(index, args, start_at, results), daemon=True)
+                 for index in range(args.processes)]
+    for process in processes:
+        process.start()
+
+    reports = []
+    try:
+        for stage in range(len(stage_targets(args))):
+            begin, end = stage_window(start_at, stage, args.stage_seconds)
+            time.sleep(max(0, begin - time.time()))
+            server_before = cpu_seconds(args.server_pid)
+            time.sleep(max(0, end - time.time()))
+            server_cpu = cpu_seconds(args.server_pid) - server_before if args.server_pid else None
+
+            parts = []
+            while len(parts) < args.processes:
+                result_stage, part = results.get()
+                if result_stage == stage:
+                    parts.append(part)
+            reports.append(stage_report(parts, args.stage_seconds, server_cpu))
+            print_stage(reports[-1])
+    except KeyboardInterrupt:
+        pass
+    finally:
+        for process in processes:
+            process.terminate()
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({'profile': args.profile, 'processes': args.processes, 'stages': reports},
+                      f, indent=2, ensure_ascii=False)
+
+
+if __name__ == '__main__':
+    main()
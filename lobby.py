@@ -0,0 +1,51 @@
+from app import app
+from flask import jsonify, request
+from rooms import register_room, list_rooms, directory, get_room
+from workers import worker_url
+from replay import list_replays
+from game_state import MAX_ROOM_PLAYERS, DEFAULT_ROOM_ID, WORKER_INDEX, REPLAY_LIST_LIMIT
+
+# 大厅接口：查看、创建房间。加入房间通过 socket 的 player_join 事件（带 room 字段）完成，观看通过 spectate 事件
+# 房间可能由任何一个进程负责，返回的 url 是负责进程上的游戏页面
+
+def with_url(entry):
+    url = f"{worker_url(entry['worker'], request.scheme, request.host)}/?room={entry['id']}"
+    return dict(entry, url=url, spectate_url=f"{url}&spectate=1")
+
+@app.route('/rooms', methods=['GET'])
+def get_rooms():
+    return jsonify([with_url(entry) for entry in list_rooms()])
+
+@app.route('/rooms', methods=['POST'])
+def post_room():
+    data = request.get_json(silent=True) or {}
+    if not isinstance(data, dict):
+        return jsonify({'error': '请求内容必须是 JSON 对象'}), 400
+    try:
+        max_players = int(data.get('max_players', MAX_ROOM_PLAYERS))
+    except (TypeError, ValueError, OverflowError):
+        return jsonify({'error': 'max_players 必须是整数'}), 400
+    name = data.get('name')
+    if name is not None and not isinstance(name, str):
+        return jsonify({'error': 'name 必须是字符串'}), 400
+    entry = register_room(name=name, max_players=max(2, min(max_players, MAX_ROOM_PLAYERS)))
+    return jsonify(with_url(entry)), 201
+
+@app.route('/rooms/<room_id>', methods=['GET'])
+def get_room_info(room_id):
+    if room_id == DEFAULT_ROOM_ID and WORKER_INDEX == 0:
+        get_room(room_id)  # 默认房间第一次被访问时才创建
+    entry = directory.get(room_id)
+    if entry is None:
+        return jsonify({'error': '房间不存在'}), 404
+    return jsonify(with_url(entry))
+
+@app.route('/replays', methods=['GET'])
+def get_replays():
+    # 录像保存在所有进程共用的目录里，任何一个进程都可以播放；按时间从新到旧分页，总数在 X-Total-Count 里
+    offset = request.args.get('offset', 0, type=int)
+    limit = request.args.get('limit', REPLAY_LIST_LIMIT, type=int)
+    replays, total = list_replays(max(0, offset), max(1, min(limit, REPLAY_LIST_LIMIT)))
+    response = jsonify([dict(entry, url=f"/?replay={entry['id']}") for entry in replays])
+    response.headers['X-Total-Count'] = str(total)
+    return response
@@ -0,0 +1,177 @@
+'''
+预先生成的迷宫
+
+换一个迷宫要生成格子、生成墙壁、重建墙壁的空间索引和导航图，再算出出生区域。
+这些以前在 restart_game 的处理函数里同步完成，会卡住事件处理。MazePool 在游戏循环旁边的后台任务里
+预先准备好几个 Maze，房间重新开始时直接取一个，是 O(1) 的；池子空了（例如很多房间同时重开）才当场生成。
+'''
+import math
+import random
+from collections import deque
+from game_state import (GRID_SIZE, WALL_THICKNESS, MAZE_WIDTH, MAZE_HEIGHT, GAME_WIDTH, GAME_HEIGHT, TANK_WIDTH,
+                        TANK_HEIGHT, CRYSTAL_RADIUS, MAZE_POOL_SIZE, MAZE_POOL_REFILL_INTERVAL)
+from navigation import NavGrid
+from spatial_index import WallGrid
+from utils import generate_maze
+
+# 坦克的碰撞半径，和 Simulation.step 一致
+TANK_RADIUS = max(TANK_WIDTH, TANK_HEIGHT) / 2 + 2
+
+
+class Maze:
+    '''
+    一个准备好的迷宫
+
+    grid 是 generate_maze 生成的格子，walls 是合并后的墙壁，wall_grid / nav 是已经建好的空间索引和导航图。
+    spawn_areas / crystal_areas 是坦克和水晶可以放置的矩形区域 [(left, top, right, bottom), ...]，
+    区域里的任意一点都不会碰到墙，出生时随机选一个区域、再在区域里随机选一点，不需要反复试。
+    '''
+
+    def __init__(self, grid, walls, maze_info, wall_grid, nav, spawn_areas, crystal_areas):
+        self.grid = grid
+        self.walls = walls
+        self.maze_info = maze_info
+        self.wall_grid = wall_grid
+        self.nav = nav
+        self.spawn_areas = spawn_areas
+        self.crystal_areas = crystal_areas
+
+
+def build_maze(rng):
+    '''用 rng 生成一个新的迷宫'''
+    return prepare_maze(generate_maze(MAZE_WIDTH, MAZE_HEIGHT, rng))
+
+
+def prepare_maze(grid):
+    # 由迷宫格子算出其余的一切，同样的格子总是得到同样的结果（录像的关键帧只需要保存格子）
+    width = len(grid[0]) * GRID_SIZE
+    height = len(grid) * GRID_SIZE
+    # 迷宫在场地里居中
+    offset_x = (GAME_WIDTH - width) // 2
+    offset_y = (GAME_HEIGHT - height) // 2
+
+    walls = merge_walls(grid, offset_x, offset_y)
+    # 游戏场地边界
+    walls.extend([
+        {'x': offset_x, 'y': offset_y, 'width': width, 'height': WALL_THICKNESS},  # 上边界
+        {'x': offset_x, 'y': offset_y + height - WALL_THICKNESS, 'width': width, 'height': WALL_THICKNESS},  # 下边界
+        {'x': offset_x, 'y': offset_y, 'width': WALL_THICKNESS, 'height': height},  # 左边界
+        {'x': offset_x + width - WALL_THICKNESS, 'y': offset_y, 'width': WALL_THICKNESS, 'height': height}  # 右边界
+    ])
+
+    wall_grid = WallGrid(GRID_SIZE)
+    wall_grid.rebuild(walls, offset_x, offset_y)
+    nav = NavGrid(GRID_SIZE)
+    nav.rebuild(grid, wall_grid, offset_x, offset_y)
+    cells = reachable_cells(nav)
+    maze_info = {'width': width, 'height': height, 'offset_x': offset_x, 'offset_y': offset_y}
+    return Maze(grid, walls, maze_info, wall_grid, nav,
+                safe_areas(nav, cells, TANK_RADIUS), safe_areas(nav, cells, CRYSTAL_RADIUS))
+
+
+def merge_walls(grid, offset_x, offset_y):
+    '''
+    迷宫格子对应的墙壁，同一条直线上相连的墙合并成一个矩形
+
+    值为 1 的格子在左边有一堵竖墙、上边有一堵横墙（见 NavGrid.rebuild）。同一列上下相连的竖墙、
+    同一行左右相连的横墙合并以后，墙占的区域和逐个格子生成时完全一样，但墙的数量少得多。
+    '''
+    height = len(grid)
+    width = len(grid[0]) if grid else 0
+    walls = []
+    for x in range(width):
+        y = 0
+        while y < height:
+            start = y
+            while y < height and grid[y][x] == 1:
+                y += 1
+            if y > start:
+                walls.append({'x': x * GRID_SIZE + offset_x, 'y': start * GRID_SIZE + offset_y,
+                              'width': WALL_THICKNESS, 'height': (y - start) * GRID_SIZE})
+            else:
+                y += 1
+    for y in range(height):
+        x = 0
+        while x < width:
+            start = x
+            while x < width and grid[y][x] == 1:
+                x += 1
+            if x > start:
+                walls.append({'x': start * GRID_SIZE + offset_x, 'y': y * GRID_SIZE + offset_y,
+                              'width': (x - start) * GRID_SIZE, 'height': WALL_THICKNESS})
+            else:
+                x += 1
+    return walls
+
+
+def reachable_cells(nav):
+    '''导航图里最大的连通区域；generate_maze 可能围出走不出去的格子，不在那里出生'''
+    seen = [False] * (nav.width * nav.height)
+    best = []
+    for start in range(len(seen)):
+        if seen[start]:
+            continue
+        seen[start] = True
+        component = [start]
+        for cell in component:
+            for neighbor in nav.neighbors[cell]:
+                if not seen[neighbor]:
+                    seen[neighbor] = True
+                    component.append(neighbor)
+        if len(component) > len(best):
+            best = component
+    return sorted(best)
+
+
+def safe_areas(nav, cells, radius):
+    '''
+    每个格子里半径为 radius 的圆可以放置的区域
+
+    墙只沿格子的边线分布，厚度 WALL_THICKNESS，向右、向下延伸；场地边界落在第一行（列）和最后一行（列）格子的内侧。
+    所以离格子四条边都超过 WALL_THICKNESS + radius 的圆心不会碰到任何墙。
+    '''
+    margin = WALL_THICKNESS + radius + 1
+    size = nav.cell_size
+    areas = []
+    for cell in cells:
+        cy, cx = divmod(cell, nav.width)
+        left = nav.offset_x + cx * size
+        top = nav.offset_y + cy * size
+        # 出生点取整数坐标
+        area = (math.ceil(left + margin), math.ceil(top + margin),
+                math.floor(left + size - margin), math.floor(top + size - margin))
+        if area[0] <= area[2] and area[1] <= area[3]:
+            areas.append(area)
+    return areas
+
+
+class MazePool:
+    '''
+    预先生成的迷宫池
+
+    take 取出一个准备好的迷宫；refill_loop 在后台一次生成一个，把池子补满 size 个，每生成一个就让出执行权。
+    池子里的迷宫由自己的 rng 生成，和房间的 rng 无关；房间用了哪个迷宫记在录像的关键帧里。
+    '''
+
+    def __init__(self, size=MAZE_POOL_SIZE, seed=None):
+        self.size = size
+        self.rng = random.Random(seed)
+        self.ready = deque()
+
+    def take(self):
+        if self.ready:
+            return self.ready.popleft()
+        return build_maze(self.rng)
+
+    def refill_loop(self, sleep):
+        '''后台补充迷宫，sleep 是让出执行权的函数（socketio.sleep）'''
+        while True:
+            if len(self.ready) < self.size:
+                self.ready.append(build_maze(self.rng))
+                sleep(0)
+            else:
+                sleep(MAZE_POOL_REFILL_INTERVAL)
+
+
+# 本进程所有房间共用的迷宫池
+maze_pool = MazePool()
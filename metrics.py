@@ -0,0 +1,255 @@
+'''
+进程内的监控指标，通过 /metrics 以 Prometheus 文本格式导出
+
+计数器（Counter）、仪表（Gauge）和固定分桶的直方图（Histogram）都只在内存里累加：
+记录一次只是一次字典查找加一次加法（直方图多一次二分查找），格式化只在被抓取时进行。
+带标签的指标用 labels(...) 取出对应标签值的记录，热点路径可以把它存下来反复使用。
+仪表也可以给一个 function，抓取时调用它取当前值，适合人数、延迟这类现成就有的数据。
+'''
+import bisect
+import functools
+import logging
+import math
+import time
+import socketio
+from socketio import packet
+
+logger = logging.getLogger('game.metrics')
+
+# 所有指标，按创建顺序导出
+registry = []
+
+
+class Value:
+    __slots__ = ('value',)
+
+    def __init__(self):
+        self.value = 0.0
+
+    def inc(self, amount=1):
+        self.value += amount
+
+    def set(self, value):
+        self.value = value
+
+
+class HistogramValue:
+    __slots__ = ('buckets', 'counts', 'sum')
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # 每个桶单独的次数，最后一个是超出所有上界的
+        self.sum = 0.0
+
+    def observe(self, value):
+        # 第一个上界 >= value 的桶，对应 Prometheus 的 le
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+
+
+class Metric:
+    TYPE = 'untyped'
+
+    def __init__(self, name, documentation, labels=(), function=None):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(labels)
+        self.function = function  # 抓取时调用，返回当前值；带标签时返回 {标签值元组: 值}
+        self.values = {}  # 标签值元组 -> 记录
+        registry.append(self)
+
+    def labels(self, *values):
+        value = self.values.get(values)
+        if value is None:
+            value = self.values[values] = self.new_value()
+        return value
+
+    def new_value(self):
+        return Value()
+
+    def collect(self):
+        if self.function is None:
+            return list(self.values.items())
+        result = self.function()
+        if not self.label_names:
+            return [((), result)]
+        return list(result.items())
+
+    def inc(self, amount=1):
+        self.labels().inc(amount)
+
+    def set(self, value):
+        self.labels().set(value)
+
+    def samples(self):
+        '''[(指标名后缀, 标签字符串, 值), ...]'''
+        return [('', format_labels(self.label_names, values), value.value if isinstance(value, Value) else value)
+                for values, value in self.collect()]
+
+
+class Counter(Metric):
+    TYPE = 'counter'
+
+
+class Gauge(Metric):
+    TYPE = 'gauge'
+
+
+class Histogram(Metric):
+    TYPE = 'histogram'
+
+    def __init__(self, name, documentation, buckets, labels=()):
+        super().__init__(name, documentation, labels)
+        self.buckets = tuple(sorted(buckets))
+
+    def new_value(self):
+        return HistogramValue(self.buckets)
+
+    def observe(self, value):
+        self.labels().observe(value)
+
+    def samples(self):
+        samples = []
+        for values, value in self.collect():
+            total = 0
+            for bound, count in zip(self.buckets + (math.inf,), value.counts):
+                total += count
+                labels = format_labels(self.label_names + ('le',), values + (format_value(bound),))
+                samples.append(('_bucket', labels, total))
+            labels = format_labels(self.label_names, values)
+            samples.append(('_sum', labels, value.sum))
+            samples.append(('_count', labels, total))
+        return samples
+
+
+def format_value(value):
+    if value == math.inf:
+        return '+Inf'
+    if value == -math.inf:
+        return '-Inf'
+    if isinstance(value, int) or float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def format_labels(names, values):
+    if not names:
+        return ''
+    pairs = []
+    for name, value in zip(names, values):
+        value = str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+        pairs.append(f'{name}="{value}"')
+    return '{' + ','.join(pairs) + '}'
+
+
+def render():
+    '''所有指标的 Prometheus 文本格式'''
+    lines = []
+    for metric in registry:
+        try:
+            samples = metric.samples()
+        except Exception as e:
+            # 一个指标出错不影响其他指标
+            logger.warning("收集指标 %s 失败: %s", metric.name, e)
+            continue
+        lines.append(f'# HELP {metric.name} {metric.documentation}')
+        lines.append(f'# TYPE {metric.name} {metric.TYPE}')
+        for suffix, labels, value in samples:
+            lines.append(f'{metric.name}{suffix}{labels} {format_value(value)}')
+    return '\n'.join(lines) + '\n'
+
+
+# 耗时直方图的上界（秒）；一步模拟的预算是 1/GAME_UPDATE_RATE ≈ 16.7ms
+TICK_BUCKETS = (0.0005, 0.001, 0.002, 0.004, 0.008, 0.0167, 0.033, 0.1)
+HANDLER_BUCKETS = (0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.05)
+
+tick_phase_seconds = Histogram('tank_tick_phase_seconds',
+                               '游戏循环每个阶段的耗时（update 是一步模拟，serialize / emit 是一次状态广播）',
+                               TICK_BUCKETS, labels=('phase',))
+tick_overruns = Counter('tank_tick_overruns_total', '一步模拟的耗时超过步长的次数')
+missed_steps = Counter('tank_tick_missed_steps_total', '服务器跟不上、没能按时执行的模拟步数')
+dropped_steps = Counter('tank_tick_dropped_steps_total', '落后太多而直接丢弃的模拟步数')
+tick_entities = Gauge('tank_tick_entities', '最近一步所有房间里的实体数', labels=('kind',))
+handler_seconds = Histogram('tank_handler_seconds', '每个 Socket.IO 事件处理函数的耗时', HANDLER_BUCKETS,
+                            labels=('event',))
+emitted_messages = Counter('tank_emitted_messages_total', '发给客户端的消息数，发给房间时按接收者人数计算',
+                           labels=('event',))
+emitted_bytes = Counter('tank_emitted_bytes_total',
+                        '发给客户端的消息大小（压缩之前），按接收者人数计算；bytes 负载是实际长度，其他负载是抽样编码的估计值',
+                        labels=('event',))
+# 非 bytes 负载每个事件每隔多少次 emit 编码一次量大小
+EMIT_SIZE_SAMPLE = 32
+
+
+def timed_handler(event, handler):
+    '''包装事件处理函数，把耗时记到 handler_seconds'''
+    histogram = handler_seconds.labels(event)
+
+    @functools.wraps(handler)
+    def timed(*args):
+        started = time.perf_counter()
+        try:
+            return handler(*args)
+        finally:
+            histogram.observe(time.perf_counter() - started)
+    return timed
+
+
+class MeteredManager(socketio.Manager):
+    '''
+    按事件统计发出的消息数和字节数的 Socket.IO 客户端管理器
+
+    所有 emit（包括处理函数里的 flask_socketio.emit）最后都经过这里，发送本身交给 socketio.Manager.emit。
+    接收者人数直接取房间的大小，不遍历接收者；game_state 这类已经编码好的 bytes 负载按实际长度计算，
+    其他负载每个事件每 EMIT_SIZE_SAMPLE 次编码一次量大小，中间的沿用上一次的结果，所以统计几乎不增加发送的开销。
+    带回调的 emit 只计消息数。
+    '''
+
+    def __init__(self):
+        super().__init__()
+        self.sampled_sizes = {}  # 事件名 -> [距离下次抽样还剩几次, 上次抽样的大小]
+
+    def emit(self, event, data, namespace, room=None, skip_sid=None, callback=None, to=None, **kwargs):
+        room = to or room
+        recipients = self.recipient_count(namespace, room, skip_sid)
+        result = super().emit(event, data, namespace, room=room, skip_sid=skip_sid, callback=callback, **kwargs)
+        if recipients:
+            emitted_messages.labels(event).inc(recipients)
+            if not callback:
+                emitted_bytes.labels(event).inc(recipients * self.payload_size(event, data, namespace))
+        return result
+
+    def recipient_count(self, namespace, room, skip_sid):
+        # 和 get_participants 的规则一样：room 是列表时是几个房间的并集（这里按互不重叠计算），None 是所有连接
+        rooms = self.rooms.get(namespace, {})
+        targets = room if hasattr(room, '__len__') and not isinstance(room, str) else (room,)
+        count = sum(len(rooms[target]) for target in targets if target in rooms)
+        # 被跳过的连接（例如 include_self=False 的发送者）按在房间里计算
+        skipped = skip_sid if isinstance(skip_sid, list) else (skip_sid,)
+        return max(0, count - sum(1 for sid in skipped if sid is not None and sid in rooms))
+
+    def payload_size(self, event, data, namespace):
+        if isinstance(data, (bytes, bytearray)):
+            return len(data)
+        sample = self.sampled_sizes.get(event)
+        if sample is None:
+            sample = self.sampled_sizes[event] = [0, 0]
+        if sample[0] <= 0:
+            sample[0] = EMIT_SIZE_SAMPLE
+            sample[1] = encoded_size(self.server, event, data, namespace)
+        sample[0] -= 1
+        return sample[1]
+
+
+def encoded_size(server, event, data, namespace):
+    # 和 socketio.Manager.emit 一样组装数据包：元组展开成多个参数，None 表示没有参数
+    if isinstance(data, tuple):
+        data = list(data)
+    elif data is not None:
+        data = [data]
+    else:
+        data = []
+    encoded = server.packet_class(packet.EVENT, namespace=namespace, data=[event] + data).encode()
+    if not isinstance(encoded, list):
+        encoded = [encoded]
+    return sum(len(part) for part in encoded)
@@ -0,0 +1,161 @@
+import math
+from collections import deque
+import numpy as np
+from spatial_index import slab_times
+
+
+class NavGrid:
+    '''
+    迷宫格子的导航图，供 AI 寻路和瞄准
+
+    每个迷宫格子是图上的一个节点，相邻格子之间没有墙就连一条边。generate_walls 生成迷宫后调用 rebuild 重建。
+    到某个目标格子的 BFS 距离场按目标缓存，所有追同一个目标的 AI 共用一份：从任意格子出发，
+    走向距离更小的邻居就是最短路，逃跑时走向距离更大的邻居。迷宫重新生成时缓存全部作废。
+    '''
+
+    def __init__(self, cell_size):
+        self.cell_size = cell_size
+        self.width = 0
+        self.height = 0
+        self.offset_x = 0
+        self.offset_y = 0
+        self.neighbors = []  # 格子编号 -> 相邻可通行的格子编号列表
+        self.fields = {}  # 目标格子编号 -> 到它的 BFS 距离数组
+        self.rects = np.zeros((0, 4))
+
+    def rebuild(self, maze, wall_grid, offset_x, offset_y):
+        '''
+        按迷宫重建格子图
+
+        迷宫里值为 1 的格子 (x, y) 在左边和上边各有一堵墙，所以 (x, y) 和 (x-1, y)、(x, y-1) 之间不通。
+        '''
+        self.height = len(maze)
+        self.width = len(maze[0]) if maze else 0
+        self.offset_x = offset_x
+        self.offset_y = offset_y
+        self.neighbors = [[] for _ in range(self.width * self.height)]
+        for y in range(self.height):
+            for x in range(self.width):
+                cell = y * self.width + x
+                if x > 0 and maze[y][x] != 1:
+                    self.neighbors[cell].append(cell - 1)
+                    self.neighbors[cell - 1].append(cell)
+                if y > 0 and maze[y][x] != 1:
+                    self.neighbors[cell].append(cell - self.width)
+                    self.neighbors[cell - self.width].append(cell)
+        self.fields = {}
+        # 瞄准时的射线检测直接用墙壁空间索引里的 NumPy 数组
+        self.rects = wall_grid.rects
+
+    def cell_at(self, x, y):
+        # 坐标所在的格子编号，迷宫外的坐标算到最近的格子
+        cx = min(max(int((x - self.offset_x) // self.cell_size), 0), self.width - 1)
+        cy = min(max(int((y - self.offset_y) // self.cell_size), 0), self.height - 1)
+        return cy * self.width + cx
+
+    def center(self, cell):
+        cy, cx = divmod(cell, self.width)
+        return (self.offset_x + (cx + 0.5) * self.cell_size,
+                self.offset_y + (cy + 0.5) * self.cell_size)
+
+    def field(self, target):
+        '''到目标格子的 BFS 距离数组，走不到的格子是 -1'''
+        distances = self.fields.get(target)
+        if distances is None:
+            distances = np.full(self.width * self.height, -1, dtype=np.int32)
+            distances[target] = 0
+            queue = deque([target])
+            while queue:
+                cell = queue.popleft()
+                step = distances[cell] + 1
+                for neighbor in self.neighbors[cell]:
+                    if distances[neighbor] < 0:
+                        distances[neighbor] = step
+                        queue.append(neighbor)
+            self.fields[target] = distances
+        return distances
+
+    def distance(self, x, y, target_x, target_y):
+        '''两点之间要走几个格子，走不到返回 -1'''
+        return int(self.field(self.cell_at(target_x, target_y))[self.cell_at(x, y)])
+
+    def next_waypoint(self, x, y, target_x, target_y):
+        '''
+        从 (x, y) 走向目标的下一个路点
+
+        已经在目标格子里时直接返回目标；走不到时返回 None。
+        '''
+        cell = self.cell_at(x, y)
+        target = self.cell_at(target_x, target_y)
+        if cell == target:
+            return target_x, target_y
+        distances = self.field(target)
+        if distances[cell] < 0:
+            return None
+        best = min(self.neighbors[cell], key=lambda neighbor: distances[neighbor])
+        return self.center(best)
+
+    def flee_waypoint(self, x, y, threat_x, threat_y):
+        '''从 (x, y) 远离威胁的下一个路点：离威胁所在格子最远的相邻格子，没有更远的就留在原地'''
+        cell = self.cell_at(x, y)
+        distances = self.field(self.cell_at(threat_x, threat_y))
+        best = max(self.neighbors[cell] + [cell], key=lambda neighbor: distances[neighbor])
+        return self.center(best)
+
+    def find_shot(self, x, y, target_x, target_y, angle, muzzle, hit_radius, bounces, directions=64):
+        '''
+        找一个能打中目标的开火角度，可以经过墙壁反弹
+
+        从 (x, y) 沿 directions 个方向（外加直接指向目标的方向）同时发射射线，所有射线对所有墙一起做 slab 检测，
+        按子弹的规则反弹 bounces 次，检查哪条射线经过目标的 hit_radius 范围以内，并且在那之前不会弹回来打中自己。
+        优先反弹次数少的，其次是离当前角度 angle 近的。打不中返回 None。
+        '''
+        direct = math.atan2(target_y - y, target_x - x)
+        angles = np.append(np.linspace(0, 2 * math.pi, directions, endpoint=False), direct)
+        dx = np.cos(angles)
+        dy = np.sin(angles)
+        # 子弹从炮口出发
+        sx = x + dx * muzzle
+        sy = y + dy * muzzle
+        rects = self.rects
+        rows = np.arange(len(angles))
+        hit_at = np.full(len(angles), -1)  # 每条射线在第几段打中目标
+        alive = np.ones(len(angles), dtype=bool)  # 还没打中自己的射线
+        for bounce in range(bounces + 1):
+            enter_x, exit_x = slab_times(sx[:, None], dx[:, None], rects[:, 0], rects[:, 2])
+            enter_y, exit_y = slab_times(sy[:, None], dy[:, None], rects[:, 1], rects[:, 3])
+            enter = np.maximum(enter_x, enter_y)
+            leave = np.minimum(exit_x, exit_y)
+            times = np.where((enter <= leave) & (enter > 1e-6), enter, np.inf)
+            wall = np.argmin(times, axis=1) if len(rects) else np.zeros(len(angles), dtype=int)
+            length = times[rows, wall] if len(rects) else np.full(len(angles), np.inf)
+            length = np.minimum(length, 1e4)
+
+            hits_target = segment_near(sx, sy, dx, dy, length, target_x, target_y, hit_radius)
+            if bounce > 0:
+                # 反弹后的线段先经过自己的话，这一枪会打中自己
+                alive &= ~(segment_near(sx, sy, dx, dy, length, x, y, hit_radius) & ~hits_target)
+            found = alive & (hit_at < 0) & hits_target
+            hit_at[found] = bounce
+            if (hit_at >= 0).any():
+                break
+
+            sx = sx + dx * length
+            sy = sy + dy * length
+            if len(rects):
+                # 按撞到的是哪一面反弹，和 WallGrid 的检测一样：最后进入的是 x 方向的 slab 就是撞在左右两侧
+                side = enter_x[rows, wall] >= enter_y[rows, wall]
+                dx = np.where(side, -dx, dx)
+                dy = np.where(side, dy, -dy)
+
+        candidates = np.flatnonzero(hit_at >= 0)
+        if len(candidates) == 0:
+            return None
+        turn = np.abs((angles[candidates] - angle + math.pi) % (2 * math.pi) - math.pi)
+        return float(angles[candidates[np.argmin(turn)]])
+
+
+def segment_near(sx, sy, dx, dy, length, px, py, radius):
+    # 每条从 (sx, sy) 沿单位方向 (dx, dy) 长 length 的线段是否经过 (px, py) 的 radius 范围以内
+    t = np.clip((px - sx) * dx + (py - sy) * dy, 0, length)
+    return (sx + dx * t - px) ** 2 + (sy + dy * t - py) ** 2 <= radius * radius
@@ -0,0 +1,131 @@
+import logging
+import time
+from eventlet import tpool
+from app import socketio
+from game_logic import capture_world, emit_events
+from game_state import GAME_UPDATE_RATE, GAME_STATE_SEND_RATE
+from replay import KEYFRAME, PLAYER, INPUTS, REWIND, END, COUNT, REWIND_ENTRY, read_replay, load_keyframe, decode_inputs
+from rooms import Room
+
+logger = logging.getLogger('game.replay')
+
+# 正在看录像的观众：sid -> ReplayPlayback
+viewers = {}
+
+
+class ReplayPlayback:
+    '''
+    一个观众正在看的录像
+
+    录像在一个不属于大厅的 Room 里重新模拟，房间名（Socket.IO 房间）只有这一个观众，
+    模拟产生的事件和 game_state 快照都按正常对局的格式发送，现有的客户端可以直接显示。
+    跳转时从目标之前最近的关键帧开始，不发送任何数据快速模拟到目标步数。
+    '''
+
+    def __init__(self, sid, path):
+        self.sid = sid
+        self.path = path
+        self.room = Room(f'replay:{sid}', path)
+        self.room.snapshot_channel.add_client(sid)
+        self.dt = 1 / GAME_UPDATE_RATE
+        self.records = []
+        self.position = 0
+        self.player_ids = {}  # 玩家编号 -> 玩家ID
+        self.seek_to = 0  # 下一步之前要跳转到的步数
+
+    def seek(self, tick):
+        self.dt, self.records = tpool.execute(read_replay, self.path, tick)
+        if not self.records or self.records[0][0] != KEYFRAME:
+            raise ValueError(f'录像没有关键帧: {self.path}')
+        # 从关键帧开始，之后的记录按步数依次应用
+        self.room.load_state(load_keyframe(self.records[0][2]))
+        self.player_ids = {}
+        self.position = 1
+        while self.room.tick < tick and self.advance(emit=False):
+            pass
+        self.room.snapshot_channel.reset()
+        self.send_world()
+
+    def advance(self, emit=True):
+        '''应用这一步的记录并模拟一步，录像结束时返回 False'''
+        commands = []
+        records = self.records
+        while self.position < len(records) and records[self.position][1] <= self.room.tick:
+            kind, tick, payload = records[self.position]
+            self.position += 1
+            if kind == KEYFRAME:
+                walls = self.room.walls
+                self.room.load_state(load_keyframe(payload))
+                self.player_ids = {}
+                if emit and self.room.walls != walls:
+                    # 录像里换了迷宫，客户端需要新的墙壁
+                    self.room.snapshot_channel.reset()
+                    self.send_world()
+            elif kind == PLAYER:
+                number, = COUNT.unpack_from(payload)
+                self.player_ids[number] = bytes(payload[COUNT.size:]).decode('utf-8')
+            elif kind == INPUTS:
+                commands.extend(decode_inputs(payload, self.player_ids))
+            elif kind == REWIND:
+                number, ticks = REWIND_ENTRY.unpack_from(payload)
+                self.room.rewind_ticks[self.player_ids[number]] = ticks
+            elif kind == END:
+                return False
+        if self.position >= len(records) and not commands:
+            return False
+        events = self.room.step(commands, self.dt)
+        if emit:
+            emit_events(self.room, events)
+        return True
+
+    def send_world(self):
+        room = self.room
+        socketio.emit('player_joined', {'players': room.player_states(), 'walls': room.walls, 'maze_info': room.maze_info,
+                                        'wins': room.wins},
+                      to=self.sid, namespace='/')
+
+    def send_state(self):
+        for sids, payload in self.room.snapshot_channel.publish(capture_world(self.room)):
+            socketio.emit('game_state', payload, to=sids, namespace='/')
+
+    def run(self):
+        # 按录像的原始速度播放，直到观众离开或者录像结束
+        send_every = max(1, round(GAME_UPDATE_RATE / GAME_STATE_SEND_RATE))
+        next_time = time.perf_counter()
+        while viewers.get(self.sid) is self:
+            if self.seek_to is not None:
+                try:
+                    self.seek(self.seek_to)
+                except (OSError, ValueError) as e:
+                    logger.warning("读取录像失败: %s", e)
+                    socketio.emit('replay_ended', {'tick': self.room.tick}, to=self.sid, namespace='/')
+                    break
+                self.seek_to = None
+                next_time = time.perf_counter()
+            if not self.advance():
+                socketio.emit('replay_ended', {'tick': self.room.tick}, to=self.sid, namespace='/')
+                break
+            if self.room.tick % send_every == 0:
+                self.send_state()
+            next_time += self.dt
+            socketio.sleep(max(0, next_time - time.perf_counter()))
+        if viewers.get(self.sid) is self:
+            del viewers[self.sid]
+
+
+def watch(sid, path, tick=0):
+    stop_watching(sid)
+    playback = viewers[sid] = ReplayPlayback(sid, path)
+    playback.seek_to = max(0, tick)
+    socketio.start_background_task(playback.run)
+    return playback
+
+
+def stop_watching(sid):
+    viewers.pop(sid, None)
+
+
+def viewer_room(sid):
+    # 观众的 snapshot_ack / request_keyframe 交给回放用的房间
+    playback = viewers.get(sid)
+    return playback.room if playback else None
@@ -0,0 +1,60 @@
+import numpy as np
+
+
+class PositionHistory:
+    '''
+    最近 capacity 步里每个坦克的位置，用于延迟补偿
+
+    位置存放在预先分配好的 (capacity, max_players) 数组里，第 tick 步写在第 tick % capacity 行，
+    每个玩家占一列，离开后列回收。查询时按步数取出整行，不需要任何分配之外的查找。
+    '''
+
+    def __init__(self, capacity, max_players=256):
+        self.capacity = capacity
+        self.ticks = np.full(capacity, -1, dtype=np.int64)  # 每一行记录的是第几步，-1 表示空
+        self.x = np.zeros((capacity, max_players), dtype=np.float32)
+        self.y = np.zeros((capacity, max_players), dtype=np.float32)
+        self.alive = np.zeros((capacity, max_players), dtype=bool)
+        self.columns = {}  # 玩家ID -> 列
+        self.free = list(range(max_players - 1, -1, -1))
+
+    def column_for(self, player_id):
+        column = self.columns.get(player_id)
+        if column is None:
+            column = self.columns[player_id] = self.free.pop()
+            # 新玩家在加入之前的步数里不存在
+            self.alive[:, column] = False
+        return column
+
+    def record(self, tick, players):
+        '''记录第 tick 步结束时所有玩家的位置'''
+        row = tick % self.capacity
+        self.ticks[row] = tick
+        self.alive[row] = False
+        for player_id, player in players.items():
+            column = self.column_for(player_id)
+            self.x[row, column] = player.x
+            self.y[row, column] = player.y
+            self.alive[row, column] = player.alive
+
+    def at(self, player_ids, tick):
+        '''
+        第 tick 步时这些玩家的位置
+
+        返回 (n×2 的坐标数组, 当时是否活着)；这一步已经不在记录里（太旧或者记录被清空）时返回 None。
+        '''
+        row = tick % self.capacity
+        if tick < 0 or self.ticks[row] != tick:
+            return None
+        columns = [self.column_for(player_id) for player_id in player_ids]
+        positions = np.column_stack((self.x[row, columns], self.y[row, columns])).astype(float)
+        return positions, self.alive[row, columns]
+
+    def remove(self, player_id):
+        column = self.columns.pop(player_id, None)
+        if column is not None:
+            self.free.append(column)
+
+    def clear(self):
+        # 迷宫重置后旧的位置全部作废
+        self.ticks[:] = -1
@@ -0,0 +1,350 @@
+'''
+对局录像
+
+模拟是确定性的（见 Simulation），所以录像只需要保存每一步交给 step 的输入，再每隔 REPLAY_KEYFRAME_INTERVAL 秒保存一个关键帧
+（完整的模拟状态）。游戏循环之外改变了世界的操作（玩家加入离开、控制台命令等）会让下一步额外写一个关键帧。
+回放时从目标步数之前最近的关键帧开始，用记录的输入重新模拟。
+
+录像文件是只追加的二进制文件，开头是 FILE_HEADER，之后是一条条记录，每条记录是 RECORD 头加数据：
+    KEYFRAME  zlib 压缩的 pickle(Simulation.save_state())，之后的玩家编号重新开始
+    PLAYER    u16 玩家编号 + UTF-8 玩家ID，INPUTS 里用编号代替玩家ID
+    INPUTS    u16 输入条数，每条是 COMMAND 头，move 输入再跟上 mask 里每个字段的 f64
+    REWIND    u16 玩家编号 + u16 回溯步数：玩家的延迟变了，之后开火按新的步数回溯（Simulation.rewind_ticks）
+    END       录像正常结束
+同名的 .index 文件按顺序保存每个关键帧的 (步数, 在录像文件里的偏移)，回放跳转时只需要读关键帧之后的部分。
+
+游戏循环只把记录追加到内存里的缓冲区，后台的 writer_loop 每隔 REPLAY_FLUSH_INTERVAL 秒取走缓冲区，
+在 eventlet 的线程池里写入磁盘，游戏循环不会等待磁盘。没有运行 writer_loop 的进程（工具、测试）里，
+缓冲区超过 REPLAY_BUFFER_LIMIT 或者有结束了的录像等待写入时由 record 直接写入。一个录像文件超过 REPLAY_MAX_FILE_SIZE 字节或者
+REPLAY_MAX_DURATION 秒后换一个新文件，一直不重新开始的房间也不会写出无限大的文件。
+writer_loop 还每隔 REPLAY_PRUNE_INTERVAL 秒清理一次录像目录：超过 REPLAY_MAX_FILES 个或者比 REPLAY_MAX_AGE 旧的录像
+（正在录的除外）连同索引一起删除，剩下的录像清单留在内存里，/replays 分页返回，不用每次请求都扫描目录。
+'''
+import bisect
+import logging
+import os
+import pickle
+import re
+import struct
+import time
+import weakref
+import zlib
+from eventlet import tpool
+from game_state import (GAME_UPDATE_RATE, REPLAY_DIRECTORY, REPLAY_KEYFRAME_INTERVAL, REPLAY_FLUSH_INTERVAL,
+                        REPLAY_MAX_FILES, REPLAY_MAX_AGE, REPLAY_PRUNE_INTERVAL, REPLAY_LIST_LIMIT,
+                        REPLAY_MAX_FILE_SIZE, REPLAY_MAX_DURATION, REPLAY_BUFFER_LIMIT)
+
+MAGIC = b'TKRP'
+REPLAY_VERSION = 2  # 2: 关键帧里的玩家、激光和水晶是 entities 里的记录类型
+FILE_HEADER = struct.Struct('<4sBd')  # 标识、版本、每一步的时长
+RECORD = struct.Struct('<BII')  # 记录类型、步数、数据长度
+INDEX_ENTRY = struct.Struct('<IQ')  # 关键帧的步数、记录在录像文件里的偏移
+COUNT = struct.Struct('<H')
+COMMAND = struct.Struct('<HBB')  # 玩家编号、输入类型、move 输入带了哪些字段
+VALUE = struct.Struct('<d')
+REWIND_ENTRY = struct.Struct('<HH')  # 玩家编号、回溯步数
+
+KEYFRAME = 1
+PLAYER = 2
+INPUTS = 3
+END = 4
+REWIND = 5
+
+COMMAND_TYPES = ('move', 'fire')
+MOVE_FIELDS = ('angle', 'moving', 'rotating')
+
+REPLAY_ID = re.compile(r'^[\w-]+$')
+
+logger = logging.getLogger('game.replay')
+
+# 正在录像的房间，后台写入时逐个取走缓冲区；不保留已经没有房间引用的录像
+recorders = weakref.WeakSet()
+# writer_loop 是否在运行，没有运行时 record 自己写入磁盘
+writer_running = False
+# 等待写入磁盘的数据 [(录像路径, 数据, 索引数据), ...]
+pending_writes = []
+# 录像目录里的录像，按修改时间从新到旧，由 prune_replays 刷新
+catalog = None
+
+
+class ReplayRecorder:
+    '''
+    一个房间的录像
+
+    update_game 在每一步 step 之前调用 record；第一次调用时开始一个新的录像文件，stop 之后下一次调用再开始新的文件，
+    所以每一回合（见 restart_game）是一个单独的录像；太大或者太长的录像也会换新文件。
+    directory 为空（默认）时不录像，大厅里的房间由 rooms.create_room 传入 REPLAY_DIRECTORY。
+    '''
+
+    def __init__(self, room_id, directory=None, keyframe_interval=REPLAY_KEYFRAME_INTERVAL):
+        self.room_id = room_id
+        self.directory = directory
+        self.keyframe_ticks = max(1, round(keyframe_interval * GAME_UPDATE_RATE))
+        self.max_ticks = max(1, round(REPLAY_MAX_DURATION * GAME_UPDATE_RATE))
+        self.path = None  # 当前的录像文件，还没开始录像时为 None
+        self.start_tick = 0
+        self.buffer = bytearray()
+        self.index = bytearray()
+        self.size = 0  # 当前文件已经写入和等待写入的字节数
+        self.player_numbers = {}  # 玩家ID -> 上一个关键帧之后分配的编号
+        self.last_keyframe = None
+        self.dirty = False
+        self.rewind_ticks = {}  # 录像里已经记下的每个玩家的回溯步数
+
+    def start(self, tick):
+        name = f"{self.room_id}-{time.strftime('%Y%m%d-%H%M%S')}-{tick}"
+        self.path = os.path.join(self.directory, name + '.replay')
+        self.buffer += FILE_HEADER.pack(MAGIC, REPLAY_VERSION, 1 / GAME_UPDATE_RATE)
+        self.size = len(self.buffer)
+        self.start_tick = tick
+        self.last_keyframe = None
+        recorders.add(self)
+
+    def stop(self, tick=0):
+        # 结束当前的录像，剩下的数据交给后台写入
+        if self.path is None:
+            return
+        self.write(END, tick, b'')
+        self.flush()
+        self.path = None
+        recorders.discard(self)
+
+    def mark_dirty(self):
+        # 世界在游戏循环之外被修改了，下一步需要一个关键帧
+        self.dirty = True
+
+    def record(self, sim, commands):
+        '''记录第 sim.tick 步要应用的输入 [(玩家ID, 输入), ...]，在 step 之前调用'''
+        if not self.directory:
+            return
+        if self.path is not None and (self.size >= REPLAY_MAX_FILE_SIZE or sim.tick - self.start_tick >= self.max_ticks):
+            self.stop(sim.tick)
+        if self.path is None:
+            self.start(sim.tick)
+        if not writer_running and (pending_writes or len(self.buffer) >= REPLAY_BUFFER_LIMIT):
+            self.flush()
+            write_pending()
+        if self.dirty or self.last_keyframe is None or sim.tick - self.last_keyframe >= self.keyframe_ticks:
+            self.write_keyframe(sim)
+        elif sim.rewind_ticks != self.rewind_ticks:
+            self.record_rewind(sim)
+        if not commands:
+            return
+        payload = bytearray(COUNT.pack(len(commands)))
+        for player_id, command in commands:
+            number = self.player_number(player_id, sim.tick)
+            if command['type'] == 'move':
+                values = []
+                mask = 0
+                for bit, field in enumerate(MOVE_FIELDS):
+                    if field in command:
+                        try:
+                            values.append(VALUE.pack(float(command[field])))
+                        except (TypeError, ValueError):
+                            continue
+                        mask |= 1 << bit
+                payload += COMMAND.pack(number, 0, mask)
+                for value in values:
+                    payload += value
+            else:
+                payload += COMMAND.pack(number, COMMAND_TYPES.index(command['type']), 0)
+        self.write(INPUTS, sim.tick, payload)
+
+    def write_keyframe(self, sim):
+        # 压缩级别 1：关键帧主要是坐标和墙壁，更高的级别几乎不会更小，却慢得多
+        payload = zlib.compress(pickle.dumps(sim.save_state(), protocol=pickle.HIGHEST_PROTOCOL), 1)
+        self.index += INDEX_ENTRY.pack(sim.tick, self.size)
+        self.write(KEYFRAME, sim.tick, payload)
+        self.last_keyframe = sim.tick
+        self.dirty = False
+        self.player_numbers = {}
+        self.rewind_ticks = dict(sim.rewind_ticks)
+
+    def record_rewind(self, sim):
+        # 延迟测量经常让回溯步数变一点，只记下变了的玩家，不用为此写整个关键帧
+        for player_id, ticks in sim.rewind_ticks.items():
+            if self.rewind_ticks.get(player_id) != ticks:
+                number = self.player_number(player_id, sim.tick)
+                self.write(REWIND, sim.tick, REWIND_ENTRY.pack(number, min(ticks, 0xFFFF)))
+        self.rewind_ticks = dict(sim.rewind_ticks)
+
+    def player_number(self, player_id, tick):
+        number = self.player_numbers.get(player_id)
+        if number is None:
+            number = self.player_numbers[player_id] = len(self.player_numbers)
+            self.write(PLAYER, tick, COUNT.pack(number) + str(player_id).encode('utf-8'))
+        return number
+
+    def write(self, kind, tick, payload):
+        self.buffer += RECORD.pack(kind, tick, len(payload))
+        self.buffer += payload
+        self.size += RECORD.size + len(payload)
+
+    def flush(self):
+        # 把缓冲区交给后台写入
+        if self.buffer or self.index:
+            pending_writes.append((self.path, bytes(self.buffer), bytes(self.index)))
+            self.buffer.clear()
+            self.index.clear()
+
+
+def write_chunks(chunks):
+    # 在线程池里运行；先写录像再写索引，索引里的偏移总是指向已经写好的数据
+    for path, data, index in chunks:
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        with open(path, 'ab') as f:
+            f.write(data)
+        if index:
+            with open(index_path(path), 'ab') as f:
+                f.write(index)
+
+
+def write_pending(execute=None):
+    '''写入等待中的数据，execute 是执行写入的函数（tpool.execute），为 None 时直接写'''
+    chunks = pending_writes[:]
+    del pending_writes[:]
+    if chunks:
+        if execute is None:
+            write_chunks(chunks)
+        else:
+            execute(write_chunks, chunks)
+
+
+def flush_recorders():
+    for recorder in list(recorders):
+        recorder.flush()
+    write_pending(tpool.execute)
+
+
+def writer_loop(sleep):
+    '''后台写入录像并定期清理录像目录，sleep 是让出执行权的函数（socketio.sleep）'''
+    global writer_running
+    writer_running = True
+    last_prune = None
+    while True:
+        sleep(REPLAY_FLUSH_INTERVAL)
+        try:
+            flush_recorders()
+            if REPLAY_DIRECTORY and (last_prune is None or time.monotonic() - last_prune >= REPLAY_PRUNE_INTERVAL):
+                last_prune = time.monotonic()
+                prune_replays(tpool.execute)
+        except OSError as e:
+            logger.warning("写入录像失败: %s", e)
+
+
+def scan_replays(directory, active, max_files, max_age, now):
+    '''
+    删除超出数量或者太旧的录像，返回剩下的录像清单，在线程池里运行
+
+    active 是本进程正在录的录像路径，不会被删除。多个进程共用录像目录时各自清理，
+    别的进程正在录的文件每次写入都会更新修改时间，排在最前面，不会被当成旧录像删掉。
+    '''
+    entries = []
+    with os.scandir(directory) as scanner:
+        for entry in scanner:
+            if entry.name.endswith('.replay') and entry.is_file():
+                stat = entry.stat()
+                entries.append({'id': entry.name[:-len('.replay')], 'size': stat.st_size, 'modified': stat.st_mtime})
+    entries.sort(key=lambda entry: entry['modified'], reverse=True)
+    kept = []
+    for entry in entries:
+        path = os.path.join(directory, entry['id'] + '.replay')
+        if path in active or (len(kept) < max_files and now - entry['modified'] <= max_age):
+            kept.append(entry)
+            continue
+        for name in (path, index_path(path)):
+            try:
+                os.remove(name)
+            except FileNotFoundError:
+                pass
+    return kept
+
+
+def prune_replays(execute=None):
+    '''清理录像目录并刷新录像清单，execute 是执行清理的函数（tpool.execute），为 None 时直接执行'''
+    global catalog
+    if not os.path.isdir(REPLAY_DIRECTORY):
+        catalog = []
+        return
+    active = {recorder.path for recorder in recorders}
+    arguments = (REPLAY_DIRECTORY, active, REPLAY_MAX_FILES, REPLAY_MAX_AGE, time.time())
+    catalog = execute(scan_replays, *arguments) if execute else scan_replays(*arguments)
+
+
+def index_path(path):
+    return path[:-len('.replay')] + '.index'
+
+
+def replay_path(replay_id):
+    '''录像ID对应的文件路径，ID 不合法或者录像不存在时返回 None'''
+    if not REPLAY_DIRECTORY or not isinstance(replay_id, str) or not REPLAY_ID.match(replay_id):
+        return None
+    path = os.path.join(REPLAY_DIRECTORY, replay_id + '.replay')
+    return path if os.path.isfile(path) else None
+
+
+def list_replays(offset=0, limit=REPLAY_LIST_LIMIT):
+    '''
+    从新到旧的第 offset 个开始的 limit 个录像，以及录像的总数
+
+    清单每隔 REPLAY_PRUNE_INTERVAL 秒刷新一次，刚结束的录像可能要等一会儿才出现。
+    '''
+    if not REPLAY_DIRECTORY:
+        return [], 0
+    if catalog is None:
+        prune_replays()
+    return catalog[offset:offset + limit], len(catalog)
+
+
+def read_replay(path, tick):
+    '''
+    读取录像里从 tick 之前最近的关键帧开始的部分，返回 (每一步的时长, 记录列表)
+
+    记录是 (类型, 步数, 数据)。只读取关键帧之后的数据；写到一半的最后一条记录会被忽略。
+    '''
+    with open(path, 'rb') as f:
+        magic, version, dt = FILE_HEADER.unpack(f.read(FILE_HEADER.size))
+        if magic != MAGIC or version != REPLAY_VERSION:
+            raise ValueError(f'不支持的录像文件: {path}')
+        try:
+            with open(index_path(path), 'rb') as index_file:
+                index = index_file.read()
+        except FileNotFoundError:
+            index = b''
+        entries = [INDEX_ENTRY.unpack_from(index, offset)
+                   for offset in range(0, len(index) - INDEX_ENTRY.size + 1, INDEX_ENTRY.size)]
+        position = bisect.bisect_right([entry[0] for entry in entries], tick) - 1
+        f.seek(entries[position][1] if position >= 0 else FILE_HEADER.size)
+        data = f.read()
+
+    records = []
+    offset = 0
+    while offset + RECORD.size <= len(data):
+        kind, record_tick, length = RECORD.unpack_from(data, offset)
+        offset += RECORD.size
+        if offset + length > len(data):
+            break
+        records.append((kind, record_tick, data[offset:offset + length]))
+        offset += length
+    return dt, records
+
+
+def load_keyframe(payload):
+    return pickle.loads(zlib.decompress(payload))
+
+
+def decode_inputs(payload, player_ids):
+    '''INPUTS 记录还原成 [(玩家ID, 输入), ...]，player_ids 是玩家编号 -> 玩家ID'''
+    count, = COUNT.unpack_from(payload)
+    offset = COUNT.size
+    commands = []
+    for _ in range(count):
+        number, kind, mask = COMMAND.unpack_from(payload, offset)
+        offset += COMMAND.size
+        command = {'type': COMMAND_TYPES[kind]}
+        for bit, field in enumerate(MOVE_FIELDS):
+            if mask & (1 << bit):
+                command[field], = VALUE.unpack_from(payload, offset)
+                offset += VALUE.size
+        commands.append((player_ids[number], command))
+    return commands
@@ -0,0 +1,77 @@
+import json
+import sqlite3
+import threading
+import time
+
+
+class MemoryDirectory:
+    '''
+    进程内的房间目录
+
+    只有一个进程时使用，所有房间信息就保存在字典里。
+    '''
+
+    def __init__(self):
+        self.entries = {}
+
+    def put(self, entry):
+        self.entries[entry['id']] = dict(entry, updated_at=time.time())
+
+    def get(self, room_id):
+        return self.entries.get(room_id)
+
+    def remove(self, room_id):
+        self.entries.pop(room_id, None)
+
+    def all(self):
+        return list(self.entries.values())
+
+    def clear(self):
+        self.entries.clear()
+
+
+class SqliteDirectory:
+    '''
+    多个进程共用的房间目录，保存在本机的 SQLite 文件里
+
+    每条记录是房间的 summary（包括负责它的进程编号 worker），以 JSON 存储。
+    '''
+
+    def __init__(self, path):
+        self.lock = threading.Lock()
+        self.db = sqlite3.connect(path, timeout=5, isolation_level=None, check_same_thread=False)
+        self.db.execute('PRAGMA journal_mode=WAL')
+        self.db.execute('CREATE TABLE IF NOT EXISTS rooms (id TEXT PRIMARY KEY, worker INTEGER, data TEXT, updated_at REAL)')
+
+    def put(self, entry):
+        entry = dict(entry, updated_at=time.time())
+        with self.lock:
+            self.db.execute('INSERT OR REPLACE INTO rooms VALUES (?, ?, ?, ?)',
+                            (entry['id'], entry['worker'], json.dumps(entry), entry['updated_at']))
+
+    def get(self, room_id):
+        with self.lock:
+            row = self.db.execute('SELECT data FROM rooms WHERE id = ?', (room_id,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def remove(self, room_id):
+        with self.lock:
+            self.db.execute('DELETE FROM rooms WHERE id = ?', (room_id,))
+
+    def all(self):
+        with self.lock:
+            rows = self.db.execute('SELECT data FROM rooms ORDER BY id').fetchall()
+        return [json.loads(row[0]) for row in rows]
+
+    def clear(self):
+        with self.lock:
+            self.db.execute('DELETE FROM rooms')
+
+
+def open_directory(url):
+    '''根据配置打开房间目录：memory 或 sqlite:///文件路径'''
+    if url == 'memory':
+        return MemoryDirectory()
+    if url.startswith('sqlite:///'):
+        return SqliteDirectory(url[len('sqlite:///'):])
+    raise ValueError(f'不支持的房间目录: {url}')
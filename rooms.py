@@ -0,0 +1,206 @@
+import secrets
+import time
+from simulation import Simulation
+from snapshots import SnapshotChannel, SpectatorStream
+from interest import InterestMap
+from input_queue import InputQueue
+from ai_player import AIScheduler
+from replay import ReplayRecorder
+from maze_pool import maze_pool
+from room_directory import open_directory
+from game_state import (DEFAULT_ROOM_ID, MAX_ROOM_PLAYERS, EMPTY_ROOM_TIMEOUT,
+                        WORKER_COUNT, WORKER_INDEX, ROOM_DIRECTORY, INTEREST_RADIUS, INTEREST_CELL_SIZE,
+                        SPECTATOR_SEND_RATE, SPECTATOR_KEYFRAME_INTERVAL, REPLAY_DIRECTORY)
+
+
+class Room(Simulation):
+    '''
+    一场独立的对局
+
+    对局的玩家、迷宫、子弹、水晶、激光和胜场记录都在 Simulation 里，
+    Room 在此之上加上网络相关的状态：待处理的输入、延迟、颜色、AI 玩家和快照通道。
+    room_id 同时也是这场对局在 Socket.IO 中的房间名，所有广播都只发到这个房间。
+    观众也在这个房间里，能收到所有广播，另外还在 spectator_room 里接收共用的 game_state 快照。
+    replay_directory 为 None 时不录像（基准测试、回放用的房间），大厅里的房间由 create_room 打开录像。
+    '''
+
+    def __init__(self, room_id, name, max_players=MAX_ROOM_PLAYERS, created_at=None, seed=None, replay_directory=None):
+        super().__init__(seed)
+        self.room_id = room_id
+        self.name = name
+        self.max_players = max_players
+        self.created_at = created_at or time.time()
+        self.empty_since = self.created_at  # 从什么时候开始没有玩家和观众，有人时为 None，由 close_idle_rooms 更新
+
+        self.inputs = InputQueue()  # 下一步开始时交给 step 的玩家输入
+        self.player_latencies = {}
+        self.player_colors = {}
+        self.ai = AIScheduler(self)  # 电脑玩家
+        self.replay = ReplayRecorder(room_id, replay_directory)  # 对局录像，由 update_game 记录；不给目录时不录像
+        if seed is None:
+            # 迷宫从后台预先生成的池子里取，重新开始时不用等待；给了种子时迷宫仍然只取决于种子
+            self.maze_source = maze_pool.take
+
+        # game_state 通道的快照/增量协议状态
+        self.snapshot_channel = SnapshotChannel()
+        # 每个客户端的兴趣范围，决定它能收到哪些实体和事件
+        self.interest = InterestMap(INTEREST_RADIUS, INTEREST_CELL_SIZE)
+        # 观众：只看不玩，共用一串快照
+        self.spectators = set()
+        self.spectator_room = f'{room_id}:spectators'
+        self.spectator_stream = SpectatorStream(max(1, round(SPECTATOR_KEYFRAME_INTERVAL * SPECTATOR_SEND_RATE)))
+
+    def is_full(self):
+        return len(self.players) >= self.max_players
+
+    def summary(self):
+        return {
+            'id': self.room_id,
+            'name': self.name,
+            'players': len(self.players),
+            'max_players': self.max_players,
+            'running': self.is_game_running,
+            'spectators': len(self.spectators),
+            'worker': WORKER_INDEX,
+            'created_at': self.created_at,
+        }
+
+
+# 大厅：本进程负责的对局和玩家所在的对局
+rooms = {}
+player_rooms = {}  # 玩家ID -> room_id
+spectator_rooms = {}  # 观众 sid -> room_id
+
+# 所有进程共用的房间目录，记录每个房间由哪个进程负责
+directory = open_directory(ROOM_DIRECTORY)
+
+
+def room_owner(room_id):
+    '''负责这个房间的进程编号，房间不存在时返回 None'''
+    if room_id == DEFAULT_ROOM_ID:
+        return 0
+    entry = directory.get(room_id)
+    return entry['worker'] if entry else None
+
+
+def register_room(name=None, max_players=MAX_ROOM_PLAYERS):
+    '''
+    在目录里登记一个新房间，交给房间最少的进程负责
+
+    房间对象由负责的进程在第一个玩家加入时创建。
+    '''
+    room_id = secrets.token_hex(4)
+    while directory.get(room_id) is not None:
+        room_id = secrets.token_hex(4)
+    load = [0] * WORKER_COUNT
+    for entry in directory.all():
+        if entry['worker'] < WORKER_COUNT:
+            load[entry['worker']] += 1
+    entry = {
+        'id': room_id,
+        'name': name or room_id,
+        'players': 0,
+        'max_players': max_players,
+        'running': False,
+        'worker': load.index(min(load)),
+        'created_at': time.time(),
+    }
+    directory.put(entry)
+    return entry
+
+
+def create_room(name=None, room_id=None, max_players=MAX_ROOM_PLAYERS, created_at=None):
+    if room_id is None:
+        room_id = secrets.token_hex(4)
+        while room_id in rooms or directory.get(room_id) is not None:
+            room_id = secrets.token_hex(4)
+    room = Room(room_id, name or room_id, max_players, created_at, replay_directory=REPLAY_DIRECTORY)
+    room.generate_walls()
+    rooms[room_id] = room
+    publish_room(room)
+    return room
+
+
+def get_room(room_id):
+    '''返回本进程负责的房间，需要时按目录里的记录创建；房间不存在或者由其他进程负责时返回 None'''
+    room = rooms.get(room_id)
+    if room is not None:
+        return room
+    if room_id == DEFAULT_ROOM_ID:
+        # 默认房间总是存在，固定由 0 号进程负责
+        return create_room(name='默认房间', room_id=DEFAULT_ROOM_ID) if WORKER_INDEX == 0 else None
+    entry = directory.get(room_id)
+    if entry is None or entry['worker'] != WORKER_INDEX:
+        return None
+    return create_room(entry['name'], room_id, entry['max_players'], entry['created_at'])
+
+
+def publish_room(room):
+    # 把房间的最新状态（人数、是否在进行）写回目录，供大厅列表使用
+    directory.put(room.summary())
+
+
+def close_room(room_id):
+    room = rooms.pop(room_id, None)
+    if room is not None:
+        room.replay.stop(room.tick)
+    directory.remove(room_id)
+
+
+def room_of(player_id):
+    return rooms.get(player_rooms.get(player_id))
+
+
+def assign_player(player_id, room):
+    player_rooms[player_id] = room.room_id
+
+
+def spectated_room(sid):
+    return rooms.get(spectator_rooms.get(sid))
+
+
+def add_spectator(sid, room):
+    spectator_rooms[sid] = room.room_id
+    room.spectators.add(sid)
+
+
+def remove_spectator(sid):
+    '''观众离开，返回原来在看的房间'''
+    room = rooms.get(spectator_rooms.pop(sid, None))
+    if room:
+        room.spectators.discard(sid)
+    return room
+
+
+def release_player(player_id):
+    '''把玩家从所在房间的大厅记录中移除，返回玩家原来的房间；房间空了以后由 close_idle_rooms 过一段时间再关闭'''
+    return rooms.get(player_rooms.pop(player_id, None))
+
+
+def close_idle_rooms():
+    # 关闭连续 EMPTY_ROOM_TIMEOUT 秒没有玩家和观众的房间（刚掉线的玩家还来得及重连），
+    # 以及目录里登记给本进程、一直没有创建出来的房间
+    now = time.time()
+    for room in list(rooms.values()):
+        if room.players or room.spectators:
+            room.empty_since = None
+        elif room.empty_since is None:
+            room.empty_since = now
+        if room.empty_since is not None and room.room_id != DEFAULT_ROOM_ID and now - room.empty_since > EMPTY_ROOM_TIMEOUT:
+            close_room(room.room_id)
+        else:
+            publish_room(room)
+    for entry in directory.all():
+        if (entry['worker'] == WORKER_INDEX and entry['id'] not in rooms
+                and entry['id'] != DEFAULT_ROOM_ID and now - entry['created_at'] > EMPTY_ROOM_TIMEOUT):
+            directory.remove(entry['id'])
+
+
+def list_rooms():
+    # 所有进程的房间
+    return directory.all()
+
+
+def active_rooms():
+    # 有玩家的房间才需要运行游戏循环
+    return [room for room in rooms.values() if room.players]
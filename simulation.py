@@ -0,0 +1,403 @@
+import math
+import random
+import numpy as np
+from game_state import *
+from bullet_store import BulletStore
+from entities import EntityIds, Player, Laser, Crystal
+from navigation import NavGrid
+from position_history import PositionHistory
+from spatial_index import WallGrid, slab_times
+from maze_pool import build_maze, prepare_maze
+from utils import ray_rectangle_hit
+
+# 游戏场地边界，激光在迷宫里没有碰到墙时用
+GAME_BOUNDS = [
+    {'x': 0, 'y': 0, 'width': GAME_WIDTH, 'height': WALL_THICKNESS},  # 上边界
+    {'x': 0, 'y': GAME_HEIGHT - WALL_THICKNESS, 'width': GAME_WIDTH, 'height': WALL_THICKNESS},  # 下边界
+    {'x': 0, 'y': 0, 'width': WALL_THICKNESS, 'height': GAME_HEIGHT},  # 左边界
+    {'x': GAME_WIDTH - WALL_THICKNESS, 'y': 0, 'width': WALL_THICKNESS, 'height': GAME_HEIGHT}  # 右边界
+]
+
+# save_state 保存的属性，rng 单独保存
+SAVED_STATE = ('time', 'tick', 'history', 'rewind_ticks', 'ids', 'players', 'bullets', 'walls', 'maze', 'maze_info', 'wins',
+               'is_game_running', 'lasers', 'crystals', 'last_crystal_spawn_time')
+
+
+class Simulation:
+    '''
+    一场对局的物理模拟，不依赖 Socket.IO，也不读取系统时间
+
+    step(inputs, dt) 先按顺序应用玩家输入，再把世界推进 dt 秒，返回这一步产生的事件 [(事件名, 数据), ...]，
+    由网络层负责发送。所有随机数（迷宫、出生点、水晶位置）都来自 seed 初始化的 self.rng（设置了 maze_source 时迷宫除外），
+    时间只由 dt 累加，所以同样的 seed 和输入序列总会得到同样的结果，可以脱离服务器运行、回放和压测。
+    '''
+
+    def __init__(self, seed=None):
+        self.rng = random.Random(seed)
+        self.time = 0.0  # 模拟时间（秒）
+        self.tick = 0  # 已经执行的步数
+        self.history = PositionHistory(math.ceil(MAX_REWIND * GAME_UPDATE_RATE) + 1)  # 最近几步的坦克位置
+        self.rewind_ticks = {}  # 玩家ID -> 这个玩家开火时回溯的步数
+        self.ids = EntityIds()  # 玩家、激光和水晶的 ID，子弹的 ID 由 BulletStore 自己分配
+        self.players = {}  # 玩家ID（socket ID）-> Player
+        self.bullets = BulletStore()  # 子弹按列存储在 NumPy 数组里
+        self.walls = []
+        self.maze = []  # generate_maze 生成的迷宫格子，录像的关键帧用它重建空间索引和导航图
+        self.maze_info = {}
+        self.wins = {}
+        self.is_game_running = False
+        self.lasers = []  # [Laser, ...]
+        self.crystals = []  # [Crystal, ...]
+        self.last_crystal_spawn_time = 0.0
+        # 墙壁的空间索引，按迷宫格子分桶，和迷宫一起更换
+        self.wall_grid = WallGrid(GRID_SIZE)
+        # 迷宫格子的导航图，AI 寻路和瞄准用，也和迷宫一起更换
+        self.nav = NavGrid(GRID_SIZE)
+        # 坦克和水晶可以放置的区域，见 maze_pool.Maze
+        self.spawn_areas = []
+        self.crystal_areas = []
+        # 返回 maze_pool.Maze 的函数，例如 MazePool.take；为 None 时用 self.rng 当场生成，结果只取决于种子
+        self.maze_source = None
+
+    def add_player(self, player_id, name, color):
+        player = self.players.get(player_id)
+        if player is not None:
+            # 玩家已经存在，可能是重新连接
+            player.name = name
+            player.moving = 0
+            player.laser_end_time = 0
+            return
+        self.players[player_id] = Player(self.ids.create(), name, color)
+        self.wins.setdefault(player_id, 0)  # 初始化玩家胜利次数
+        # 确保只重生新加入玩家
+        self.respawn_player(player_id)
+
+    def remove_player(self, player_id):
+        player = self.players.pop(player_id, None)
+        if player is not None:
+            self.ids.destroy(player.id)
+        self.wins.pop(player_id, None)
+        self.history.remove(player_id)
+        self.rewind_ticks.pop(player_id, None)
+
+    def set_latency(self, player_id, latency):
+        '''
+        记录玩家测得的往返延迟（毫秒）
+
+        玩家开火时看到的其他坦克是大约一个往返延迟再加上插值延迟之前的位置，
+        激光命中按这个时间回溯目标，最多回溯 MAX_REWIND 秒。
+        '''
+        rewind = min(max(latency, 0) / 1000 + LAG_COMPENSATION_DELAY, MAX_REWIND)
+        self.rewind_ticks[player_id] = int(round(rewind * GAME_UPDATE_RATE))
+
+    def player_states(self):
+        '''发给客户端的玩家列表 {玩家ID: 字典}'''
+        return {player_id: player.to_dict() for player_id, player in self.players.items()}
+
+    def save_state(self):
+        '''
+        完整的模拟状态，用于录像的关键帧（见 replay.py）
+
+        墙壁的空间索引和导航图可以从迷宫重建，不保存。返回的字典直接引用内部对象，需要由调用者立即序列化。
+        '''
+        state = {name: getattr(self, name) for name in SAVED_STATE}
+        state['rng'] = self.rng.getstate()
+        return state
+
+    def load_state(self, state):
+        # 恢复 save_state 保存的状态，之后用同样的输入 step 会得到和原来完全一样的结果
+        for name in SAVED_STATE:
+            setattr(self, name, state[name])
+        self.rng.setstate(state['rng'])
+        if self.maze:
+            self.use_maze(prepare_maze(self.maze))
+        else:
+            self.wall_grid.rebuild(self.walls, self.maze_info.get('offset_x', 0), self.maze_info.get('offset_y', 0))
+
+    def reset_round(self):
+        # 重新生成迷宫，清空子弹和水晶，所有玩家重生
+        self.generate_walls()
+        self.bullets.clear()
+        for crystal in self.crystals:
+            self.ids.destroy(crystal.id)
+        self.crystals.clear()
+        self.history.clear()
+        for player_id in list(self.players.keys()):
+            self.respawn_player(player_id)
+
+    def apply_input(self, player_id, command):
+        '''应用一条玩家输入：{'type': 'move', 'angle'/'moving'/'rotating': ...} 或 {'type': 'fire'}'''
+        player = self.players.get(player_id)
+        if player is None or not player.alive:
+            return
+        if command['type'] == 'move':
+            for field in ('angle', 'moving', 'rotating'):
+                if field in command:
+                    setattr(player, field, command[field])
+        elif command['type'] == 'fire':
+            self.fire(player_id)
+
+    def fire(self, player_id):
+        player = self.players[player_id]
+
+        # 坦克中心到炮口的距离
+        barrel_length = max(TANK_WIDTH, TANK_HEIGHT) / 2 + 5  # 确保子弹在坦克外部生成
+
+        # 计算炮口位置
+        fire_start_x = player.x + math.cos(player.angle) * barrel_length
+        fire_start_y = player.y + math.sin(player.angle) * barrel_length
+
+        if self.time <= player.laser_end_time:
+            # 发射激光
+            laser = Laser(self.ids.create(), fire_start_x, fire_start_y, player.angle, player_id, self.time,
+                          self.rewind_ticks.get(player_id, 0))
+            self.lasers.append(reflect_laser(laser, self.wall_grid))
+        else:
+            # 发射普通子弹
+            self.bullets.add(fire_start_x, fire_start_y, player.angle, player_id, BULLET_SPEED)
+
+    def has_laser(self, player):
+        # 检查玩家是否拥有激光武器。通过比较当前时间和激光结束时间来判断。
+        return self.time <= player.laser_end_time
+
+    def step(self, inputs=(), dt=1 / GAME_UPDATE_RATE):
+        '''应用输入 [(玩家ID, 输入), ...] 并推进 dt 秒，返回事件列表'''
+        events = []
+        for player_id, command in inputs:
+            self.apply_input(player_id, command)
+
+        players = self.players
+        bullets = self.bullets
+        crystals = self.crystals
+        if not self.is_game_running:
+            events.extend(self.check_game_state())
+        self.time += dt
+        self.tick += 1
+        current_time = self.time
+        frames = dt * BASE_FRAME_RATE  # 速度常量是 60 FPS 下每帧的位移
+
+        # 更新玩家位置和角度
+        tank_radius = max(TANK_WIDTH, TANK_HEIGHT) / 2 + 2
+        for player_id, player in players.items():
+            if player.alive:
+                # 更新位置
+                angle = player.angle
+                speed = TANK_SPEED * frames * player.moving
+                new_x = player.x + math.cos(angle) * speed
+                new_y = player.y + math.sin(angle) * speed
+
+                # 更新角度，确保角度在 0 到 2π 之间
+                new_angle = (angle + ROTATING_SPEED * frames * player.rotating) % (2 * math.pi)
+
+                # 碰撞检测
+                if not self.wall_grid.collides_circle(new_x, new_y, tank_radius):
+                    player.x = new_x
+                    player.y = new_y
+                    player.angle = new_angle
+        self.history.record(self.tick, players)
+
+        # 更新水晶
+        if self.is_game_running and not crystals and current_time - self.last_crystal_spawn_time >= CRYSTAL_SPAWN_INTERVAL:
+            self.spawn_crystal(events)
+
+        for crystal in list(crystals):
+            if current_time - crystal.spawn_time >= CRYSTAL_LIFETIME:
+                self.remove_crystal(crystal)
+
+        # 检查玩家是否接触到水晶
+        for player_id, player in players.items():
+            if player.alive:
+                for crystal in crystals:
+                    if math.hypot(player.x - crystal.x, player.y - crystal.y) < TANK_WIDTH/2 + CRYSTAL_RADIUS:
+                        player.laser_end_time = current_time + LASER_DURATION
+                        self.remove_crystal(crystal)
+                        events.append(('crystal_collected', {'x': crystal.x, 'y': crystal.y}))
+                        break
+
+        # 批量移动子弹并处理撞墙反弹
+        bullets.advance(self.wall_grid, BULLET_RADIUS, frames)
+
+        # 检查玩家碰撞
+        alive_ids = [player_id for player_id, player in players.items() if player.alive]
+        hits = bullets.tank_hits([(players[pid].x, players[pid].y) for pid in alive_ids],
+                                 TANK_WIDTH / 2, TANK_HEIGHT / 2, BULLET_HIT_RADIUS)
+        # 检查子弹是否超出游戏区域或反弹次数过多
+        dead_bullets = bullets.expired(MAX_BULLET_BOUNCES, GAME_WIDTH, GAME_HEIGHT)
+        used_bullet = -1
+        for bullet_index, tank_index in hits:
+            player_id = alive_ids[tank_index]
+            # 每颗子弹只击杀一名玩家，已经死亡的玩家不会被再次击中
+            if bullet_index == used_bullet or not players[player_id].alive:
+                continue
+            used_bullet = bullet_index
+            dead_bullets[bullet_index] = True
+            self.kill_player(player_id, events)
+
+        # 移除需要删除的子弹
+        bullets.remove(dead_bullets)
+
+        # 更新激光
+        for laser in list(self.lasers):
+            if current_time - laser.creation_time > LASER_EXPIRATION_TIME:  # 激光持续时间为0.1秒
+                self.lasers.remove(laser)
+                self.ids.destroy(laser.id)
+            for player_id in self.process_laser(laser):
+                if players[player_id].alive and self.kill_player(player_id, events):
+                    break
+        return events
+
+    def kill_player(self, player_id, events):
+        '''击杀玩家并记录事件，返回这一击是否结束了本局'''
+        player = self.players[player_id]
+        player.alive = False
+        events.append(('player_killed', {'id': player_id, 'x': player.x, 'y': player.y}))
+        game_over, winner = self.check_winner(events)
+        if game_over:
+            events.append(('game_over', {'winner': winner.name, 'wins': self.wins}))
+        return game_over
+
+    def check_game_state(self):
+        players = self.players
+        if len(players) == 1:
+            return [('waiting_for_players', {'count': len(players)})]
+        elif len(players) > 1:
+            self.is_game_running = True
+            return [('game_start', None)]
+        # 如果没有玩家，重置游戏状态
+        self.is_game_running = False
+        return []
+
+    def respawn_player(self, player_id):
+        '''
+        重生玩家
+
+        在迷宫内随机选择一个不与墙壁碰撞的位置，更新玩家的位置、角度和存活状态。
+        在迷宫预先算好的出生区域（见 maze_pool.Maze）里随机选一点，一定不会碰到墙，不需要反复尝试。
+        迷宫信息不存在时先生成迷宫。
+        '''
+        if not self.maze_info:
+            self.generate_walls()  # 如果 maze_info 为空，重新生成墙壁
+
+        left, top, right, bottom = self.rng.choice(self.spawn_areas)
+        player = self.players[player_id]
+        player.x = self.rng.randint(left, right)
+        player.y = self.rng.randint(top, bottom)
+        player.angle = self.rng.uniform(0, 2*math.pi)  # 随机初始角度
+        player.turret_angle = 0
+        player.alive = True
+
+    def generate_walls(self):
+        # 换一个新迷宫：从 maze_source 取一个准备好的，或者用 self.rng 当场生成
+        self.use_maze(self.maze_source() if self.maze_source else build_maze(self.rng))
+
+    def use_maze(self, maze):
+        # 迷宫的墙壁、空间索引、导航图（包括距离场缓存）和出生区域整体替换
+        self.maze = maze.grid
+        self.walls = maze.walls
+        self.maze_info = dict(maze.maze_info)
+        self.wall_grid = maze.wall_grid
+        self.nav = maze.nav
+        self.spawn_areas = maze.spawn_areas
+        self.crystal_areas = maze.crystal_areas
+
+    def check_winner(self, events):
+        players = self.players
+        alive_players = [p for p in players.values() if p.alive]
+        if len(players) > 1 and len(alive_players) == 1:
+            winner = alive_players[0]
+            winner_id = next(id for id, player in players.items() if player is winner)
+            self.wins[winner_id] += 1
+            return True, winner
+        elif len(players) == 1:
+            events.append(('waiting_for_players', {'count': len(players)}))
+        return False, None
+
+    def spawn_crystal(self, events):
+        # 按随机顺序试每个水晶区域，区域里的点不会碰到墙，只需要检查离坦克是否太远；
+        # 所有区域都离坦克太近时这一步不生成，下一步再试
+        order = list(range(len(self.crystal_areas)))
+        self.rng.shuffle(order)
+        for index in order:
+            left, top, right, bottom = self.crystal_areas[index]
+            x = self.rng.randint(left, right)
+            y = self.rng.randint(top, bottom)
+            if any(math.hypot(player.x - x, player.y - y) < TANK_CRYSTAL_MIN_DISTANCE for player in self.players.values()):
+                continue
+
+            self.add_crystal(x, y)
+            self.last_crystal_spawn_time = self.time
+            events.append(('crystal_spawned', {'x': x, 'y': y}))
+            return
+
+    def add_crystal(self, x, y):
+        self.crystals.append(Crystal(self.ids.create(), x, y, self.time))
+
+    def remove_crystal(self, crystal):
+        self.crystals.remove(crystal)
+        self.ids.destroy(crystal.id)
+
+    def process_laser(self, laser):
+        # 激光的每一段折线和所有活着的坦克（按轴对齐矩形）一起做 slab 相交检测
+        # 目标按开火玩家的延迟回溯（laser.rewind 步），回溯的那一步已经死亡的坦克不会被击中
+        candidates = [player_id for player_id, player in self.players.items()
+                      if player.alive and player_id != laser.owner]
+        if not candidates:
+            return []
+        rewound = self.history.at(candidates, self.tick - laser.rewind) if laser.rewind else None
+        if rewound is None:
+            tanks = np.array([(self.players[player_id].x, self.players[player_id].y) for player_id in candidates])
+        else:
+            tanks, alive = rewound
+            candidates = [player_id for player_id, was_alive in zip(candidates, alive) if was_alive]
+            tanks = tanks[alive]
+            if not candidates:
+                return []
+        hit = np.zeros(len(candidates), dtype=bool)
+        start_x, start_y = laser.x, laser.y
+        for end_x, end_y in laser.reflected_points:
+            enter_x, exit_x = slab_times(start_x, end_x - start_x, tanks[:, 0] - TANK_WIDTH / 2, tanks[:, 0] + TANK_WIDTH / 2)
+            enter_y, exit_y = slab_times(start_y, end_y - start_y, tanks[:, 1] - TANK_HEIGHT / 2, tanks[:, 1] + TANK_HEIGHT / 2)
+            enter = np.maximum(enter_x, enter_y)
+            leave = np.minimum(exit_x, exit_y)
+            hit |= (enter <= leave) & (enter <= 1) & (leave >= 0)
+            start_x, start_y = end_x, end_y
+        return [player_id for player_id, is_hit in zip(candidates, hit) if is_hit]
+
+
+def reflect_laser(laser, wall_grid):
+    '''
+    计算激光的反射路径
+
+    每一段用 wall_grid.ray_cast 沿迷宫格子找最先碰到的墙，迷宫里没有碰到墙时再检查游戏边界，
+    然后按撞到的面（左右两侧或上下两侧）反射方向。结果保存在 laser.reflected_points 里。
+    '''
+    reflected_points = []
+    current_x, current_y = laser.x, laser.y
+    angle = laser.angle
+
+    for i in range(REFLECTION_TIMES):
+        dx = math.cos(angle)
+        dy = math.sin(angle)
+
+        hit = wall_grid.ray_cast(current_x, current_y, dx, dy)
+        if hit is None:
+            # 如果迷宫里没有交点，检查与游戏边界的交点
+            for bound in GAME_BOUNDS:
+                bound_hit = ray_rectangle_hit(current_x, current_y, dx, dy, bound)
+                if bound_hit and (hit is None or bound_hit[0] < hit[0]):
+                    hit = (bound_hit[0], bound, bound_hit[1])
+        if hit is None:
+            break
+
+        t, _, vertical_side = hit
+        current_x, current_y = current_x + t * dx, current_y + t * dy
+        reflected_points.append((current_x, current_y))
+
+        # 计算反射角度
+        if vertical_side:  # 撞在左右两侧
+            angle = math.pi - angle
+        else:  # 撞在上下两侧
+            angle = 2 * math.pi - angle
+
+    laser.reflected_points = reflected_points
+    return laser
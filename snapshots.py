@@ -0,0 +1,135 @@
+import numpy as np
+from wire_format import FULL_BULLET, PacketWriter, PlayerSlots, encode_delta
+
+SNAPSHOT_HISTORY = 32  # 服务器保留的快照数量，客户端确认的基线比这更旧时改发关键帧
+
+EMPTY_WORLD = {'players': {}, 'bullets': np.empty(0, dtype=FULL_BULLET), 'crystals': [], 'lasers': []}
+
+
+class SnapshotChannel:
+    '''
+    game_state 通道的快照/增量协议
+
+    每次 publish 生成一个递增编号的快照。客户端收到后回复 snapshot_ack，
+    服务器把它确认过的最新快照当作这个客户端的基线，之后只发送相对基线的增量。
+    以下情况发送关键帧（base 为 0）：刚加入、game_reset、基线已经不在历史记录里（丢包或确认太慢）、客户端主动请求。
+    开启兴趣范围过滤时，每个客户端收到的是自己兴趣格子（见 interest.InterestMap）里的那部分世界，
+    基线就是它确认过的那一帧过滤结果。基线和兴趣格子都相同的客户端共用同一份编码结果，编码格式见 wire_format。
+    '''
+
+    def __init__(self, history_size=SNAPSHOT_HISTORY):
+        self.history_size = history_size
+        self.seq = 0
+        self.history = {}  # seq -> 世界状态
+        self.views = {}  # (seq, 兴趣格子) -> 过滤后的世界状态
+        self.sent_keys = {}  # sid -> {seq: 发送这一帧时客户端所在的兴趣格子}
+        self.baselines = {}  # sid -> 已确认的快照编号，0 表示需要关键帧
+        self.slots = PlayerSlots()
+        self.writer = PacketWriter()
+
+    def add_client(self, sid):
+        self.baselines[sid] = 0
+        self.sent_keys[sid] = {}
+
+    def remove_client(self, sid):
+        self.baselines.pop(sid, None)
+        self.sent_keys.pop(sid, None)
+
+    def request_keyframe(self, sid):
+        if sid in self.baselines:
+            self.baselines[sid] = 0
+
+    def ack(self, sid, seq):
+        if sid in self.baselines and seq in self.sent_keys[sid] and seq > self.baselines[sid]:
+            self.baselines[sid] = seq
+
+    def reset(self):
+        # 迷宫重置后旧快照全部作废，所有客户端都需要关键帧
+        self.history.clear()
+        self.views.clear()
+        for sid in self.baselines:
+            self.baselines[sid] = 0
+            self.sent_keys[sid] = {}
+
+    def publish(self, world, interest=None):
+        '''
+        记录一帧世界状态，返回 [(接收者 sid 列表, 编码后的数据包), ...]
+
+        interest 是 InterestMap，为 None 时所有客户端看到完整的世界。
+        '''
+        self.seq += 1
+        expired = self.seq - self.history_size
+        self.history[self.seq] = world
+        self.history.pop(expired, None)
+        for key in [key for key in self.views if key[0] <= expired]:
+            del self.views[key]
+
+        groups = {}
+        for sid, base_seq in self.baselines.items():
+            sent_keys = self.sent_keys[sid]
+            sent_keys.pop(expired, None)
+            key = interest.keys.get(sid) if interest else None
+            if base_seq not in self.history:
+                base_seq = 0
+            base_key = sent_keys.get(base_seq)
+            sent_keys[self.seq] = key
+            groups.setdefault((base_seq, base_key, key), []).append(sid)
+
+        payloads = []
+        for (base_seq, base_key, key), sids in groups.items():
+            view = self.views.get((self.seq, key))
+            if view is None:
+                view = self.views[(self.seq, key)] = interest.view(world, key) if interest else world
+            base = self.views[(base_seq, base_key)] if base_seq else EMPTY_WORLD
+            # 没有任何变化的增量不用发送，客户端的基线保持不变
+            if encode_delta(self.writer, base, view, self.seq, base_seq):
+                payloads.append((sids, self.writer.getvalue()))
+        return payloads
+
+
+class SpectatorStream:
+    '''
+    观众的 game_state 通道
+
+    观众只看不玩，所有观众共用同一串快照：每一帧都是相对上一帧的增量，每隔 keyframe_interval 帧是一个关键帧，
+    编码一次之后广播给整个观众房间，服务器的开销和观众人数无关。观众不需要确认快照；
+    刚加入或者找不到基线的观众请求关键帧时，单独收到当前这一帧的关键帧，同一帧的关键帧也只编码一次。
+    '''
+
+    def __init__(self, keyframe_interval):
+        self.keyframe_interval = keyframe_interval
+        self.seq = 0
+        self.world = None  # 最近发出的一帧
+        self.keyframe_seq = 0
+        self.keyframe_payload = None
+        self.writer = PacketWriter()
+
+    def reset(self):
+        # 迷宫重置后下一帧改发关键帧
+        self.world = None
+
+    def publish(self, world):
+        '''编码新的一帧，返回要广播的数据包；和上一帧相比没有变化时返回 None'''
+        seq = self.seq + 1
+        keyframe = self.world is None or seq % self.keyframe_interval == 0
+        if keyframe:
+            encode_delta(self.writer, EMPTY_WORLD, world, seq, 0)
+        elif not encode_delta(self.writer, self.world, world, seq, self.seq):
+            return None
+        self.seq = seq
+        self.world = world
+        payload = self.writer.getvalue()
+        if keyframe:
+            self.keyframe_seq = seq
+            self.keyframe_payload = payload
+        return payload
+
+    def keyframe(self):
+        '''当前这一帧的关键帧，还没有任何帧时返回 None'''
+        if self.world is None:
+            return None
+        if self.keyframe_seq != self.seq:
+            encode_delta(self.writer, EMPTY_WORLD, self.world, self.seq, 0)
+            self.keyframe_seq = self.seq
+            self.keyframe_payload = self.writer.getvalue()
+        return self.keyframe_payload
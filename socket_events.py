@@ -1,170 +1,266 @@
 from app import socketio
 from flask import request
-from flask_socketio import emit
-from game_state import players, bullets,crystals, walls, maze_info, wins, player_latencies, player_colors,is_game_running, TANK_WIDTH, TANK_HEIGHT, TANK_SPEED
-from game_logic import respawn_player, check_game_state, reflect_laser
-from utils import circle_rectangle_collision
-from game_logic import lasers, generate_walls
+from flask_socketio import emit, join_room, leave_room
+from game_state import DEFAULT_ROOM_ID, MAX_NAME_LENGTH
+from game_logic import check_game_state
+from rooms import (get_room, room_of, room_owner, assign_player, release_player, publish_room, rooms,
+                   spectated_room, add_spectator, remove_spectator)
+from workers import is_local, worker_url
+from replay import replay_path
+from playback import watch, stop_watching, viewers, viewer_room
+from metrics import timed_handler
+import logging
 import random
 import time
-import math
 
-@socketio.on('player_join')
-def handle_player_join(data):    
+logger = logging.getLogger('game.net')
+
+def on(event):
+    # 和 socketio.on 一样注册事件处理函数，同时把处理耗时记到 /metrics
+    def decorator(handler):
+        socketio.on(event)(timed_handler(event, handler))
+        return handler
+    return decorator
+
+@on('player_join')
+def handle_player_join(data=None):
     player_id = request.sid
-    if player_id in players:
-        # 玩家已经存在，可能是重新连接
-        players[player_id]['name'] = data['name']
-        players[player_id]['moving'] = 0
-        players[player_id]['laser_end_time'] = 0
-    else:
-        # 新玩家加入
-        if player_id not in player_colors:
-            player_colors[player_id] = f'#{random.randint(0, 0xFFFFFF):06x}'
-        players[player_id] = {
-            'x': 0,
-            'y': 0,
-            'angle': 0,
-            'turret_angle': 0,
-            'color': player_colors[player_id],
-            'alive': True,
-            'name': data['name'],
-            'moving':0,
-            'rotating':0,
-        }
-        if player_id not in wins:
-            wins[player_id] = 0  # 初始化玩家胜利次数
-        #确保只重生新加入玩家
-        respawn_player(player_id)
-    player_latencies[player_id] = 0  # 初始化延迟
+    stop_watching(player_id)
+    stop_spectating(player_id)
+    room_id = (data.get('room') if isinstance(data, dict) else None) or DEFAULT_ROOM_ID
+    room = room_of(player_id)
+    if room and room.room_id != room_id:
+        # 换到另一个房间，先离开原来的房间
+        leave_current_room(player_id)
+        room = None
+    if room is None:
+        owner = room_owner(room_id)
+        if owner is not None and not is_local(owner):
+            # 房间由另一个进程负责，让客户端转过去
+            emit('room_moved', {'room': room_id, 'url': f"{worker_url(owner, request.scheme, request.host)}/?room={room_id}"})
+            return
+        room = get_room(room_id)
+        if room is None:
+            emit('room_not_found', {'room': room_id})
+            return
+        if room.is_full():
+            emit('room_full', {'room': room_id})
+            return
+        assign_player(player_id, room)
+        join_room(room.room_id)
+
+    players = room.players
+    if player_id not in room.player_colors:
+        room.player_colors[player_id] = f'#{random.randint(0, 0xFFFFFF):06x}'
+    room.add_player(player_id, player_name(data), room.player_colors[player_id])
+    room.replay.mark_dirty()
+    room.player_latencies[player_id] = 0  # 初始化延迟
+    room.snapshot_channel.add_client(player_id)  # 新加入的客户端先收到关键帧
     
     # 向新加入的玩家发送他们自己的 ID
-    emit('player_joined', {'id': player_id, 'players': players, 'walls': walls, 'maze_info': maze_info, 'wins': wins})
+    emit('player_joined', {'id': player_id, 'room': room.room_id, 'players': room.player_states(), 'walls': room.walls, 'maze_info': room.maze_info, 'wins': room.wins})
     
-    # 向其他玩家广播新玩家加入的消息，但不包括 ID
-    emit('player_joined', {'players': players, 'walls': walls, 'maze_info': maze_info, 'wins': wins}, broadcast=True, include_self=False)
+    # 向同房间的其他玩家广播新玩家加入的消息，但不包括 ID
+    emit('player_joined', {'players': room.player_states(), 'walls': room.walls, 'maze_info': room.maze_info, 'wins': room.wins}, to=room.room_id, include_self=False)
     
-    emit('update_player_count', {'count': len(players), 'players': [p['name'] for p in players.values()]}, broadcast=True)
-    check_game_state()  # 检查游戏状态
+    emit('update_player_count', {'count': len(players), 'players': [p.name for p in players.values()]}, to=room.room_id)
+    check_game_state(room)  # 检查游戏状态
+    publish_room(room)
 
-@socketio.on('disconnect')
-def handle_disconnect():
-    player_id = request.sid
+def leave_current_room(player_id):
+    room = room_of(player_id)
+    if room is None:
+        return
+    room.snapshot_channel.remove_client(player_id)
+    room.inputs.remove(player_id)
+    players = room.players
     if player_id in players:
-        del players[player_id]
-        print(f'玩家{player_id}断开连接')
-        if player_id in wins:
-            del wins[player_id]
-        if player_id in player_latencies:
-            del player_latencies[player_id]
+        room.remove_player(player_id)
+        room.replay.mark_dirty()
+        logger.info('玩家%s断开连接', player_id)
+        if player_id in room.player_latencies:
+            del room.player_latencies[player_id]
         try:
-            socketio.emit('player_left', {'id': player_id}, namespace='/')
-            socketio.emit('update_player_count', {'count': len(players), 'players': [p['name'] for p in players.values()], 'latencies': player_latencies}, namespace='/')
+            socketio.emit('player_left', {'id': player_id}, to=room.room_id, namespace='/')
+            socketio.emit('update_player_count', {'count': len(players), 'players': [p.name for p in players.values()], 'latencies': room.player_latencies}, to=room.room_id, namespace='/')
         except Exception as e:
-            print(f"Error during disconnect: {e}")
-    check_game_state()
+            logger.warning("Error during disconnect: %s", e)
+    leave_room(room.room_id, sid=player_id, namespace='/')
+    release_player(player_id)
+    check_game_state(room)
+    if room.room_id in rooms:
+        publish_room(room)
+
+@on('disconnect')
+def handle_disconnect():
+    stop_watching(request.sid)
+    stop_spectating(request.sid)
+    leave_current_room(request.sid)
 
-@socketio.on('connect_error')
+@on('connect_error')
 def handle_connect_error(error):
-    print(f"发现连接错误: {error}")
+    logger.warning("发现连接错误: %s", error)
     handle_disconnect()  # 调用断开连接的处理函数
 
-@socketio.on('change_name')
+@on('change_name')
 def handle_change_name(data):
     player_id = request.sid
-    if player_id in players:
-        old_name = players[player_id]['name']
-        players[player_id]['name'] = data['name']
-        player_colors[player_id] = f'#{random.randint(0, 0xFFFFFF):06x}'  # 更改颜色
-        players[player_id]['color'] = player_colors[player_id]
-        socketio.emit('name_changed', {'id': player_id, 'old_name': old_name, 'new_name': data['name'], 'new_color': player_colors[player_id]}, namespace='/')
-        socketio.emit('update_player_count', {'count': len(players), 'players': [p['name'] for p in players.values()]}, namespace='/')
-
-@socketio.on('player_move')
+    room = room_of(player_id)
+    if room and player_id in room.players:
+        players = room.players
+        old_name = players[player_id].name
+        name = players[player_id].name = player_name(data)
+        room.player_colors[player_id] = f'#{random.randint(0, 0xFFFFFF):06x}'  # 更改颜色
+        players[player_id].color = room.player_colors[player_id]
+        room.replay.mark_dirty()
+        socketio.emit('name_changed', {'id': player_id, 'old_name': old_name, 'new_name': name, 'new_color': room.player_colors[player_id]}, to=room.room_id, namespace='/')
+        socketio.emit('update_player_count', {'count': len(players), 'players': [p.name for p in players.values()]}, to=room.room_id, namespace='/')
+
+def player_name(data):
+    # 名字由客户端提供，不一定是字符串；快照里按字符串编码，所以先转换并限制长度
+    name = data.get('name') if isinstance(data, dict) else None
+    return str(name if name is not None else '')[:MAX_NAME_LENGTH]
+
+@on('player_move')
 def handle_player_move(data):
-    player_id = request.sid
-    player = players[player_id]
-    if not player['alive']:
+    # 输入在下一步开始时由模拟统一应用，所有数据由send_game_state统一发送
+    room = room_of(request.sid)
+    if room is None or request.sid not in room.players:
         return
-    if 'angle' in data:
-        player['angle'] = data['angle']
-    if 'moving' in data:
-        player['moving'] = data['moving']
-    if 'rotating' in data:
-        player['rotating'] = data['rotating']
-    
-        
-        # 所有数据由send_game_state统一发送，这里不需要打包或者发送数据
+    command = {field: data[field] for field in ('angle', 'moving', 'rotating') if field in data}
+    command['type'] = 'move'
+    room.inputs.push(request.sid, command, input_seq(data))
 
-@socketio.on('fire')
-def handle_fire():
-    player_id = request.sid
-    if player_id not in players or not players[player_id]['alive']:
+@on('fire')
+def handle_fire(data=None):
+    room = room_of(request.sid)
+    if room is None or request.sid not in room.players:
         return
-    
-    player = players[player_id]
-    current_time = time.time()
-    
-    # 坦克中心到炮口的距离
-    barrel_length = max(TANK_WIDTH, TANK_HEIGHT) / 2 + 5  # 确保子弹在坦克外部生成
-    
-    # 计算炮口位置
-    fire_start_x = player['x'] + math.cos(player['angle']) * barrel_length
-    fire_start_y = player['y'] + math.sin(player['angle']) * barrel_length
-    
-    if current_time <= player.get('laser_end_time', 0):
-        # 发射激光
-        laser = {
-            'x': fire_start_x,
-            'y': fire_start_y,
-            'angle': player['angle'],
-            'owner': player_id,
-            'creation_time': current_time
-        }
-        laser = reflect_laser(laser,walls)
-        lasers.append(laser)
-    else:
-        # 发射普通子弹
-        bullet = {
-            'x': fire_start_x,
-            'y': fire_start_y,
-            'angle': player['angle'],
-            'owner': player_id,
-            'bounces': 0
-        }
-        bullets.append(bullet)
-
-@socketio.on('ping')
+    room.inputs.push(request.sid, {'type': 'fire'}, input_seq(data))
+
+def input_seq(data):
+    # 客户端给每条输入编的递增序号，旧客户端没有这个字段；快照里按 u32 发回去
+    seq = data.get('seq') if isinstance(data, dict) else None
+    return seq if isinstance(seq, int) and 0 < seq < 2 ** 32 else None
+
+@on('ping')
 def handle_ping(data):
     try:
         client_time = data['clientTime']
         server_time = int(time.time() * 1000)  # 转换为毫秒
         emit('pong', {'clientTime': client_time, 'serverTime': server_time})
     except Exception as e:
-        print(f"Error handling ping: {e}")
+        logger.warning("Error handling ping: %s", e)
         emit('pong', {'error': 'Internal server error'})
 
 
-@socketio.on('latency')
+@on('latency')
 def handle_latency(data):
     player_id = request.sid
-    player_latencies[player_id] = data['latency']
-    emit('update_latencies', player_latencies, broadcast=True)
+    room = room_of(player_id)
+    if room is None:
+        return
+    room.player_latencies[player_id] = data['latency']
+    if isinstance(data['latency'], (int, float)):
+        # 回溯步数变了由录像在下一步记下（REWIND 记录）
+        room.set_latency(player_id, data['latency'])
+    emit('update_latencies', room.player_latencies, to=room.room_id)
+
+@on('snapshot_ack')
+def handle_snapshot_ack(data):
+    seq = data.get('seq') if isinstance(data, dict) else None
+    if not isinstance(seq, int):
+        return
+    room = room_of(request.sid) or viewer_room(request.sid)
+    if room:
+        room.snapshot_channel.ack(request.sid, seq)
+
+@on('request_keyframe')
+def handle_request_keyframe():
+    # 客户端找不到增量对应的基线（例如丢包或刚刚重置），下一帧改发关键帧
+    spectated = spectated_room(request.sid)
+    if spectated:
+        # 观众单独收到当前这一帧共用的关键帧
+        keyframe = spectated.spectator_stream.keyframe()
+        if keyframe is not None:
+            emit('game_state', keyframe)
+        return
+    room = room_of(request.sid) or viewer_room(request.sid)
+    if room:
+        room.snapshot_channel.request_keyframe(request.sid)
 
-@socketio.on('restart_game')
+@on('restart_game')
 def handle_restart_game():
-    global players
-    alive_players = [player for player in players.values() if player['alive']]
+    room = room_of(request.sid)
+    if room is None:
+        return
+    players = room.players
+    alive_players = [player for player in players.values() if player.alive]
     if len(alive_players) <= 1:
-        print('现有玩家：',alive_players)
-        global bullets,crystals
-        generate_walls()
-        bullets.clear()
-        crystals.clear()
-        for player_id in list(players.keys()):
-            respawn_player(player_id)
-        socketio.emit('game_reset', {'walls': walls, 'players': players, 'maze_info': maze_info, 'wins': wins}, namespace='/')
-        socketio.emit('rejoin_game', namespace='/')
+        logger.debug('现有玩家：%s', [player.name for player in alive_players])
+        # 每一回合单独录像，下一步开始新的录像文件
+        room.replay.stop(room.tick)
+        room.reset_round()
+        room.snapshot_channel.reset()
+        room.spectator_stream.reset()
+        socketio.emit('game_reset', {'walls': room.walls, 'players': room.player_states(), 'maze_info': room.maze_info, 'wins': room.wins}, to=room.room_id, namespace='/')
+        socketio.emit('rejoin_game', to=room.room_id, namespace='/')
     else:
-        emit('rejoin_game', namespace='/')
-        print('还有2名以上玩家存活，正在连接会话...')
\ No newline at end of file
+        emit('rejoin_game')
+        logger.debug('还有2名以上玩家存活，正在连接会话...')
+
+@on('spectate')
+def handle_spectate(data=None):
+    # 观众只看不玩：不占玩家名额，只接收广播和共用的 game_state 快照
+    sid = request.sid
+    room_id = (data.get('room') if isinstance(data, dict) else None) or DEFAULT_ROOM_ID
+    owner = room_owner(room_id)
+    if owner is not None and not is_local(owner):
+        emit('room_moved', {'room': room_id, 'url': f"{worker_url(owner, request.scheme, request.host)}/?room={room_id}&spectate=1"})
+        return
+    room = get_room(room_id)
+    if room is None:
+        emit('room_not_found', {'room': room_id})
+        return
+    stop_watching(sid)
+    stop_spectating(sid)
+    leave_current_room(sid)
+    add_spectator(sid, room)
+    join_room(room.room_id)
+    join_room(room.spectator_room)
+    emit('player_joined', {'room': room.room_id, 'players': room.player_states(), 'walls': room.walls, 'maze_info': room.maze_info, 'wins': room.wins, 'latencies': room.player_latencies})
+    keyframe = room.spectator_stream.keyframe()
+    if keyframe is not None:
+        emit('game_state', keyframe)
+    publish_room(room)
+
+def stop_spectating(sid):
+    room = remove_spectator(sid)
+    if room is None:
+        return
+    leave_room(room.room_id, sid=sid, namespace='/')
+    leave_room(room.spectator_room, sid=sid, namespace='/')
+    if room.room_id in rooms:
+        publish_room(room)
+
+@on('watch_replay')
+def handle_watch_replay(data=None):
+    # 观看录像：不加入任何对局，录像在单独的房间里重新模拟后发给这个客户端
+    replay = data.get('replay') if isinstance(data, dict) else None
+    path = replay_path(replay)
+    if path is None:
+        emit('replay_not_found', {'replay': replay})
+        return
+    # 观众的 game_state 和录像的 game_state 走同一个事件，不能同时收到
+    stop_spectating(request.sid)
+    leave_current_room(request.sid)
+    tick = data.get('tick', 0)
+    playback = watch(request.sid, path, tick if isinstance(tick, int) else 0)
+    join_room(playback.room.room_id)
+
+@on('replay_seek')
+def handle_replay_seek(data=None):
+    playback = viewers.get(request.sid)
+    tick = data.get('tick') if isinstance(data, dict) else None
+    if playback and isinstance(tick, int):
+        playback.seek_to = max(0, tick)
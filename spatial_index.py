@@ -0,0 +1,249 @@
+import numpy as np
+import math
+from utils import circle_rectangle_collision, ray_rectangle_hit
+
+
+class WallGrid:
+    '''
+    墙壁的均匀网格空间索引
+
+    按迷宫格子（GRID_SIZE）把墙壁分桶，一堵墙跨越多少个格子就登记到多少个桶里。
+    查询时只取圆形包围盒覆盖到的格子，这样坦克、子弹的碰撞检测只需要检查附近的几堵墙，
+    而不是遍历全部墙壁。
+
+    激光用 ray_cast 沿射线逐个格子前进（DDA），只检查射线经过的格子里的墙。
+
+    同时维护一份 NumPy 版本（墙壁矩形数组 + 每个格子的候选墙壁表），供子弹的批量碰撞检测使用。
+    候选表登记时墙壁外扩 table_margin，所以半径不超过 table_margin 的圆只需查圆心所在的格子。
+    '''
+
+    def __init__(self, cell_size, table_margin=4):
+        self.cell_size = cell_size
+        self.table_margin = table_margin
+        self.offset_x = 0
+        self.offset_y = 0
+        self.cells = {}
+        self.cell_bounds = (0, 0, -1, -1)  # 有墙的格子范围: min_cx, min_cy, max_cx, max_cy
+        self.rects = np.zeros((0, 4))  # 每行: left, top, right, bottom
+        self.horizontal = np.zeros(0, dtype=bool)
+        self.table = np.full((1, 1, 1), -1, dtype=np.int32)
+        self.table_origin = (0, 0)
+
+    def rebuild(self, walls, offset_x, offset_y):
+        # 迷宫重新生成后调用，重建所有的桶
+        self.offset_x = offset_x
+        self.offset_y = offset_y
+        self.cells = {}
+        for wall in walls:
+            x0, y0 = self.cell_of(wall['x'], wall['y'])
+            x1, y1 = self.cell_of(wall['x'] + wall['width'], wall['y'] + wall['height'])
+            for cy in range(y0, y1 + 1):
+                for cx in range(x0, x1 + 1):
+                    self.cells.setdefault((cx, cy), []).append(wall)
+        if self.cells:
+            self.cell_bounds = (min(cx for cx, _ in self.cells), min(cy for _, cy in self.cells),
+                                max(cx for cx, _ in self.cells), max(cy for _, cy in self.cells))
+        else:
+            self.cell_bounds = (0, 0, -1, -1)
+        self._build_table(walls)
+
+    def _build_table(self, walls):
+        self.rects = np.array([[w['x'], w['y'], w['x'] + w['width'], w['y'] + w['height']] for w in walls],
+                              dtype=float).reshape(-1, 4)
+        self.horizontal = np.array([w['width'] > w['height'] for w in walls], dtype=bool)
+
+        margin = self.table_margin
+        buckets = {}
+        for i, (left, top, right, bottom) in enumerate(self.rects.tolist()):
+            x0, y0 = self.cell_of(left - margin, top - margin)
+            x1, y1 = self.cell_of(right + margin, bottom + margin)
+            for cy in range(y0, y1 + 1):
+                for cx in range(x0, x1 + 1):
+                    buckets.setdefault((cx, cy), []).append(i)
+        if not buckets:
+            self.table = np.full((1, 1, 1), -1, dtype=np.int32)
+            self.table_origin = (0, 0)
+            return
+
+        min_cx = min(cx for cx, _ in buckets)
+        min_cy = min(cy for _, cy in buckets)
+        cols = max(cx for cx, _ in buckets) - min_cx + 1
+        rows = max(cy for _, cy in buckets) - min_cy + 1
+        depth = max(len(b) for b in buckets.values())
+        self.table = np.full((rows, cols, depth), -1, dtype=np.int32)
+        for (cx, cy), indices in buckets.items():
+            self.table[cy - min_cy, cx - min_cx, :len(indices)] = indices
+        self.table_origin = (min_cx, min_cy)
+
+    def cell_of(self, x, y):
+        return (int((x - self.offset_x) // self.cell_size),
+                int((y - self.offset_y) // self.cell_size))
+
+    def query(self, x, y, radius):
+        '''返回可能与以 (x, y) 为圆心、radius 为半径的圆相交的墙壁（已去重）'''
+        x0, y0 = self.cell_of(x - radius, y - radius)
+        x1, y1 = self.cell_of(x + radius, y + radius)
+        if x0 == x1 and y0 == y1:
+            return self.cells.get((x0, y0), ())
+
+        nearby = []
+        seen = set()
+        for cy in range(y0, y1 + 1):
+            for cx in range(x0, x1 + 1):
+                for wall in self.cells.get((cx, cy), ()):
+                    if id(wall) not in seen:
+                        seen.add(id(wall))
+                        nearby.append(wall)
+        return nearby
+
+    def collides_circle(self, x, y, radius):
+        return any(circle_rectangle_collision(x, y, radius, wall) for wall in self.query(x, y, radius))
+
+    def first_circle_hit(self, x, y, radius):
+        # 返回第一堵与圆相交的墙，没有则返回 None
+        for wall in self.query(x, y, radius):
+            if circle_rectangle_collision(x, y, radius, wall):
+                return wall
+        return None
+
+    def ray_cast(self, x, y, dx, dy):
+        '''
+        从 (x, y) 沿方向 (dx, dy) 射出的射线最先碰到的墙
+
+        按 DDA 依次访问射线经过的格子，在格子里找到的交点不超过离开这个格子的时刻就是答案，
+        耗时只和经过的格子数有关。返回 (t, 墙, 是否撞在左右两侧)，交点为 (x + t * dx, y + t * dy)；没有碰到任何墙时返回 None。
+        '''
+        min_cx, min_cy, max_cx, max_cy = self.cell_bounds
+        if min_cx > max_cx:
+            return None
+        size = self.cell_size
+        # 先把射线裁剪到有墙的格子范围内
+        enter, leave = 0.0, math.inf
+        for start, delta, low, high in ((x, dx, self.offset_x + min_cx * size, self.offset_x + (max_cx + 1) * size),
+                                        (y, dy, self.offset_y + min_cy * size, self.offset_y + (max_cy + 1) * size)):
+            if delta == 0:
+                if not low <= start <= high:
+                    return None
+                continue
+            t1, t2 = sorted(((low - start) / delta, (high - start) / delta))
+            enter, leave = max(enter, t1), min(leave, t2)
+        if enter > leave:
+            return None
+
+        cx, cy = self.cell_of(x + dx * enter, y + dy * enter)
+        cx = min(max(cx, min_cx), max_cx)
+        cy = min(max(cy, min_cy), max_cy)
+        step_x = 1 if dx > 0 else -1
+        step_y = 1 if dy > 0 else -1
+        # 射线到达下一条竖直/水平格线的时刻，以及每跨过一个格子增加的时刻
+        next_x = (self.offset_x + (cx + (dx > 0)) * size - x) / dx if dx != 0 else math.inf
+        next_y = (self.offset_y + (cy + (dy > 0)) * size - y) / dy if dy != 0 else math.inf
+        delta_x = size / abs(dx) if dx != 0 else math.inf
+        delta_y = size / abs(dy) if dy != 0 else math.inf
+
+        while min_cx <= cx <= max_cx and min_cy <= cy <= max_cy:
+            cell_exit = min(next_x, next_y)
+            best = None
+            for wall in self.cells.get((cx, cy), ()):
+                hit = ray_rectangle_hit(x, y, dx, dy, wall)
+                if hit and hit[0] <= cell_exit and (best is None or hit[0] < best[0]):
+                    best = (hit[0], wall, hit[1])
+            if best:
+                return best
+            if next_x < next_y:
+                cx += step_x
+                next_x += delta_x
+            else:
+                cy += step_y
+                next_y += delta_y
+        return None
+
+    def first_circle_hits(self, xs, ys, radius):
+        '''
+        批量版本的 first_circle_hit，radius 不能超过 table_margin
+
+        返回每个圆碰到的第一堵墙在 rects 中的下标，没有碰到则为 -1。
+        落在表外的点会被夹到最近的边缘格子，多出来的候选墙会被精确检测排除掉。
+        '''
+        result = np.full(len(xs), -1, dtype=np.int64)
+        if len(xs) == 0 or len(self.rects) == 0:
+            return result
+        rows, cols, _ = self.table.shape
+        min_cx, min_cy = self.table_origin
+        cx = np.clip(((xs - self.offset_x) // self.cell_size).astype(np.int64) - min_cx, 0, cols - 1)
+        cy = np.clip(((ys - self.offset_y) // self.cell_size).astype(np.int64) - min_cy, 0, rows - 1)
+        candidates = self.table[cy, cx]  # (n, depth)
+        rects = self.rects[candidates]  # -1 取到的最后一行会被 candidates >= 0 排除
+        px = xs[:, None]
+        py = ys[:, None]
+        closest_x = np.clip(px, rects[..., 0], rects[..., 2])
+        closest_y = np.clip(py, rects[..., 1], rects[..., 3])
+        hits = ((px - closest_x) ** 2 + (py - closest_y) ** 2 <= radius * radius) & (candidates >= 0)
+        any_hit = hits.any(axis=1)
+        first = hits.argmax(axis=1)
+        result[any_hit] = candidates[any_hit, first[any_hit]]
+        return result
+
+    def first_segment_hits(self, xs, ys, dxs, dys, radius):
+        '''
+        子弹的连续碰撞检测：半径为 radius 的圆沿线段 (x, y) -> (x + dx, y + dy) 移动时最先碰到的墙
+
+        墙壁按半径外扩成矩形后与线段做 slab 求交，返回 (墙壁下标, 碰撞时刻 t ∈ [0, 1], 是否撞在左右两侧)，
+        没有碰到的为 (-1, inf, False)。起点已经在墙里的墙会被忽略。
+        radius 不能超过 table_margin，每段位移在 x、y 方向都不能超过 cell_size，
+        这样线段经过的格子都在包围盒四个角所在的格子里。
+        '''
+        n = len(xs)
+        result = np.full(n, -1, dtype=np.int64)
+        times = np.full(n, np.inf)
+        sides = np.zeros(n, dtype=bool)
+        if n == 0 or len(self.rects) == 0:
+            return result, times, sides
+        rows, cols, _ = self.table.shape
+        min_cx, min_cy = self.table_origin
+        end_x = xs + dxs
+        end_y = ys + dys
+        cx0 = np.clip(((np.minimum(xs, end_x) - self.offset_x) // self.cell_size).astype(np.int64) - min_cx, 0, cols - 1)
+        cx1 = np.clip(((np.maximum(xs, end_x) - self.offset_x) // self.cell_size).astype(np.int64) - min_cx, 0, cols - 1)
+        cy0 = np.clip(((np.minimum(ys, end_y) - self.offset_y) // self.cell_size).astype(np.int64) - min_cy, 0, rows - 1)
+        cy1 = np.clip(((np.maximum(ys, end_y) - self.offset_y) // self.cell_size).astype(np.int64) - min_cy, 0, rows - 1)
+        # 大多数线段只在一个格子里，只查这一个格子的候选墙；跨格子的线段查包围盒四个角的格子
+        single = np.flatnonzero((cx0 == cx1) & (cy0 == cy1))
+        crossing = np.flatnonzero((cx0 != cx1) | (cy0 != cy1))
+        if len(single):
+            candidates = self.table[cy0[single], cx0[single]]
+            result[single], times[single], sides[single] = self._segment_hits(
+                xs[single], ys[single], dxs[single], dys[single], radius, candidates)
+        if len(crossing):
+            a, b, c, d = cx0[crossing], cx1[crossing], cy0[crossing], cy1[crossing]
+            candidates = np.concatenate([self.table[c, a], self.table[c, b], self.table[d, a], self.table[d, b]], axis=1)
+            result[crossing], times[crossing], sides[crossing] = self._segment_hits(
+                xs[crossing], ys[crossing], dxs[crossing], dys[crossing], radius, candidates)
+        return result, times, sides
+
+    def _segment_hits(self, xs, ys, dxs, dys, radius, candidates):
+        rects = self.rects[candidates]  # -1 取到的最后一行会被 candidates >= 0 排除
+        enter_x, exit_x = slab_times(xs[:, None], dxs[:, None], rects[..., 0] - radius, rects[..., 2] + radius)
+        enter_y, exit_y = slab_times(ys[:, None], dys[:, None], rects[..., 1] - radius, rects[..., 3] + radius)
+        enter = np.maximum(enter_x, enter_y)
+        hits = (enter <= np.minimum(exit_x, exit_y)) & (enter >= 0) & (enter <= 1) & (candidates >= 0)
+        enter[~hits] = np.inf
+        first = enter.argmin(axis=1)
+        rows = np.arange(len(xs))
+        times = enter[rows, first]
+        hit = np.isfinite(times)
+        walls = np.where(hit, candidates[rows, first], -1)
+        sides = hit & (enter_x[rows, first] >= enter_y[rows, first])
+        return walls, times, sides
+
+
+def slab_times(start, delta, low, high):
+    '''
+    线段在一个轴上进入、离开 [low, high] 的时刻
+
+    不在这个轴上移动的线段当成移动了极小的距离：在区间内时得到 (-很大, 很大)，在区间外时两个时刻同号且很大，不会被当成相交。
+    '''
+    inverse = 1 / np.where(delta == 0, 1e-12, delta)
+    t1 = (low - start) * inverse
+    t2 = (high - start) * inverse
+    return np.minimum(t1, t2), np.maximum(t1, t2)
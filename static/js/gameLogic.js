@@ -15,7 +15,7 @@ function joinGame() {
   if (name) {
     console.log("Joining game with name:", name);
     localStorage.setItem("playerName", name);
-    socket.emit("player_join", { name: name });
+    socket.emit("player_join", { name: name, room: gameState.roomId });
     document.getElementById("joinForm").style.display = "none";
     showPlayerInfo(name);
     document.getElementById("gameInfo").style.display = "flex";
@@ -1,9 +1,15 @@
 const FPS = 30; // 帧率
 const explosionDuration = 500; // 爆炸动画持续时间（毫秒）
-const INTERPOLATION_DURATION = 50; // 插值持续时间（毫秒）
+const INTERPOLATION_DURATION = 50; // 插值持续时间（毫秒），和服务器 GAME_STATE_SEND_RATE（20 Hz）的发送间隔一致
 const FIRE_COOLDOWN = 300; // 冷却时间，单位为毫秒
 const CRYSTAL_RADIUS = 15;
 const CRYSTAL_FADE_DURATION = 1000; // 1秒淡出时间
+const SNAPSHOT_HISTORY = 64; // 客户端保留的快照数量，用作增量的基线
+// 客户端预测用的移动常量，和服务器 game_state.py 一致
+const SIMULATION_STEP = 1000 / 60; // 服务器的模拟步长（毫秒）
+const TANK_SPEED = 2; // 每步移动的像素
+const ROTATING_SPEED = 0.05; // 每步旋转的弧度
+const TANK_COLLISION_RADIUS = 12; // max(TANK_WIDTH, TANK_HEIGHT) / 2 + 2
 
 const gameState = {
   gameArea: null, // 游戏区域SVG元素
@@ -36,6 +42,11 @@ const gameState = {
   pendingWinner: null,
   lastFireTime: 0,
   crystals: [],
+  snapshots: {}, // 快照编号 -> 还原后的完整游戏状态
+  inputSeq: 0, // 最近发送的输入编号，服务器用它丢弃重复和乱序的输入
+  roomId: new URLSearchParams(window.location.search).get("room"), // 要加入的房间，为空时加入默认房间
+  replayId: new URLSearchParams(window.location.search).get("replay"), // 要观看的录像，为空时正常加入游戏
+  spectating: new URLSearchParams(window.location.search).has("spectate"), // 以观众身份观看房间，不加入游戏
 };
 
 export {
@@ -45,5 +56,10 @@ export {
   FIRE_COOLDOWN,
   CRYSTAL_RADIUS,
   CRYSTAL_FADE_DURATION,
+  SNAPSHOT_HISTORY,
+  SIMULATION_STEP,
+  TANK_SPEED,
+  ROTATING_SPEED,
+  TANK_COLLISION_RADIUS,
   gameState,
 };
@@ -1,5 +1,5 @@
 import { gameState, FIRE_COOLDOWN } from "./gameState.js";
-import { socket } from "./socket.js";
+import { sendInput } from "./socket.js";
 import { joinGame } from "./gameLogic.js";
 import {
   showJoystick,
@@ -56,7 +56,7 @@ function handleMouseDown(event) {
     const currentTime = performance.now();
     if (currentTime - gameState.lastFireTime >= FIRE_COOLDOWN) {
       console.log("Attempting to fire");
-      socket.emit("fire");
+      sendInput("fire");
       gameState.lastFireTime = currentTime;
     } else {
       console.log("Fire on cooldown");
@@ -70,7 +70,7 @@ function handleMouseUp(event) {
   if (event.button === 0) {
     // 左键松开
     gameState.isMoving = false;
-    socket.emit("player_move", { moving: 0 });
+    sendInput("player_move", { moving: 0 });
     console.log("鼠标已松开");
   }
 }
@@ -111,13 +111,13 @@ function handleTouchEnd(event) {
     const currentAngle = gameState.players[gameState.myId]
       ? gameState.players[gameState.myId].angle
       : 0;
-    socket.emit("player_move", { angle: currentAngle, moving: false });
+    sendInput("player_move", { angle: currentAngle, moving: false });
   } else if (performance.now() - gameState.touchStartTime < 300) {
     // 如果触摸时间小于 300ms，视为单击，触发发射
     const currentTime = performance.now();
     if (currentTime - gameState.lastFireTime >= FIRE_COOLDOWN) {
       console.log("Attempting to fire");
-      socket.emit("fire");
+      sendInput("fire");
       gameState.lastFireTime = currentTime;
     } else {
       console.log("Fire on cooldown");
@@ -158,7 +158,7 @@ function updateTouchPosition(touch) {
     const dx = gameState.targetX - player.x;
     const dy = gameState.targetY - player.y;
     const angle = Math.atan2(dy, dx);
-    socket.emit("player_move", { angle: angle, moving: true });
+    sendInput("player_move", { angle: angle, moving: true });
   }
 }
 
@@ -216,7 +216,7 @@ function handleFireButtonClick() {
   const currentTime = performance.now();
   if (currentTime - gameState.lastFireTime >= FIRE_COOLDOWN) {
     console.log("Attempting to fire");
-    socket.emit("fire");
+    sendInput("fire");
     gameState.lastFireTime = currentTime;
   } else {
     console.log("Fire on cooldown");
@@ -1,8 +1,9 @@
 import { joinGame, startGame, restartGame } from "./gameLogic.js";
 import { drawPlayers } from "./rendering.js";
-import { gameState, INTERPOLATION_DURATION } from "./gameState.js";
-import { measureLatency, socket } from "./socket.js";
+import { gameState, INTERPOLATION_DURATION, SIMULATION_STEP } from "./gameState.js";
+import { measureLatency, socket, sendInput } from "./socket.js";
 import "./socket.js"; // 导入socket.js以确保它被执行
+import { prediction, advancePrediction } from "./prediction.js";
 import {
   logElementState,
   createSVGElement,
@@ -46,6 +47,27 @@ import {
   disableScrolling,
 } from "./input.js";
 
+const REPLAY_SEEK_SECONDS = 10; // 看录像时左右方向键每次跳转的秒数
+
+// 看录像：不加入游戏，URL 里的 t 是开始播放的秒数
+function watchReplay() {
+  const seconds = Number(new URLSearchParams(window.location.search).get("t")) || 0;
+  socket.emit("watch_replay", {
+    replay: gameState.replayId,
+    tick: Math.max(0, Math.round((seconds * 1000) / SIMULATION_STEP)),
+  });
+  document.addEventListener("keydown", function (event) {
+    if (event.key !== "ArrowLeft" && event.key !== "ArrowRight") {
+      return;
+    }
+    const current = gameState.currentGameState ? gameState.currentGameState.tick : 0;
+    const offset = Math.round((REPLAY_SEEK_SECONDS * 1000) / SIMULATION_STEP);
+    socket.emit("replay_seek", {
+      tick: Math.max(0, current + (event.key === "ArrowLeft" ? -offset : offset)),
+    });
+  });
+}
+
 // 页面加载完成后的初始化
 window.onload = function () {
   setInterval(measureLatency, 5000); // 每5秒测量一次延迟
@@ -63,10 +85,14 @@ window.onload = function () {
   });
 
   const savedName = localStorage.getItem("playerName");
-  if (savedName) {
+  if (gameState.replayId) {
+    watchReplay();
+  } else if (gameState.spectating) {
+    socket.emit("spectate", { room: gameState.roomId });
+  } else if (savedName) {
     console.log("Saved name found:", savedName);
     showPlayerInfo(savedName);
-    socket.emit("player_join", { name: savedName }); //改为rejoin？
+    socket.emit("player_join", { name: savedName, room: gameState.roomId }); //改为rejoin？
   } else {
     console.log("No saved name, showing join form");
     showJoinForm();
@@ -190,7 +216,11 @@ function updateGameState() {
     for (let id in gameState.currentGameState.players) {
       // 如果本地玩家对象中不存在该玩家，直接添加
       if (!gameState.players[id]) {
-        gameState.players[id] = gameState.currentGameState.players[id];
+        // 复制一份，避免插值时改写作为增量基线的快照
+        gameState.players[id] = Object.assign(
+          {},
+          gameState.currentGameState.players[id]
+        );
       } else {
         // 获取上一帧的玩家状态，如果不存在则使用当前状态
         const lastPlayer =
@@ -257,6 +287,14 @@ function updateGameState() {
 
     gameState.lasers = gameState.currentGameState.lasers;
 
+    // 自己的坦克用本地预测的位置，不等服务器的快照
+    const me = gameState.players[gameState.myId];
+    if (me && prediction.active) {
+      me.x = prediction.state.x;
+      me.y = prediction.state.y;
+      me.angle = prediction.state.angle;
+    }
+
     // 删除不再存在的玩家
     for (let id in gameState.players) {
       if (!gameState.currentGameState.players[id]) {
@@ -277,6 +315,7 @@ function gameLoop(currentTime) {
 
   requestAnimationFrame(gameLoop);
 
+  advancePrediction(currentTime);
   if (gameState.lastGameState && gameState.currentGameState) {
     gameState.interpolationFactor = Math.min(
       1,
@@ -301,12 +340,12 @@ function gameLoop(currentTime) {
 
     if (distanceToTarget > 5) {
       // 如果距离目标还有一定距离，继续移动
-      socket.emit("player_move", { angle: angle, moving: true });
+      sendInput("player_move", { angle: angle, moving: true });
     } else {
       // 如果已经接近目标，停止移动
       gameState.isMoving = false;
       gameState.isTouchMoving = false;
-      socket.emit("player_move", { angle: angle, moving: false });
+      sendInput("player_move", { angle: angle, moving: false });
     }
   }
 
@@ -0,0 +1,153 @@
+// 本地坦克的客户端预测和服务器对账
+//
+// 自己的坦克不等服务器的快照，按和服务器 Simulation.step 相同的移动和碰撞规则在本地以 60 Hz 固定步长模拟，
+// 输入发出的同时就生效。快照里带着服务器已经应用的最大输入编号和应用它的那一步（FIELD_INPUT），
+// 收到快照时从服务器的位置出发，重新模拟服务器还没有应用的输入，得到新的预测位置。
+import {
+  gameState,
+  SIMULATION_STEP,
+  TANK_SPEED,
+  ROTATING_SPEED,
+  TANK_COLLISION_RADIUS,
+} from "./gameState.js";
+
+const MAX_STEPS_PER_FRAME = 10; // 页面在后台停了很久时，最多补这么多步
+const MAX_REPLAY_STEPS = 120; // 对账时最多重新模拟 2 秒
+// 快照里的坐标是量化过的，可能比服务器的真实位置离墙近一点点，碰撞半径留一点余量，免得贴墙时卡住
+const QUANTIZATION_SLACK = 0.05;
+
+const prediction = {
+  active: false, // 自己的坦克活着并且收到过快照时才预测
+  frame: 0, // 本地已经模拟的步数
+  accumulator: 0,
+  lastTime: null,
+  state: null, // 预测的 { x, y, angle, moving, rotating }
+  confirmed: { moving: 0, rotating: 0 }, // 服务器已经应用的输入合并后的控制状态
+  pending: [], // 服务器还没确认的输入 [{ seq, frame, fields }]
+  ack: null, // 最近确认的输入 { seq, frame }，frame 是这条输入在本地生效的那一步
+};
+
+// 发送输入时调用，输入从下一步开始生效
+function recordInput(seq, data) {
+  const fields = {};
+  for (const field of ["angle", "moving", "rotating"]) {
+    if (field in data) {
+      fields[field] = Number(data[field]);
+    }
+  }
+  prediction.pending.push({ seq: seq, frame: prediction.frame, fields: fields });
+  if (prediction.state) {
+    applyFields(prediction.state, fields);
+  }
+}
+
+function applyFields(target, fields) {
+  Object.assign(target, fields);
+}
+
+function collidesWithWall(x, y) {
+  const radius = TANK_COLLISION_RADIUS - QUANTIZATION_SLACK;
+  for (const wall of gameState.walls) {
+    const closestX = Math.max(wall.x, Math.min(x, wall.x + wall.width));
+    const closestY = Math.max(wall.y, Math.min(y, wall.y + wall.height));
+    const dx = x - closestX;
+    const dy = y - closestY;
+    if (dx * dx + dy * dy <= radius * radius) {
+      return true;
+    }
+  }
+  return false;
+}
+
+// 和服务器 Simulation.step 里的坦克移动一致：撞墙时这一步的移动和转向都不生效
+function stepTank(state) {
+  const speed = TANK_SPEED * state.moving;
+  const newX = state.x + Math.cos(state.angle) * speed;
+  const newY = state.y + Math.sin(state.angle) * speed;
+  const fullTurn = 2 * Math.PI;
+  const newAngle = (((state.angle + ROTATING_SPEED * state.rotating) % fullTurn) + fullTurn) % fullTurn;
+  if (!collidesWithWall(newX, newY)) {
+    state.x = newX;
+    state.y = newY;
+    state.angle = newAngle;
+  }
+}
+
+// 每个动画帧调用，按实际流逝的时间推进固定步长的预测
+function advancePrediction(currentTime) {
+  if (prediction.lastTime === null) {
+    prediction.lastTime = currentTime;
+  }
+  prediction.accumulator += currentTime - prediction.lastTime;
+  prediction.lastTime = currentTime;
+  let steps = 0;
+  // 留一点余量，免得浮点误差让累积的时间差一点点不够一步
+  while (prediction.accumulator >= SIMULATION_STEP - 1e-6) {
+    prediction.accumulator -= SIMULATION_STEP;
+    prediction.frame += 1;
+    if (prediction.active && steps < MAX_STEPS_PER_FRAME) {
+      stepTank(prediction.state);
+    }
+    steps += 1;
+  }
+}
+
+// 收到快照后，从服务器的位置出发重新模拟还没确认的输入
+function reconcile(snapshot) {
+  const own = snapshot.players[gameState.myId];
+  if (!own || !own.alive) {
+    prediction.active = false;
+    prediction.state = null;
+    return;
+  }
+
+  const [ackSeq, ackTick] = own.input || [0, 0];
+  while (prediction.pending.length && prediction.pending[0].seq <= ackSeq) {
+    const input = prediction.pending.shift();
+    applyFields(prediction.confirmed, input.fields);
+    if (input.seq === ackSeq) {
+      prediction.ack = { seq: ackSeq, frame: input.frame };
+    }
+  }
+
+  // 服务器第 ackTick 步应用了输入 ackSeq，快照是第 snapshot.tick 步之后的状态，
+  // 对应本地的第 ack.frame + (snapshot.tick - ackTick) 步
+  let baseFrame = prediction.frame;
+  if (prediction.ack && prediction.ack.seq === ackSeq) {
+    baseFrame = prediction.ack.frame + (snapshot.tick - ackTick);
+  }
+  baseFrame = Math.min(prediction.frame, Math.max(baseFrame, prediction.frame - MAX_REPLAY_STEPS));
+
+  const state = {
+    x: own.x,
+    y: own.y,
+    angle: own.angle,
+    moving: prediction.confirmed.moving,
+    rotating: prediction.confirmed.rotating,
+  };
+  let next = 0;
+  for (let frame = baseFrame; frame < prediction.frame; frame++) {
+    while (next < prediction.pending.length && prediction.pending[next].frame <= frame) {
+      applyFields(state, prediction.pending[next].fields);
+      next += 1;
+    }
+    stepTank(state);
+  }
+  for (; next < prediction.pending.length; next++) {
+    applyFields(state, prediction.pending[next].fields);
+  }
+
+  prediction.state = state;
+  prediction.active = true;
+}
+
+// 换房间、重新加入时丢掉旧的预测状态
+function resetPrediction() {
+  prediction.active = false;
+  prediction.state = null;
+  prediction.pending = [];
+  prediction.ack = null;
+  prediction.confirmed = { moving: 0, rotating: 0 };
+}
+
+export { prediction, recordInput, advancePrediction, reconcile, resetPrediction };
@@ -5,6 +5,7 @@ import {
   FIRE_COOLDOWN,
   CRYSTAL_RADIUS,
   CRYSTAL_FADE_DURATION,
+  SNAPSHOT_HISTORY,
   gameState,
 } from "./gameState.js";
 import { drawPlayers } from "./rendering.js";
@@ -25,15 +26,14 @@ import {
 } from "./ui.js";
 import { startGame } from "./gameLogic.js";
 import { addExplosion } from "./utils.js";
+import { decodeGameState } from "./wireFormat.js";
+import { recordInput, reconcile, resetPrediction } from "./prediction.js";
 
 // 设置WebSocket协议
 const protocol = window.location.protocol === "https:" ? "wss:" : "ws:";
 const host = window.location.hostname;
 const port = window.location.port || (protocol === "wss:" ? "443" : "80");
 
-// 引入msgpack库
-const msgpack = window.msgpack;
-
 // 建立WebSocket连接
 const socket = io(`${protocol}//${host}:${port}`, {
   transports: ["websocket", "polling"],
@@ -64,9 +64,12 @@ socket.on("waiting_for_players", () => {
 });
 
 socket.on("rejoin_game", () => {
+  if (gameState.spectating) {
+    return;
+  }
   const savedName = localStorage.getItem("playerName");
   if (savedName) {
-    socket.emit("player_join", { name: savedName });
+    socket.emit("player_join", { name: savedName, room: gameState.roomId });
   } else {
     showJoinForm();
   }
@@ -78,16 +81,17 @@ socket.on("game_reset", (data) => {
   gameState.players = {};
   gameState.bullets = [];
   gameState.crystals = [];
+  gameState.snapshots = {};
   gameState.wins = data.wins;
   adjustCanvasSize();
   updateScoreBoard();
   document.getElementById("gameOverModal").style.display = "none";
   document.getElementById("waitingModal").style.display = "none";
 
-  // 重新加入游戏
+  // 重新加入游戏，观众继续观看
   const savedName = localStorage.getItem("playerName");
-  if (savedName) {
-    socket.emit("player_join", { name: savedName });
+  if (savedName && !gameState.spectating) {
+    socket.emit("player_join", { name: savedName, room: gameState.roomId });
   }
 });
 
@@ -102,6 +106,13 @@ socket.on("player_joined", (data) => {
     gameState.myId = data.id;
     console.log("gameState.myId set to:", gameState.myId);
   }
+  if (data.room) {
+    gameState.roomId = data.room;
+  }
+  if (data.id) {
+    // 自己重新加入，之前的预测作废
+    resetPrediction();
+  }
 
   adjustCanvasSize();
   updateScoreBoard();
@@ -117,6 +128,30 @@ socket.on("player_joined", (data) => {
   updatePlayerList();
 });
 
+socket.on("room_full", (data) => {
+  alert(`房间 ${data.room} 已满`);
+  showJoinForm();
+});
+
+socket.on("room_moved", (data) => {
+  // 房间由另一个游戏进程负责，转到那个进程的页面
+  window.location.href = data.url;
+});
+
+socket.on("room_not_found", (data) => {
+  alert(`找不到房间 ${data.room}`);
+  showJoinForm();
+});
+
+socket.on("replay_not_found", (data) => {
+  alert(`找不到录像 ${data.replay}`);
+});
+
+socket.on("replay_ended", () => {
+  console.log("录像播放结束");
+  document.getElementById("waitingModal").style.display = "none";
+});
+
 socket.on("update_latencies", (latencies) => {
   gameState.playerLatencies = latencies;
   if (gameState.isPlayerListVisible) {
@@ -164,9 +199,81 @@ socket.on("game_over", (data) => {
   }
 });
 
+// 用增量数据包和它的基线还原出完整的游戏状态，本地没有基线时返回 null
+function applySnapshot(packet) {
+  let base;
+  if (packet.base === 0) {
+    // 关键帧
+    base = { players: {}, slots: {}, bullets: [], crystals: [], lasers: [] };
+  } else {
+    base = gameState.snapshots[packet.base];
+    if (!base) {
+      return null;
+    }
+  }
+
+  // 玩家按槽位编码，先处理移除再处理新增，槽位可能被新玩家复用
+  const players = Object.assign({}, base.players);
+  const slots = Object.assign({}, base.slots);
+  for (const slot of packet.removed_players) {
+    const id = slots[slot];
+    delete slots[slot];
+    if (players[id] && players[id].slot === slot) {
+      delete players[id];
+    }
+  }
+  for (const entry of packet.players) {
+    const id = entry.id !== undefined ? entry.id : slots[entry.slot];
+    if (id === undefined) {
+      return null;
+    }
+    slots[entry.slot] = id;
+    const fields = Object.assign({}, entry);
+    delete fields.id;
+    players[id] = Object.assign({}, players[id], fields);
+  }
+
+  const removedBullets = new Set(packet.removed_bullets);
+  const bullets = new Map();
+  for (const bullet of base.bullets) {
+    if (!removedBullets.has(bullet.id)) {
+      bullets.set(bullet.id, bullet);
+    }
+  }
+  for (const bullet of packet.bullets) {
+    bullets.set(bullet.id, Object.assign({}, bullets.get(bullet.id), bullet));
+  }
+
+  const snapshot = {
+    players: players,
+    slots: slots,
+    bullets: Array.from(bullets.values()),
+    crystals: packet.crystals || base.crystals,
+    lasers: packet.lasers || base.lasers,
+    tick: packet.tick,
+  };
+
+  // 保存快照作为之后增量的基线，并清理太旧的快照
+  gameState.snapshots[packet.seq] = snapshot;
+  for (const seq in gameState.snapshots) {
+    if (seq <= packet.seq - SNAPSHOT_HISTORY) {
+      delete gameState.snapshots[seq];
+    }
+  }
+  return snapshot;
+}
+
 socket.on("game_state", (binaryData) => {
   try {
-    const decodedData = msgpack.decode(new Uint8Array(binaryData));
+    const packet = decodeGameState(binaryData);
+    const decodedData = applySnapshot(packet);
+    if (!decodedData) {
+      // 找不到基线，请求服务器发送关键帧
+      socket.emit("request_keyframe");
+      return;
+    }
+    socket.emit("snapshot_ack", { seq: packet.seq });
+    reconcile(decodedData);
     gameState.lastGameState = gameState.currentGameState;
     gameState.currentGameState = decodedData;
     gameState.lastUpdateTime = performance.now();
@@ -177,9 +284,26 @@ socket.on("game_state", (binaryData) => {
     gameState.crystals = gameState.crystals.filter((crystal) =>
       gameState.currentGameState.crystals.some(
         (serverCrystal) =>
-          serverCrystal.x === crystal.x && serverCrystal.y === crystal.y
+          // 服务器按整数像素发送水晶坐标
+          serverCrystal.x === Math.round(crystal.x) &&
+          serverCrystal.y === Math.round(crystal.y)
       )
     );
+    // 进入兴趣范围的水晶没有收到 crystal_spawned，从快照里补上
+    for (const serverCrystal of gameState.currentGameState.crystals) {
+      const known = gameState.crystals.some(
+        (crystal) =>
+          serverCrystal.x === Math.round(crystal.x) &&
+          serverCrystal.y === Math.round(crystal.y)
+      );
+      if (!known) {
+        gameState.crystals.push({
+          x: serverCrystal.x,
+          y: serverCrystal.y,
+          spawnTime: performance.now(),
+        });
+      }
+    }
   } catch (error) {
     console.error("Error decoding game state:", error);
   }
@@ -214,7 +338,7 @@ socket.on("player_killed", (data) => {
   if (data.id === gameState.myId) {
     console.log("You were killed!");
     gameState.isMoving = false;
-    socket.emit("player_move", { angle: 0, moving: false });
+    sendInput("player_move", { angle: 0, moving: false });
   }
   drawPlayers(); // 重新绘制以更新玩家状态
 });
@@ -242,9 +366,16 @@ function measureLatency() {
   });
 }
 
+// 发送玩家输入（player_move / fire），每条输入带上递增的编号
+function sendInput(event, data = {}) {
+  gameState.inputSeq += 1;
+  socket.emit(event, { ...data, seq: gameState.inputSeq });
+  recordInput(gameState.inputSeq, data);
+}
+
 // 页面卸载前断开socket连接,能够清除后台连接的玩家
 window.addEventListener("beforeunload", () => {
   socket.disconnect();
 });
 
-export { socket, measureLatency };
+export { socket, measureLatency, sendInput };
@@ -1,5 +1,5 @@
 import { gameState } from "./gameState.js";
-import { socket } from "./socket.js";
+import { socket, sendInput } from "./socket.js";
 import { logElementState } from "./utils.js";
 
 // 显示加入游戏表单
@@ -218,7 +218,7 @@ function initJoystick() {
   function handleEnd() {
     isDragging = false;
     joystick.style.transform = "translate(-50%, -50%)";
-    socket.emit("player_move", { moving: 0 });
+    sendInput("player_move", { moving: 0 });
   }
 
   function updateJoystickPosition(x, y) {
@@ -237,7 +237,7 @@ function initJoystick() {
     // 发送移动指令
     const moving = distance > 10 ? 1 : 0;
     const rotating = angle;
-    socket.emit("player_move", { angle: angle, moving: moving });
+    sendInput("player_move", { angle: angle, moving: moving });
   }
 
   joystickContainer.addEventListener("touchstart", handleStart);
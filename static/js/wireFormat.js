@@ -0,0 +1,146 @@
+// game_state 通道的二进制解码，格式说明见服务器端的 wire_format.py
+const WIRE_VERSION = 2;
+const GAME_WIDTH = 1200;
+const GAME_HEIGHT = 800;
+
+const FLAG_CRYSTALS = 0x02;
+const FLAG_LASERS = 0x04;
+
+const FIELD_X = 0x01;
+const FIELD_Y = 0x02;
+const FIELD_ANGLE = 0x04;
+const FIELD_STATUS = 0x08;
+const FIELD_ID = 0x10;
+const FIELD_NAME = 0x20;
+const FIELD_COLOR = 0x40;
+const FIELD_INPUT = 0x80;
+
+const STATUS_ALIVE = 0x01;
+const STATUS_LASER = 0x02;
+
+const textDecoder = new TextDecoder("utf-8");
+
+function dequantizeX(value) {
+  return (value / 65535) * GAME_WIDTH;
+}
+
+function dequantizeY(value) {
+  return (value / 65535) * GAME_HEIGHT;
+}
+
+function dequantizeAngle(value) {
+  return (value / 65536) * Math.PI * 2;
+}
+
+// 把二进制数据包解码成增量对象，玩家用槽位表示
+function decodeGameState(binaryData) {
+  const bytes = new Uint8Array(binaryData);
+  const view = new DataView(bytes.buffer, bytes.byteOffset, bytes.byteLength);
+  let offset = 0;
+
+  const u8 = () => view.getUint8(offset++);
+  const u16 = () => {
+    const value = view.getUint16(offset, true);
+    offset += 2;
+    return value;
+  };
+  const u32 = () => {
+    const value = view.getUint32(offset, true);
+    offset += 4;
+    return value;
+  };
+  const string = () => {
+    const length = u16();
+    const text = textDecoder.decode(bytes.subarray(offset, offset + length));
+    offset += length;
+    return text;
+  };
+
+  const version = u8();
+  if (version !== WIRE_VERSION) {
+    throw new Error(`不支持的 game_state 版本: ${version}`);
+  }
+  const flags = u8();
+  const packet = { seq: u32(), base: u32(), tick: u32() };
+
+  // 玩家
+  packet.players = [];
+  const playerCount = u8();
+  for (let i = 0; i < playerCount; i++) {
+    const entry = { slot: u8() };
+    const mask = u8();
+    if (mask & FIELD_X) entry.x = dequantizeX(u16());
+    if (mask & FIELD_Y) entry.y = dequantizeY(u16());
+    if (mask & FIELD_ANGLE) entry.angle = dequantizeAngle(u16());
+    if (mask & FIELD_STATUS) {
+      const status = u8();
+      entry.alive = (status & STATUS_ALIVE) !== 0;
+      entry.has_laser = (status & STATUS_LASER) !== 0;
+    }
+    if (mask & FIELD_ID) entry.id = string();
+    if (mask & FIELD_NAME) entry.name = string();
+    if (mask & FIELD_COLOR) {
+      const rgb = (u8() << 16) | (u8() << 8) | u8();
+      entry.color = `#${rgb.toString(16).padStart(6, "0")}`;
+    }
+    // 服务器已经应用的输入编号和应用它的模拟步数
+    if (mask & FIELD_INPUT) entry.input = [u32(), u32()];
+    packet.players.push(entry);
+  }
+  packet.removed_players = [];
+  const removedPlayerCount = u8();
+  for (let i = 0; i < removedPlayerCount; i++) {
+    packet.removed_players.push(u8());
+  }
+
+  // 子弹
+  packet.bullets = [];
+  const fullCount = u16();
+  for (let i = 0; i < fullCount; i++) {
+    packet.bullets.push({
+      id: u32(),
+      x: dequantizeX(u16()),
+      y: dequantizeY(u16()),
+      angle: dequantizeAngle(u16()),
+    });
+  }
+  const movedCount = u16();
+  for (let i = 0; i < movedCount; i++) {
+    packet.bullets.push({ id: u32(), x: dequantizeX(u16()), y: dequantizeY(u16()) });
+  }
+  packet.removed_bullets = [];
+  const removedBulletCount = u16();
+  for (let i = 0; i < removedBulletCount; i++) {
+    packet.removed_bullets.push(u32());
+  }
+
+  if (flags & FLAG_CRYSTALS) {
+    packet.crystals = [];
+    const crystalCount = u8();
+    for (let i = 0; i < crystalCount; i++) {
+      packet.crystals.push({ x: u16(), y: u16() });
+    }
+  }
+
+  if (flags & FLAG_LASERS) {
+    packet.lasers = [];
+    const laserCount = u8();
+    for (let i = 0; i < laserCount; i++) {
+      const laser = {
+        x: dequantizeX(u16()),
+        y: dequantizeY(u16()),
+        angle: dequantizeAngle(u16()),
+        reflected_points: [],
+      };
+      const pointCount = u8();
+      for (let j = 0; j < pointCount; j++) {
+        laser.reflected_points.push([dequantizeX(u16()), dequantizeY(u16())]);
+      }
+      packet.lasers.push(laser);
+    }
+  }
+
+  return packet;
+}
+
+export { decodeGameState, WIRE_VERSION };
@@ -0,0 +1,224 @@
+'''
+静态资源的构建和发送
+
+构建（python static_assets.py，deploy.sh 在启动前执行）：把 static 目录里的每个文件复制到 STATIC_BUILD_DIRECTORY，
+文件名里加上内容哈希（js/main.js -> js/main.1a2b3c4d5e.js），再生成 gzip 和 brotli（安装了 brotli 时）压缩版本，
+最后写一个 manifest.json 记录原始路径到新路径的对应关系。
+JS 模块的相对导入和 CSS 的 url(...) 会改写成被引用文件的新名字，所以一个文件的哈希不只取决于自己的内容，
+还包括它直接或间接引用的所有文件的内容：任何一个被引用的文件改了，引用它的文件名字也会变。
+
+发送：启动时 load 把构建好的文件连同压缩版本读进内存，send 按 Accept-Encoding 选一个版本直接返回，
+带一年的 immutable 缓存和 ETag，If-None-Match 命中时返回 304。文件名变了内容才会变，浏览器不需要再验证，
+页面刷新和断线重连时几乎不占用游戏进程。没有构建过的文件照旧从 static 目录读取。
+页面里用模板函数 asset_url 生成地址，构建过的资源得到带哈希的地址。
+'''
+import gzip
+import hashlib
+import json
+import logging
+import mimetypes
+import os
+import posixpath
+import re
+import sys
+from flask import Response, request, send_from_directory
+from game_state import STATIC_BUILD_DIRECTORY, STATIC_MAX_AGE, STATIC_COMPRESS_MIN_SIZE
+
+try:
+    import brotli
+except ImportError:
+    brotli = None  # 没有安装 brotli 时只生成 gzip 版本
+
+logger = logging.getLogger('game.static')
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+SOURCE_DIRECTORY = os.path.join(ROOT, 'static')
+BUILD_DIRECTORY = os.path.join(ROOT, STATIC_BUILD_DIRECTORY)
+MANIFEST = 'manifest.json'
+URL_PREFIX = '/static/'
+HASH_LENGTH = 10
+
+# JS 模块里的相对导入：import ... from "./x.js"、import "./x.js"、import("./x.js")
+JS_IMPORT = re.compile(r'''(\b(?:from|import)\s*\(?\s*["'])(\.{1,2}/[^"']+)(["'])''')
+# CSS 里的 url(...)
+CSS_URL = re.compile(r'''(\burl\(\s*["']?)([^"')]+?)(["']?\s*\))''')
+PATTERNS = {'.js': JS_IMPORT, '.css': CSS_URL}
+
+
+def resolve(path, reference):
+    '''path 里的引用 reference 指向的文件（相对 static 目录的路径），不是本地文件时返回 None'''
+    if reference.startswith(URL_PREFIX):
+        return posixpath.normpath(reference[len(URL_PREFIX):])
+    if '://' in reference or reference.startswith(('/', 'data:', '#')):
+        return None
+    return posixpath.normpath(posixpath.join(posixpath.dirname(path), reference))
+
+
+def references(path, content):
+    pattern = PATTERNS.get(posixpath.splitext(path)[1])
+    if pattern is None:
+        return []
+    return [resolve(path, match.group(2)) for match in pattern.finditer(content.decode('utf-8'))]
+
+
+def rewrite(path, content, names):
+    '''把 path 里对其他文件的引用改成 names 里带哈希的名字'''
+    pattern = PATTERNS.get(posixpath.splitext(path)[1])
+    if pattern is None:
+        return content
+
+    def replace(match):
+        target = resolve(path, match.group(2))
+        if target not in names:
+            return match.group(0)
+        if match.group(2).startswith(URL_PREFIX):
+            reference = URL_PREFIX + names[target]
+        else:
+            reference = posixpath.relpath(names[target], posixpath.dirname(path) or '.')
+            if not reference.startswith('.'):
+                reference = './' + reference
+        return match.group(1) + reference + match.group(3)
+    return pattern.sub(replace, content.decode('utf-8')).encode('utf-8')
+
+
+def content_hash(path, files, dependencies):
+    # 自己和所有直接、间接引用的文件的内容一起计算哈希；模块之间循环导入也没有关系
+    seen = {path}
+    pending = [path]
+    while pending:
+        for dependency in dependencies[pending.pop()]:
+            if dependency not in seen:
+                seen.add(dependency)
+                pending.append(dependency)
+    digest = hashlib.sha256()
+    for name in sorted(seen):
+        digest.update(name.encode('utf-8') + b'\0' + files[name] + b'\0')
+    return digest.hexdigest()[:HASH_LENGTH]
+
+
+def write_file(path, content):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'wb') as f:
+        f.write(content)
+
+
+def build(source=SOURCE_DIRECTORY, output=BUILD_DIRECTORY):
+    '''构建 source 目录里的所有文件，返回 manifest（原始路径 -> 带哈希的路径）'''
+    files = {}
+    for directory, subdirectories, filenames in os.walk(source):
+        # 不要把上一次构建的结果也当成源文件
+        subdirectories[:] = sorted(name for name in subdirectories
+                                   if os.path.abspath(os.path.join(directory, name)) != os.path.abspath(output))
+        for filename in sorted(filenames):
+            full_path = os.path.join(directory, filename)
+            with open(full_path, 'rb') as f:
+                files[os.path.relpath(full_path, source).replace(os.sep, '/')] = f.read()
+
+    dependencies = {path: {target for target in references(path, content) if target in files and target != path}
+                    for path, content in files.items()}
+    manifest = {}
+    for path in files:
+        stem, extension = posixpath.splitext(path)
+        manifest[path] = f'{stem}.{content_hash(path, files, dependencies)}{extension}'
+
+    for path, content in files.items():
+        body = rewrite(path, content, manifest)
+        target = os.path.join(output, manifest[path])
+        write_file(target, body)
+        if len(body) < STATIC_COMPRESS_MIN_SIZE:
+            continue
+        # 只保留确实变小了的压缩版本；mtime 固定为 0，同样的内容总是得到同样的文件
+        compressed = gzip.compress(body, 9, mtime=0)
+        if len(compressed) < len(body):
+            write_file(target + '.gz', compressed)
+        if brotli is not None:
+            compressed = brotli.compress(body, quality=11)
+            if len(compressed) < len(body):
+                write_file(target + '.br', compressed)
+
+    write_file(os.path.join(output, MANIFEST), json.dumps(manifest, indent=2, sort_keys=True).encode('utf-8'))
+    return manifest
+
+
+class Asset:
+    __slots__ = ('body', 'gzip', 'brotli', 'etag', 'content_type')
+
+    def __init__(self, body, gzip_body, brotli_body, content_type):
+        self.body = body
+        self.gzip = gzip_body
+        self.brotli = brotli_body
+        self.etag = hashlib.sha256(body).hexdigest()[:16]
+        self.content_type = content_type
+
+
+# 带哈希的路径 -> Asset，由 load 读入
+assets = {}
+# 原始路径 -> 带哈希的路径
+urls = {}
+
+
+def read_optional(path):
+    try:
+        with open(path, 'rb') as f:
+            return f.read()
+    except FileNotFoundError:
+        return None
+
+
+def load(directory=BUILD_DIRECTORY):
+    '''把构建好的资源读进内存；没有构建过时什么也不做，所有资源从 static 目录发送'''
+    try:
+        with open(os.path.join(directory, MANIFEST), encoding='utf-8') as f:
+            manifest = json.load(f)
+    except FileNotFoundError:
+        logger.info("静态资源没有构建，直接发送 static 目录（构建：python static_assets.py）")
+        return
+    loaded = {}
+    for hashed in manifest.values():
+        target = os.path.join(directory, hashed)
+        body = read_optional(target)
+        if body is None:
+            logger.warning("构建结果里缺少 %s，请重新构建", hashed)
+            return
+        content_type = mimetypes.guess_type(hashed)[0] or 'application/octet-stream'
+        if content_type.startswith('text/') or content_type == 'application/javascript':
+            content_type += '; charset=utf-8'
+        loaded[hashed] = Asset(body, read_optional(target + '.gz'), read_optional(target + '.br'), content_type)
+    assets.clear()
+    assets.update(loaded)
+    urls.clear()
+    urls.update(manifest)
+    logger.info("已载入 %d 个静态资源", len(assets))
+
+
+def asset_url(path):
+    '''模板里引用静态资源的地址，例如 asset_url('js/main.js')'''
+    return URL_PREFIX + urls.get(path, path)
+
+
+def send(path):
+    '''发送 /static/ 下的 path'''
+    asset = assets.get(path)
+    if asset is None:
+        return send_from_directory(SOURCE_DIRECTORY, path)
+    # 每种编码的内容不同，ETag 也要不同
+    accepted = request.accept_encodings
+    if asset.brotli is not None and accepted['br']:
+        body, encoding, etag = asset.brotli, 'br', asset.etag + '-br'
+    elif asset.gzip is not None and accepted['gzip']:
+        body, encoding, etag = asset.gzip, 'gzip', asset.etag + '-gz'
+    else:
+        body, encoding, etag = asset.body, None, asset.etag
+    headers = {'Cache-Control': f'public, max-age={STATIC_MAX_AGE}, immutable', 'Vary': 'Accept-Encoding',
+               'ETag': f'"{etag}"'}
+    if request.if_none_match.contains(etag):
+        return Response(status=304, headers=headers)
+    if encoding is not None:
+        headers['Content-Encoding'] = encoding
+    return Response(body, content_type=asset.content_type, headers=headers)
+
+
+if __name__ == '__main__':
+    output = sys.argv[1] if len(sys.argv) > 1 else BUILD_DIRECTORY
+    manifest = build(output=output)
+    print(f"已构建 {len(manifest)} 个静态资源到 {output}" + ("" if brotli else "（没有安装 brotli，只生成 gzip 版本）"))
@@ -0,0 +1,44 @@
+import numpy as np
+
+
+class TickStats:
+    '''
+    游戏循环每个阶段的耗时统计
+
+    每个阶段（update / serialize / emit）保留最近 window 次的耗时（微秒），
+    用环形缓冲区存储，记录时只做一次数组赋值；需要报告时再计算 p50 / p99。
+    missed_deadlines 统计因为服务器跟不上而没能按时执行的模拟步数。
+    '''
+
+    PHASES = ('update', 'serialize', 'emit')
+
+    def __init__(self, window=600):
+        self.window = window
+        self.samples = {phase: np.zeros(window) for phase in self.PHASES}
+        self.counts = {phase: 0 for phase in self.PHASES}
+        self.ticks = 0
+        self.missed_deadlines = 0
+        self.dropped_steps = 0
+
+    def record(self, phase, seconds):
+        count = self.counts[phase]
+        self.samples[phase][count % self.window] = seconds * 1e6
+        self.counts[phase] = count + 1
+
+    def summary(self):
+        result = {'ticks': self.ticks, 'missed_deadlines': self.missed_deadlines, 'dropped_steps': self.dropped_steps}
+        for phase in self.PHASES:
+            samples = self.samples[phase][:min(self.counts[phase], self.window)]
+            if len(samples):
+                p50, p99 = np.percentile(samples, [50, 99])
+            else:
+                p50 = p99 = 0.0
+            result[phase] = {'p50_us': round(float(p50), 1), 'p99_us': round(float(p99), 1)}
+        return result
+
+    def format_summary(self):
+        summary = self.summary()
+        phases = ', '.join(f"{phase} p50={summary[phase]['p50_us']}µs p99={summary[phase]['p99_us']}µs"
+                           for phase in self.PHASES)
+        return (f"ticks={summary['ticks']} missed={summary['missed_deadlines']} "
+                f"dropped={summary['dropped_steps']} {phases}")
@@ -24,7 +24,7 @@ def circle_rectangle_collision(circle_x, circle_y, circle_radius, rect):
     
     return distance_squared <= circle_radius**2
 
-def generate_maze(width, height):
+def generate_maze(width, height, rng=random):
     # 这行代码创建了一个二维列表（矩阵）来表示迷宫
     # width 和 height 分别代表迷宫的宽度和高度
     # 初始化时，所有元素都设置为0，表示没有墙壁
@@ -35,7 +35,7 @@ def generate_maze(width, height):
     # 生成随机的墙壁
     for y in range(height):
         for x in range(width):
-            if random.random() < 0.3:  # 30% 的概率生成墙壁
+            if rng.random() < 0.3:  # 30% 的概率生成墙壁
                 maze[y][x] = 1
     
     # 确保没有完全封闭的空间
@@ -115,6 +115,30 @@ def line_rectangle_intersection(x, y, dx, dy, rect):
     return None
 
 
+# 辅助函数：射线与矩形最先相交的时刻，以及是否撞在矩形的左右两侧（否则是上下两侧）
+def ray_rectangle_hit(x, y, dx, dy, rect):
+    left = rect['x']
+    right = rect['x'] + rect['width']
+    top = rect['y']
+    bottom = rect['y'] + rect['height']
+
+    tx1, tx2 = float('-inf'), float('inf')
+    if dx != 0:
+        tx1, tx2 = sorted(((left - x) / dx, (right - x) / dx))
+    elif not left <= x <= right:
+        return None
+
+    ty1, ty2 = float('-inf'), float('inf')
+    if dy != 0:
+        ty1, ty2 = sorted(((top - y) / dy, (bottom - y) / dy))
+    elif not top <= y <= bottom:
+        return None
+
+    t1 = max(tx1, ty1)
+    if t1 <= min(tx2, ty2) and t1 >= 0:
+        return t1, tx1 >= ty1
+    return None
+
 # 辅助函数：计算两条直线的交点
 def line_line_intersection(x1, y1, x2, y2, x3, y3, x4, y4):
     denom = (y4 - y3) * (x2 - x1) - (x4 - x3) * (y2 - y1)
@@ -0,0 +1,317 @@
+'''
+game_state 通道的二进制编码（小端序）
+
+    头部     u8 版本 | u8 标志 | u32 快照编号 | u32 基线编号（0 表示关键帧）| u32 模拟步数
+    玩家     u8 条数，每条: u8 槽位 | u8 字段掩码 | 按掩码顺序排列的字段
+             u8 移除条数，每条: u8 槽位
+    子弹     u16 条数，每条完整子弹: u32 id | u16 x | u16 y | u16 角度
+             u16 条数，每条只移动的子弹: u32 id | u16 x | u16 y
+             u16 条数，每条移除的子弹: u32 id
+    水晶     （标志 FLAG_CRYSTALS）u8 条数，每条: u16 x | u16 y，整数像素
+    激光     （标志 FLAG_LASERS）u8 条数，每条: u16 x | u16 y | u16 角度 | u8 反射点数 | 反射点 u16 x | u16 y
+
+坐标按 GAME_WIDTH / GAME_HEIGHT 量化成 0..65535 的定点数，角度按 2π 量化成 16 位。
+玩家用 u8 槽位代替 socket ID，ID、名字和颜色只在新玩家或者变化时发送。
+FIELD_INPUT 是服务器已经应用的这个玩家的最大输入编号和应用它的那一步，客户端用它做预测和对账（见 prediction.js）。
+客户端解码见 static/js/wireFormat.js，两边的 WIRE_VERSION 必须一致。
+'''
+import math
+import struct
+import numpy as np
+from game_state import GAME_WIDTH, GAME_HEIGHT
+
+WIRE_VERSION = 2
+
+FLAG_KEYFRAME = 0x01
+FLAG_CRYSTALS = 0x02
+FLAG_LASERS = 0x04
+
+# 玩家字段掩码，字段按位从低到高的顺序写入
+FIELD_X = 0x01
+FIELD_Y = 0x02
+FIELD_ANGLE = 0x04
+FIELD_STATUS = 0x08  # u8: bit0 存活, bit1 拥有激光
+FIELD_ID = 0x10  # u16 长度 + UTF-8
+FIELD_NAME = 0x20  # u16 长度 + UTF-8
+FIELD_COLOR = 0x40  # u8 r | u8 g | u8 b
+FIELD_INPUT = 0x80  # u32 输入编号 | u32 应用它的模拟步数
+
+STATUS_ALIVE = 0x01
+STATUS_LASER = 0x02
+
+PLAYER_FIELDS = ('x', 'y', 'angle', 'status', 'id', 'name', 'color', 'input')
+PLAYER_MASKS = (FIELD_X, FIELD_Y, FIELD_ANGLE, FIELD_STATUS, FIELD_ID, FIELD_NAME, FIELD_COLOR, FIELD_INPUT)
+
+FULL_BULLET = np.dtype([('id', '<u4'), ('x', '<u2'), ('y', '<u2'), ('angle', '<u2')])
+MOVED_BULLET = np.dtype([('id', '<u4'), ('x', '<u2'), ('y', '<u2')])
+
+HEADER = struct.Struct('<BBIII')
+U8 = struct.Struct('<B')
+U16 = struct.Struct('<H')
+POINT = struct.Struct('<HH')
+LASER = struct.Struct('<HHHB')
+COLOR = struct.Struct('<BBB')
+INPUT = struct.Struct('<II')
+
+X_SCALE = 65535 / GAME_WIDTH
+Y_SCALE = 65535 / GAME_HEIGHT
+ANGLE_SCALE = 65536 / (2 * math.pi)
+
+
+def quantize_x(x):
+    return int(round(min(max(x, 0), GAME_WIDTH) * X_SCALE))
+
+
+def quantize_y(y):
+    return int(round(min(max(y, 0), GAME_HEIGHT) * Y_SCALE))
+
+
+def quantize_angle(angle):
+    return int(round(angle * ANGLE_SCALE)) & 0xFFFF
+
+
+def quantize_player(player, slot, has_laser, input_ack=(0, 0)):
+    status = (STATUS_ALIVE if player.alive else 0) | (STATUS_LASER if has_laser else 0)
+    return {
+        'slot': slot,
+        'x': quantize_x(player.x),
+        'y': quantize_y(player.y),
+        'angle': quantize_angle(player.angle),
+        'status': status,
+        'name': player.name,
+        'color': player.color,
+        'input': input_ack,
+    }
+
+
+def quantize_bullets(bullets):
+    '''把 BulletStore 中的子弹量化成按 id 排序的 FULL_BULLET 数组'''
+    n = bullets.count
+    order = np.argsort(bullets.ids[:n])
+    quantized = np.empty(n, dtype=FULL_BULLET)
+    quantized['id'] = bullets.ids[:n][order]
+    quantized['x'] = np.rint(np.clip(bullets.x[:n][order], 0, GAME_WIDTH) * X_SCALE)
+    quantized['y'] = np.rint(np.clip(bullets.y[:n][order], 0, GAME_HEIGHT) * Y_SCALE)
+    quantized['angle'] = np.rint(bullets.angle[:n][order] * ANGLE_SCALE).astype(np.int64) & 0xFFFF
+    return quantized
+
+
+def quantize_laser(laser):
+    return (quantize_x(laser.x), quantize_y(laser.y), quantize_angle(laser.angle),
+            tuple((quantize_x(x), quantize_y(y)) for x, y in laser.reflected_points))
+
+
+class PlayerSlots:
+    '''
+    玩家 ID 到 u8 槽位的映射
+
+    玩家在世界里存在期间槽位不变，离开后槽位回收。
+    同一个 ID 重新加入会拿到新的槽位，编码时按"移除旧槽位 + 新玩家"处理。
+    '''
+
+    def __init__(self):
+        self.slots = {}
+        self.free = list(range(255, -1, -1))
+
+    def slot_for(self, player_id):
+        slot = self.slots.get(player_id)
+        if slot is None:
+            slot = self.slots[player_id] = self.free.pop()
+        return slot
+
+    def retain(self, player_ids):
+        # 回收已经不在世界里的玩家的槽位
+        for player_id in [player_id for player_id in self.slots if player_id not in player_ids]:
+            self.free.append(self.slots.pop(player_id))
+
+
+class PacketWriter:
+    '''往预先分配好的缓冲区里顺序写入数据，空间不够时翻倍扩容'''
+
+    def __init__(self, capacity=65536):
+        self.buffer = bytearray(capacity)
+        self.offset = 0
+
+    def reserve(self, size):
+        if self.offset + size > len(self.buffer):
+            self.buffer.extend(bytes(max(size, len(self.buffer))))
+
+    def pack(self, fmt, *values):
+        self.reserve(fmt.size)
+        fmt.pack_into(self.buffer, self.offset, *values)
+        self.offset += fmt.size
+
+    def pack_at(self, offset, fmt, *values):
+        fmt.pack_into(self.buffer, offset, *values)
+
+    def string(self, text):
+        data = text.encode('utf-8')[:0xFFFF]
+        self.pack(U16, len(data))
+        self.reserve(len(data))
+        self.buffer[self.offset:self.offset + len(data)] = data
+        self.offset += len(data)
+
+    def array(self, values):
+        # 直接把 NumPy 结构化数组写进缓冲区
+        size = values.nbytes
+        if size == 0:
+            return
+        self.reserve(size)
+        np.frombuffer(self.buffer, dtype=values.dtype, count=len(values), offset=self.offset)[:] = values
+        self.offset += size
+
+    def getvalue(self):
+        return bytes(memoryview(self.buffer)[:self.offset])
+
+
+def encode_delta(writer, base, world, seq, base_seq):
+    '''
+    把 world 相对于 base 的增量一次性写进 writer
+
+    返回是否有任何变化（关键帧总是返回 True），没有变化的增量不需要发送。
+    '''
+    writer.offset = 0
+    keyframe = base_seq == 0
+    flags = FLAG_KEYFRAME if keyframe else 0
+    for flag, key in ((FLAG_CRYSTALS, 'crystals'), (FLAG_LASERS, 'lasers')):
+        if keyframe or world[key] != base[key]:
+            flags |= flag
+    writer.pack(HEADER, WIRE_VERSION, flags, seq, base_seq, world.get('tick', 0))
+    changed = keyframe or flags != 0
+
+    # 玩家
+    base_players = base['players']
+    removed_slots = [state['slot'] for player_id, state in base_players.items()
+                     if player_id not in world['players'] or world['players'][player_id]['slot'] != state['slot']]
+    count_offset = writer.offset
+    writer.pack(U8, 0)
+    count = 0
+    for player_id, state in world['players'].items():
+        old = base_players.get(player_id)
+        if old is None or old['slot'] != state['slot']:
+            mask = FIELD_X | FIELD_Y | FIELD_ANGLE | FIELD_STATUS | FIELD_ID | FIELD_NAME | FIELD_COLOR | FIELD_INPUT
+        else:
+            mask = 0
+            for field, bit in zip(PLAYER_FIELDS, PLAYER_MASKS):
+                if bit != FIELD_ID and old[field] != state[field]:
+                    mask |= bit
+            if not mask:
+                continue
+        writer.pack(U8, state['slot'])
+        writer.pack(U8, mask)
+        if mask & FIELD_X:
+            writer.pack(U16, state['x'])
+        if mask & FIELD_Y:
+            writer.pack(U16, state['y'])
+        if mask & FIELD_ANGLE:
+            writer.pack(U16, state['angle'])
+        if mask & FIELD_STATUS:
+            writer.pack(U8, state['status'])
+        if mask & FIELD_ID:
+            writer.string(player_id)
+        if mask & FIELD_NAME:
+            writer.string(state['name'])
+        if mask & FIELD_COLOR:
+            rgb = int(state['color'][1:7], 16)
+            writer.pack(COLOR, rgb >> 16, (rgb >> 8) & 0xFF, rgb & 0xFF)
+        if mask & FIELD_INPUT:
+            writer.pack(INPUT, *state['input'])
+        count += 1
+    writer.pack_at(count_offset, U8, count)
+    writer.pack(U8, len(removed_slots))
+    for slot in removed_slots:
+        writer.pack(U8, slot)
+    changed = changed or count > 0 or len(removed_slots) > 0
+
+    # 子弹：两边都按 id 排好序，用 searchsorted 批量匹配
+    current = world['bullets']
+    previous = base['bullets']
+    if len(previous):
+        position = np.minimum(np.searchsorted(previous['id'], current['id']), len(previous) - 1)
+        matched = previous[position]
+        found = matched['id'] == current['id']
+        full = ~found | (matched['angle'] != current['angle'])
+        moved = ~full & ((matched['x'] != current['x']) | (matched['y'] != current['y']))
+        removed = previous['id'][~np.isin(previous['id'], current['id'], assume_unique=True)]
+    else:
+        full = np.ones(len(current), dtype=bool)
+        moved = np.zeros(len(current), dtype=bool)
+        removed = previous['id']
+    full_bullets = current[full]
+    moved_bullets = current[moved][['id', 'x', 'y']].astype(MOVED_BULLET)
+    writer.pack(U16, len(full_bullets))
+    writer.array(full_bullets)
+    writer.pack(U16, len(moved_bullets))
+    writer.array(moved_bullets)
+    writer.pack(U16, len(removed))
+    writer.array(removed.astype('<u4'))
+    changed = changed or len(full_bullets) > 0 or len(moved_bullets) > 0 or len(removed) > 0
+
+    if flags & FLAG_CRYSTALS:
+        writer.pack(U8, len(world['crystals']))
+        for x, y in world['crystals']:
+            writer.pack(POINT, x, y)
+    if flags & FLAG_LASERS:
+        writer.pack(U8, len(world['lasers']))
+        for x, y, angle, points in world['lasers']:
+            writer.pack(LASER, x, y, angle, len(points))
+            for point in points:
+                writer.pack(POINT, *point)
+    return changed
+
+
+def decode_players(data, base_players):
+    '''
+    解码数据包的头部和玩家部分（压力测试客户端用，浏览器的解码见 wireFormat.js）
+
+    base_players 是基线快照里的玩家 {槽位: 字段}，关键帧传空字典。
+    返回 (快照编号, 基线编号, 模拟步数, 新的玩家字典)，子弹和之后的部分不解码。
+    '''
+    version, flags, seq, base_seq, tick = HEADER.unpack_from(data, 0)
+    if version != WIRE_VERSION:
+        raise ValueError(f'不支持的协议版本: {version}')
+    offset = HEADER.size
+    players = {} if flags & FLAG_KEYFRAME else {slot: dict(state) for slot, state in base_players.items()}
+
+    def read(fmt):
+        nonlocal offset
+        values = fmt.unpack_from(data, offset)
+        offset += fmt.size
+        return values
+
+    def read_string():
+        nonlocal offset
+        (length,) = read(U16)
+        text = bytes(data[offset:offset + length]).decode('utf-8')
+        offset += length
+        return text
+
+    # 和 socket.js 一样先处理移除再处理更新：移除列表写在后面，但同一个槽位可能已经给了新玩家
+    (count,) = read(U8)
+    entries = []
+    for _ in range(count):
+        slot, mask = read(U8)[0], read(U8)[0]
+        state = {}
+        if mask & FIELD_X:
+            state['x'] = read(U16)[0]
+        if mask & FIELD_Y:
+            state['y'] = read(U16)[0]
+        if mask & FIELD_ANGLE:
+            state['angle'] = read(U16)[0]
+        if mask & FIELD_STATUS:
+            state['status'] = read(U8)[0]
+        if mask & FIELD_ID:
+            state['id'] = read_string()
+        if mask & FIELD_NAME:
+            state['name'] = read_string()
+        if mask & FIELD_COLOR:
+            state['color'] = '#%02x%02x%02x' % read(COLOR)
+        if mask & FIELD_INPUT:
+            state['input'] = read(INPUT)
+        entries.append((slot, state))
+    (removed,) = read(U8)
+    for _ in range(removed):
+        players.pop(read(U8)[0], None)
+    for slot, state in entries:
+        players.setdefault(slot, {}).update(state)
+    return seq, base_seq, tick, players
@@ -0,0 +1,61 @@
+'''
+多进程部署
+
+每个进程是一个独立的 gunicorn + eventlet 服务，监听 WORKER_BASE_PORT + 编号，
+只运行自己负责的房间，所以物理计算可以分摊到多个 CPU 核心上。
+进程之间通过房间目录（ROOM_DIRECTORY）共享大厅信息，房间和进程的对应关系记录在目录里：
+访问不属于本进程的房间时，页面请求会被重定向、player_join 会收到 room_moved，客户端转到负责的进程。
+
+用法: WORKER_COUNT=4 python workers.py
+'''
+import os
+import signal
+import subprocess
+import sys
+from urllib.parse import urlsplit
+from game_state import WORKER_COUNT, WORKER_INDEX, WORKER_BASE_PORT, WORKER_URL, ROOM_DIRECTORY
+
+
+def is_local(worker):
+    return worker == WORKER_INDEX
+
+
+def worker_url(worker, scheme, host):
+    '''客户端访问第 worker 个进程的地址，host 取自当前请求'''
+    # 去掉端口；IPv6 地址（[::1]:5000）去掉端口后还要放回方括号里
+    hostname = urlsplit('//' + host).hostname or host
+    if ':' in hostname:
+        hostname = f'[{hostname}]'
+    return WORKER_URL.format(scheme=scheme, host=hostname, port=WORKER_BASE_PORT + worker, index=worker)
+
+
+def main():
+    count = WORKER_COUNT
+    directory_url = ROOM_DIRECTORY
+    if count > 1 and directory_url == 'memory':
+        # 多个进程必须共用同一个目录
+        directory_url = 'sqlite:///rooms.db'
+
+    # 清掉上一次运行留下的房间记录
+    from room_directory import open_directory
+    open_directory(directory_url).clear()
+
+    processes = []
+    for index in range(count):
+        env = dict(os.environ, WORKER_COUNT=str(count), WORKER_INDEX=str(index),
+                   WORKER_BASE_PORT=str(WORKER_BASE_PORT), ROOM_DIRECTORY=directory_url)
+        processes.append(subprocess.Popen([sys.executable, '-m', 'gunicorn', '-c', 'gunicorn.conf.py', 'wsgi:app'], env=env))
+        print(f"进程 {index} 已启动，端口 {WORKER_BASE_PORT + index}")
+
+    def stop(signum, frame):
+        for process in processes:
+            process.terminate()
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+    for process in processes:
+        process.wait()
+
+
+if __name__ == '__main__':
+    main()
@@ -1,5 +1,5 @@
 from app import app, socketio, start_console_thread
-from game_logic import generate_walls, run_game_loop
+from game_logic import run_game_loop
 import threading
 
 